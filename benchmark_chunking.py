@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Chunking - Chunking Engine
+Compara as otimizações do motor de chunking com as implementações anteriores (tempo,
+memória e resultados idênticos) e mede o chunking semântico, o pool de processos e a
+contagem de tokens aproximada sobre textos sintéticos em português
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import logging
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from chunking_engine import ChunkingEngine, Chunk, ChunkBatch
+from rag_agent import StoredChunk
+from sentence_segmenter import segment_sentences
+from benchmark_chunking_suite import create_corpus
+from token_counter import get_tokenizer, get_approximate_counter
+
+SAMPLE_SENTENCES = [
+    "Todo funcionário tem direito a 30 dias de férias após 12 meses de trabalho",
+    "Férias devem ser solicitadas com 30 dias de antecedência através do sistema interno",
+    "A aprovação depende do gestor direto e da disponibilidade da equipe",
+    "O reembolso de despesas exige nota fiscal e aprovação em até 15 dias úteis",
+    "Horas extras são compensadas no banco de horas conforme acordo coletivo",
+    "O vale-refeição é creditado no quinto dia útil de cada mês"
+]
+
+SAMPLE_HEADERS = [
+    "CAPÍTULO {n}",
+    "## Seção {n} - Benefícios",
+    "{n}. POLÍTICA DE FÉRIAS",
+    "DISPOSIÇÕES GERAIS:",
+    "REEMBOLSO DE DESPESAS"
+]
+
+def create_sample_text(size_mb: float, seed: int = 42, structured: bool = False) -> str:
+    """
+    Gera um texto sintético com parágrafos curtos, listas e parágrafos longos sem quebras
+    (structured: também cabeçalhos de seção e marcadores de página)
+    """
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    total = 0
+
+    while total < target:
+        if structured and rng.random() < 0.15:
+            template = rng.choice(SAMPLE_HEADERS)
+            parts.append(template.format(n=len(parts)))
+        if structured and rng.random() < 0.05:
+            parts.append(f"--- Página {len(parts)} ---")
+        kind = rng.random()
+        sentences = [rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(1, 40 if kind < 0.2 else 6))]
+        if kind < 0.6:
+            block = ". ".join(sentences) + "."
+        else:
+            block = "\n".join(f"- {sentence}" for sentence in sentences)
+        parts.append(block)
+        total += len(block) + 2
+
+    return "\n\n".join(parts)
+
+# Implementação anterior de ChunkingEngine._recursive_chunking, mantida para comparação
+def legacy_recursive_chunking(text: str, chunk_size: int, chunk_overlap: int):
+    separators = ['\n\n', '\n', '. ', ' ', '']
+    chunks = []
+    current_chunk = ""
+    for paragraph in text.split('\n\n'):
+        if len(current_chunk) + len(paragraph) <= chunk_size:
+            current_chunk += paragraph + '\n\n'
+        else:
+            if current_chunk.strip():
+                chunks.append(current_chunk.strip())
+            if len(paragraph) > chunk_size:
+                chunks.extend(legacy_split_text_recursively(paragraph, chunk_size, separators))
+                current_chunk = ""
+            else:
+                current_chunk = paragraph + '\n\n'
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+    if chunk_overlap > 0 and len(chunks) > 1:
+        chunks = [chunks[0]] + [
+            (chunks[i - 1][-chunk_overlap:] if len(chunks[i - 1]) > chunk_overlap else chunks[i - 1])
+            + ' ' + chunks[i]
+            for i in range(1, len(chunks))
+        ]
+    return chunks
+
+def legacy_split_text_recursively(text: str, chunk_size: int, separators):
+    if len(text) <= chunk_size:
+        return [text]
+    for separator in separators:
+        if separator in text:
+            chunks = []
+            current_chunk = ""
+            for part in text.split(separator):
+                if len(current_chunk) + len(part) + len(separator) <= chunk_size:
+                    current_chunk += part + separator
+                else:
+                    if current_chunk:
+                        chunks.append(current_chunk.rstrip(separator))
+                    if len(part) > chunk_size:
+                        chunks.extend(legacy_split_text_recursively(part, chunk_size, separators[1:]))
+                        current_chunk = ""
+                    else:
+                        current_chunk = part + separator
+            if current_chunk:
+                chunks.append(current_chunk.rstrip(separator))
+            return [chunk for chunk in chunks if chunk.strip()]
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+# Fim de frase anterior (pontuação seguida de espaço, sem tratar abreviações)
+LEGACY_SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\')\]]*[ \t]+|[ \t]*\n\s*')
+
+def legacy_sentence_spans(text: str):
+    spans = []
+    sentence_start = 0
+    for match in LEGACY_SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[sentence_start:match.end()].strip()
+        if sentence:
+            spans.append(sentence)
+        sentence_start = match.end()
+    if text[sentence_start:].strip():
+        spans.append(text[sentence_start:].strip())
+    return spans
+
+# Implementação anterior de _section_chunking/_page_chunking (regex por linha e por marcador)
+def legacy_is_section_header(line: str) -> bool:
+    line = line.strip()
+    header_patterns = [r'^#{1,6}\s+', r'^\d+\.\s+[A-Z]', r'^[A-Z][A-Z\s]+:$', r'^SEÇÃO\s+\d+', r'^CAPÍTULO\s+\d+']
+    for pattern in header_patterns:
+        if re.match(pattern, line):
+            return True
+    return len(line) < 50 and line.isupper() and len(line) > 5
+
+def legacy_semantic_chunking(text: str, max_size: int):
+    chunks = []
+    current_chunk = ""
+    for line in text.split('\n'):
+        if legacy_is_section_header(line):
+            if current_chunk.strip():
+                chunks.append(current_chunk.strip())
+            current_chunk = line + '\n'
+        else:
+            current_chunk += line + '\n'
+            if len(current_chunk) > max_size:
+                chunks.append(current_chunk.strip())
+                current_chunk = ""
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+    return chunks
+
+def legacy_page_chunking(text: str, chunk_size: int):
+    chunks = []
+    for marker_pattern in [r'--- Página \d+ ---', r'\[Página \d+\]', r'Page \d+', r'\f']:
+        if re.search(marker_pattern, text):
+            chunks = [page.strip() for page in re.split(marker_pattern, text) if page.strip()]
+            break
+    if not chunks:
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    return chunks
+
+def benchmark_recursive(text: str, chunk_size: int, chunk_overlap: int, repeats: int) -> None:
+    """Compara as duas implementações sobre o mesmo texto"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n✂️ Chunking recursivo ({chunk_size}/{chunk_overlap}) sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    engine = ChunkingEngine()
+    config = {'chunk_size': chunk_size, 'chunk_overlap': chunk_overlap}
+
+    runs = [
+        ('anterior', lambda: legacy_recursive_chunking(text, chunk_size, chunk_overlap)),
+        ('intervalos', lambda: engine._recursive_chunking(text, config)[0])
+    ]
+
+    for name, run in runs:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            chunks = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        sizes = [len(chunk) for chunk in chunks]
+        print(f"{name:11s} {best:6.2f}s ({size_mb / best:6.1f}MB/s) | {len(chunks)} chunks, "
+              f"média {sum(sizes) / len(sizes):.0f} caracteres, máximo {max(sizes)}")
+
+    chunks, spans = engine._recursive_chunking(text, config)
+    exact = all(chunk == text[span['start_char']:span['end_char']] for chunk, span in zip(chunks, spans))
+    print(f"Chunks idênticos aos intervalos do texto original: {'✅' if exact else '❌'}")
+
+def benchmark_semantic(text: str) -> None:
+    """Mede o chunking semântico por embeddings (fallback determinístico, offline)"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🧠 Chunking semântico por embeddings sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    engine = ChunkingEngine()
+    config = engine.strategies_config['semantic_auto']
+
+    start = time.perf_counter()
+    sentences = segment_sentences(text)
+    distances = engine._window_distances(text, sentences, config.get('window_size', 2), config.get('batch_size', 256))
+    embed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = engine.create_chunks(text, 'semantic_auto')
+    elapsed = time.perf_counter() - start
+
+    sizes = [chunk['size'] for chunk in chunks]
+    print(f"{len(sentences)} frases | frases + embeddings + distâncias: {embed_time:.2f}s")
+    print(f"create_chunks: {elapsed:.2f}s ({size_mb / elapsed:.1f}MB/s) | {len(chunks)} chunks, "
+          f"tamanho {min(sizes)}-{max(sizes)} (média {sum(sizes) / len(sizes):.0f}), "
+          f"distância média {distances.mean():.3f}")
+
+def benchmark_multi_strategy(text: str, strategies) -> None:
+    """Compara create_chunks por estratégia com create_chunks_multi (pré-processamento compartilhado)"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🧪 Várias estratégias sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    engine = ChunkingEngine()
+    # Variante semântica com outros limites: reaproveita frases e distâncias de semantic_auto
+    engine.strategies_config['semantic_500_100'] = {'type': 'semantic', 'max_chunk_size': 500, 'min_chunk_size': 100}
+    strategies = list(strategies) + ['semantic_500_100']
+
+    start = time.perf_counter()
+    separate = {strategy: engine.create_chunks(text, strategy) for strategy in strategies}
+    separate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = engine.create_chunks_multi(text, strategies)
+    shared_time = time.perf_counter() - start
+
+    print(f"Estratégias: {', '.join(strategies)}")
+    print(f"uma por vez   {separate_time:6.2f}s")
+    print(f"compartilhado {shared_time:6.2f}s ({separate_time / shared_time:.1f}x)")
+    print(f"Chunks idênticos: {'✅' if separate == shared else '❌'}")
+
+def benchmark_overlap_metrics(text: str, strategy: str, chunk_size: int, chunk_overlap: int) -> None:
+    """Compara o overlap gravado na construção com o recálculo por busca (verify_overlap)"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n📏 Métricas de overlap ({strategy} {chunk_size}/{chunk_overlap}) sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    strategies = {strategy: {'type': strategy, 'chunk_size': chunk_size, 'chunk_overlap': chunk_overlap}}
+    results = {}
+
+    for name, verify in (('gravado', False), ('busca', True)):
+        engine = ChunkingEngine(strategies, verify_overlap=verify)
+        start = time.perf_counter()
+        chunks = engine.create_chunks(text, strategy)
+        elapsed = time.perf_counter() - start
+        results[name] = [chunk['overlap_with_previous'] for chunk in chunks]
+        print(f"{name:11s} {elapsed:6.2f}s ({size_mb / elapsed:6.1f}MB/s) | {len(chunks)} chunks")
+
+    matches = sum(a == b for a, b in zip(results['gravado'], results['busca']))
+    print(f"Overlap idêntico nos dois modos: {matches}/{len(results['gravado'])} chunks")
+
+def benchmark_structure_scan(text: str, repeats: int) -> None:
+    """Compara o custo por MB da detecção de cabeçalhos/páginas antes e depois do scanner único"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🔎 Cabeçalhos e marcadores de página sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    engine = ChunkingEngine()
+    semantic_config = {'max_chunk_size': 1000}
+    # O chunking anterior não dividia páginas maiores que chunk_size: só a detecção é comparada
+    page_config = {'chunk_size': len(text)}
+
+    runs = [
+        ('semântico anterior', lambda: legacy_semantic_chunking(text, 1000)),
+        ('semântico scanner', lambda: engine._section_chunking(text, semantic_config)[0]),
+        ('páginas anterior', lambda: legacy_page_chunking(text, len(text))),
+        ('páginas marcadores', lambda: engine._page_chunking(text, page_config)[0]),
+        ('varredura única', lambda: engine.scan_boundaries(text))
+    ]
+
+    outputs = {}
+    for name, run in runs:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            outputs[name] = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:19s} {best * 1000 / size_mb:7.1f}ms/MB ({size_mb / best:6.1f}MB/s)")
+
+    boundaries = outputs['varredura única']
+    print(f"Cabeçalhos: {len(boundaries['headers'])} | marcadores de página: {len(boundaries['page_markers'])}")
+    for kind, new in (('semântico', 'scanner'), ('páginas', 'marcadores')):
+        before, after = outputs[f'{kind} anterior'], outputs[f'{kind} {new}']
+        print(f"Chunks {kind}: {len(before)} antes, {len(after)} depois, "
+              f"idênticos: {'✅' if before == after else '❌'}")
+
+def create_sample_corpus(documents: int, seed: int = 42):
+    """Gera documentos sintéticos curtos (1 a 8KB), determinísticos"""
+    rng = random.Random(seed)
+    return [create_sample_text(rng.randint(1, 8) / 1024, seed=seed + i) for i in range(documents)]
+
+def benchmark_corpus_workers(texts, strategy: str, worker_counts) -> None:
+    """Mede chunks/s do chunk_corpus por número de processos"""
+    size_mb = sum(len(text) for text in texts) / (1024 * 1024)
+    print(f"\n🏭 Corpus de {len(texts)} documentos ({size_mb:.1f}MB, {strategy}) em pool de processos")
+    print("-" * 60)
+
+    engine = ChunkingEngine()
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        chunks = sum(len(batch) for _, batch in engine.chunk_corpus(texts, strategy, max_workers=workers))
+        elapsed = time.perf_counter() - start
+        rate = chunks / elapsed
+        baseline = baseline or rate
+        print(f"{workers:2d} workers {elapsed:7.2f}s | {rate:9.0f} chunks/s | {len(texts) / elapsed:8.0f} docs/s "
+              f"| {rate / baseline:4.1f}x")
+
+def benchmark_sentence_segmenter(text: str, repeats: int) -> None:
+    """Compara a regex de fim de frase anterior com o segmentador pt-BR (abreviações, valores, itens)"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🔤 Segmentação de frases sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    runs = [
+        ('anterior', lambda: legacy_sentence_spans(text)),
+        ('segmentador', lambda: [text[start:end] for start, end in segment_sentences(text)])
+    ]
+    outputs = {}
+    for name, run in runs:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            outputs[name] = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:12s} {best:6.2f}s ({size_mb / best:6.1f}MB/s) | {len(outputs[name])} frases")
+
+    abbreviation_cut = re.compile(r'\b(?:Sr|Dra|art|S\.A)\.$')
+    for name, sentences in outputs.items():
+        wrong = sum(1 for sentence in sentences if abbreviation_cut.search(sentence))
+        print(f"{name:12s} frases cortadas em abreviação: {wrong}")
+
+def benchmark_token_counting(text: str, strategy: str, repeats: int) -> None:
+    """Compara token_count exato (tokenização do documento) com o aproximado (caracteres por token)"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🔢 Contagem de tokens ({strategy}) sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    tokenizer = get_tokenizer()
+    if not tokenizer:
+        print("⚠️ Tokenizer indisponível: sem referência exata para medir o erro")
+        return
+
+    counter = get_approximate_counter(sample=text)
+    print(f"Calibração: {counter.chars_per_token:.2f} caracteres/token, "
+          f"erro máximo em trechos de 400 caracteres {counter.relative_error:.1%}")
+
+    outputs = {}
+    for name, approximate in (('exato', False), ('aproximado', True)):
+        engine = ChunkingEngine(approximate_tokens=approximate)
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            outputs[name] = engine.create_chunks(text, strategy)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:11s} {best:6.2f}s ({size_mb / best:6.1f}MB/s) | "
+              f"{sum(chunk['token_count'] for chunk in outputs[name])} tokens")
+
+    errors = sorted(
+        abs(approximate['token_count'] - exact['token_count']) / exact['token_count']
+        for exact, approximate in zip(outputs['exato'], outputs['aproximado']) if exact['token_count']
+    )
+    within_bound = sum(
+        counter.upper_bound(exact['text']) >= exact['token_count'] for exact in outputs['exato']
+    ) / len(outputs['exato'])
+    print(f"Erro por chunk: médio {sum(errors) / len(errors):.1%}, p95 {errors[int(len(errors) * 0.95)]:.1%}, "
+          f"máximo {errors[-1]:.1%} | upper_bound ≥ exato em {within_bound:.1%} dos chunks")
+
+def traced_bytes(build):
+    """Memória retida pelo resultado de build() (tracemalloc), e o resultado"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+def benchmark_chunk_memory(text: str, strategy: str, embedding_dim: int = 384) -> None:
+    """Compara a memória por chunk de dicts, registros com __slots__ e colunas NumPy"""
+    size_mb = len(text) / (1024 * 1024)
+    print(f"\n🧠 Memória por chunk ({strategy}) sobre {size_mb:.1f}MB")
+    print("-" * 60)
+
+    chunks = ChunkingEngine().create_chunks(text, strategy)
+    spans = [(chunk.start_char, chunk.end_char, chunk.token_count, chunk.overlap_with_previous) for chunk in chunks]
+    count = len(spans)
+
+    # Cada representação fatia os textos de novo, para contar as strings que ela retém
+    runs = [
+        ('dict', lambda: [
+            {'text': text[start:end], 'chunk_id': f"{strategy}_{i}", 'size': end - start,
+             'token_count': tokens, 'overlap_with_previous': overlap, 'strategy': strategy,
+             'position': i, 'start_char': start, 'end_char': end}
+            for i, (start, end, tokens, overlap) in enumerate(spans)
+        ]),
+        ('Chunk (__slots__)', lambda: [
+            Chunk(text[start:end], strategy, i, tokens, overlap, start, end)
+            for i, (start, end, tokens, overlap) in enumerate(spans)
+        ]),
+        ('ChunkBatch', lambda: ChunkBatch.from_chunks(text, strategy, chunks))
+    ]
+    for name, build in runs:
+        retained, _ = traced_bytes(build)
+        print(f"{name:19s} {retained / count:8.1f} bytes/chunk ({retained / (1024 * 1024):7.1f}MB)")
+
+    # Chunks armazenados: embedding em lista de floats (antes) ou array float32 (StoredChunk)
+    vectors = np.random.RandomState(0).rand(count, embedding_dim).astype(np.float32)
+    source, timestamp = 'documento.txt', datetime.now().isoformat()
+    stored_runs = [
+        ('dict + list[float]', lambda: [
+            {'text': text[start:end], 'embedding': vectors[i].tolist(), 'source': source,
+             'chunk_id': f"{source}_{i}", 'timestamp': datetime.now().isoformat()}
+            for i, (start, end, _, _) in enumerate(spans)
+        ]),
+        ('StoredChunk', lambda: [
+            StoredChunk(text[start:end], vectors[i].tolist(), source, i, timestamp)
+            for i, (start, end, _, _) in enumerate(spans)
+        ])
+    ]
+    print(f"Armazenados (embedding de {embedding_dim} dimensões):")
+    for name, build in stored_runs:
+        retained, _ = traced_bytes(build)
+        print(f"{name:19s} {retained / count:8.1f} bytes/chunk ({retained / (1024 * 1024):7.1f}MB)")
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do motor de chunking (estratégias, memória e tokens)")
+    parser.add_argument('--size-mb', type=float, default=50, help="Tamanho do texto sintético")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Tamanho máximo do chunk")
+    parser.add_argument('--chunk-overlap', type=int, default=100, help="Overlap entre chunks")
+    parser.add_argument('--repeats', type=int, default=3, help="Execuções por implementação (melhor tempo)")
+    parser.add_argument('--structure-mb', type=float, default=10,
+                        help="Tamanho do texto com cabeçalhos e páginas para o scanner de estrutura")
+    parser.add_argument('--metrics-mb', type=float, default=2,
+                        help="Tamanho do texto para a comparação de overlap (a busca é quadrática)")
+    parser.add_argument('--memory-mb', type=float, default=10, help="Tamanho do texto para a memória por chunk")
+    parser.add_argument('--corpus-docs', type=int, default=20000,
+                        help="Documentos do corpus para o chunking em pool de processos")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help="Maior número de processos medido no chunking do corpus")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    text = create_sample_text(args.size_mb)
+    benchmark_recursive(text, args.chunk_size, args.chunk_overlap, args.repeats)
+
+    structured_text = create_sample_text(args.structure_mb, structured=True)
+    benchmark_structure_scan(structured_text, args.repeats)
+
+    benchmark_semantic(structured_text)
+    benchmark_multi_strategy(structured_text, ['recursive_500_100', 'token_400_50', 'semantic_auto', 'page_based'])
+
+    metrics_text = create_sample_text(args.metrics_mb)
+    benchmark_overlap_metrics(metrics_text, 'recursive', 1000, 200)
+
+    memory_text = create_sample_text(args.memory_mb)
+    benchmark_chunk_memory(memory_text, 'recursive_500_100')
+
+    legal_text = create_corpus(args.structure_mb, header_rate=0.15, page_rate=0.05, long_paragraph_rate=0.1)
+    benchmark_sentence_segmenter(legal_text, args.repeats)
+    benchmark_token_counting(legal_text, 'recursive_500_100', args.repeats)
+
+    worker_counts = sorted({1, args.max_workers} | {2 ** n for n in range(args.max_workers.bit_length())
+                                                     if 2 ** n <= args.max_workers})
+    benchmark_corpus_workers(create_sample_corpus(args.corpus_docs), 'recursive_500_100', worker_counts)
+
+if __name__ == "__main__":
+    sys.exit(main())
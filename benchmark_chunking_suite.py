@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Suíte de Benchmark de Chunking - Chunking Engine
+Mede tempo, chunks/s e pico de memória de cada estratégia do config.yaml sobre corpora
+sintéticos determinísticos em português, e grava os resultados em JSON para comparar commits
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+import yaml
+
+from chunking_engine import ChunkingEngine, get_tokenizer
+
+SUBJECTS = [
+    "O colaborador", "A gestora da área", "O Sr. Almeida", "A Dra. Souza", "O departamento pessoal",
+    "A empresa", "O comitê de ética", "A equipe de RH", "O prestador de serviços", "A diretoria"
+]
+
+ACTIONS = [
+    "deve solicitar as férias com 30 dias de antecedência",
+    "tem direito ao reembolso de até R$ 1.250,00 por mês",
+    "precisa apresentar a nota fiscal em até 15 dias úteis",
+    "pode dividir o período aquisitivo em até 3 partes",
+    "recebe o vale-refeição no quinto dia útil",
+    "compensa as horas extras no banco de horas",
+    "segue o disposto no art. 7º da convenção coletiva",
+    "registra a jornada no sistema de ponto eletrônico",
+    "aprova as despesas de viagem acima de R$ 500,00",
+    "comunica afastamentos médicos em até 48 horas"
+]
+
+CONDITIONS = [
+    "conforme a política interna", "nos termos do contrato de trabalho", "salvo acordo em contrário",
+    "após aprovação do gestor direto", "de acordo com a legislação vigente", "sem prejuízo do salário",
+    "mediante justificativa por escrito", "no prazo estabelecido pelo RH"
+]
+
+HEADERS = [
+    "CAPÍTULO {n}",
+    "## Seção {n} - Benefícios",
+    "{n}. POLÍTICA DE FÉRIAS",
+    "DISPOSIÇÕES GERAIS:",
+    "REEMBOLSO DE DESPESAS",
+    "Art. {n}º - Da Jornada de Trabalho"
+]
+
+PAGE_MARKERS = ["--- Página {n} ---", "[Página {n}]", "Page {n}", "\f"]
+
+# Estrutura de cada corpus: probabilidade por parágrafo de cabeçalho, marcador de página e parágrafo longo
+CORPUS_PROFILES = {
+    'plano': {'header_rate': 0.0, 'page_rate': 0.0, 'long_paragraph_rate': 0.05},
+    'estruturado': {'header_rate': 0.15, 'page_rate': 0.05, 'long_paragraph_rate': 0.1},
+    'paragrafos_longos': {'header_rate': 0.02, 'page_rate': 0.01, 'long_paragraph_rate': 0.6}
+}
+
+# Piora relativa (chunks/s ou pico de memória) a partir da qual --compare acusa regressão
+REGRESSION_THRESHOLD = 0.15
+
+def create_corpus(size_mb: float, header_rate: float, page_rate: float,
+                  long_paragraph_rate: float, seed: int = 42) -> str:
+    """
+    Gera um corpus sintético em português, determinístico para o mesmo seed
+
+    Args:
+        size_mb: Tamanho aproximado em MB (caracteres)
+        header_rate: Probabilidade de um cabeçalho de seção antes de cada parágrafo
+        page_rate: Probabilidade de um marcador de página antes de cada parágrafo
+        long_paragraph_rate: Probabilidade de um parágrafo longo (20 a 60 frases, sem quebras)
+
+    Returns:
+        str: Texto do corpus
+    """
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    total = 0
+    page = 1
+
+    while total < target:
+        if rng.random() < header_rate:
+            parts.append(rng.choice(HEADERS).format(n=len(parts)))
+        if rng.random() < page_rate:
+            page += 1
+            parts.append(rng.choice(PAGE_MARKERS).format(n=page))
+
+        long_paragraph = rng.random() < long_paragraph_rate
+        count = rng.randint(20, 60) if long_paragraph else rng.randint(1, 6)
+        sentences = [
+            f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)}, {rng.choice(CONDITIONS)}{rng.choice('..!?')}"
+            for _ in range(count)
+        ]
+        if long_paragraph or rng.random() < 0.6:
+            block = " ".join(sentences)
+        else:
+            block = "\n".join(f"- {sentence}" for sentence in sentences)
+
+        parts.append(block)
+        total += len(block) + 2
+
+    return "\n\n".join(parts)
+
+def load_strategies(config_path: str) -> dict:
+    """Estratégias de chunking do config.yaml"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)['chunking_strategies']
+
+def git_commit() -> str:
+    """Commit atual do repositório (None fora de um repositório git)"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def measure_strategy(engine: ChunkingEngine, text: str, strategy: str, repeats: int) -> dict:
+    """
+    Mede uma estratégia sobre um texto: pico de memória (tracemalloc, em uma execução
+    separada, que também aquece caches) e melhor/médio tempo das execuções cronometradas
+    (com o coletor de lixo desligado, como no timeit, para reduzir o ruído)
+    """
+    tracemalloc.start()
+    chunks = engine.create_chunks(text, strategy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeats):
+        chunks = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            chunks = engine.create_chunks(text, strategy)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    best = min(times)
+    size_mb = len(text) / (1024 * 1024)
+    return {
+        'chunks': len(chunks),
+        'best_seconds': round(best, 6),
+        'mean_seconds': round(sum(times) / len(times), 6),
+        'mb_per_second': round(size_mb / best, 3),
+        'chunks_per_second': round(len(chunks) / best, 1),
+        'peak_memory_mb': round(peak / (1024 * 1024), 3),
+        'avg_chunk_size': round(sum(chunk['size'] for chunk in chunks) / len(chunks), 1) if chunks else 0
+    }
+
+def run_suite(strategies: dict, profiles: dict, size_mb: float, repeats: int, seed: int) -> dict:
+    """Executa todas as estratégias sobre todos os corpora e devolve os resultados com metadados"""
+    engine = ChunkingEngine(strategies)
+    results = []
+
+    for corpus_name, profile in profiles.items():
+        text = create_corpus(size_mb, seed=seed, **profile)
+        print(f"\n📚 Corpus {corpus_name} ({len(text) / (1024 * 1024):.1f}MB)")
+        print("-" * 78)
+
+        for strategy, config in strategies.items():
+            result = {'corpus': corpus_name, 'strategy': strategy, 'type': config.get('type'),
+                      'size_chars': len(text)}
+            result.update(measure_strategy(engine, text, strategy, repeats))
+            results.append(result)
+            print(f"{strategy:20s} {result['best_seconds']:7.3f}s | {result['mb_per_second']:7.1f}MB/s | "
+                  f"{result['chunks_per_second']:9.0f} chunks/s | pico {result['peak_memory_mb']:7.1f}MB | "
+                  f"{result['chunks']} chunks")
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'tokenizer': get_tokenizer() is not None,
+            'size_mb': size_mb,
+            'repeats': repeats,
+            'seed': seed,
+            'profiles': profiles
+        },
+        'results': results
+    }
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> int:
+    """
+    Compara os resultados com os de outra execução (mesmo corpus e estratégia)
+
+    Returns:
+        int: Número de regressões (chunks/s ou pico de memória piores que threshold)
+    """
+    previous = {(r['corpus'], r['strategy']): r for r in baseline['results']}
+    print(f"\n📈 Comparação com {baseline['metadata'].get('commit') or 'execução anterior'} "
+          f"(limite {threshold:.0%})")
+    print("-" * 78)
+
+    regressions = 0
+    for result in current['results']:
+        before = previous.get((result['corpus'], result['strategy']))
+        if not before:
+            continue
+
+        speed = result['chunks_per_second'] / before['chunks_per_second'] - 1 if before['chunks_per_second'] else 0
+        memory = result['peak_memory_mb'] / before['peak_memory_mb'] - 1 if before['peak_memory_mb'] else 0
+        regressed = speed < -threshold or memory > threshold
+        regressions += regressed
+        print(f"{'⚠️' if regressed else '✅'} {result['corpus']:18s} {result['strategy']:20s} "
+              f"chunks/s {speed:+7.1%} | pico de memória {memory:+7.1%}")
+
+    print(f"Regressões: {regressions}")
+    return regressions
+
+def main():
+    """Função principal da suíte"""
+    parser = argparse.ArgumentParser(description="Suíte de benchmark das estratégias de chunking")
+    parser.add_argument('--config', default='config.yaml', help="Arquivo com chunking_strategies")
+    parser.add_argument('--strategies', nargs='+', help="Estratégias a medir (padrão: todas do config)")
+    parser.add_argument('--profiles', nargs='+', choices=sorted(CORPUS_PROFILES),
+                        default=list(CORPUS_PROFILES), help="Corpora sintéticos a gerar")
+    parser.add_argument('--size-mb', type=float, default=2, help="Tamanho de cada corpus")
+    parser.add_argument('--header-rate', type=float, help="Corpus personalizado: taxa de cabeçalhos")
+    parser.add_argument('--page-rate', type=float, help="Corpus personalizado: taxa de marcadores de página")
+    parser.add_argument('--long-paragraph-rate', type=float, help="Corpus personalizado: taxa de parágrafos longos")
+    parser.add_argument('--repeats', type=int, default=5, help="Execuções cronometradas (melhor tempo)")
+    parser.add_argument('--seed', type=int, default=42, help="Semente dos corpora")
+    parser.add_argument('--output', default='chunking_benchmark.json', help="Arquivo JSON de resultados")
+    parser.add_argument('--compare', help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Piora relativa considerada regressão")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    strategies = load_strategies(args.config)
+    if args.strategies:
+        unknown = [strategy for strategy in args.strategies if strategy not in strategies]
+        if unknown:
+            parser.error(f"estratégias não encontradas em {args.config}: {', '.join(unknown)}")
+        strategies = {strategy: strategies[strategy] for strategy in args.strategies}
+
+    profiles = {name: CORPUS_PROFILES[name] for name in args.profiles}
+    custom = {'header_rate': args.header_rate, 'page_rate': args.page_rate,
+              'long_paragraph_rate': args.long_paragraph_rate}
+    if any(rate is not None for rate in custom.values()):
+        profiles = {'personalizado': {key: rate or 0.0 for key, rate in custom.items()}}
+
+    report = run_suite(strategies, profiles, args.size_mb, args.repeats, args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        return 1 if compare_results(report, baseline, args.threshold) else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
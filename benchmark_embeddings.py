@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Embeddings - Embedding Generator
+Compara a geração texto a texto (batch_size=1) com a geração em lotes, contra um
+servidor local que imita a API de embeddings da OpenAI e contra o modelo local, e
+mede a re-indexação com o cache persistente de embeddings
+"""
+
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+import urllib.request
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from chunking_engine import ChunkingEngine
+from embedding_cache import EmbeddingCache
+from embedding_generator import EmbeddingGenerator
+from benchmark_chunking_suite import create_corpus, load_strategies
+
+class StandInEmbeddingHandler(BaseHTTPRequestHandler):
+    """
+    POST /v1/embeddings no formato da OpenAI: cada requisição custa latency_ms mais
+    per_text_ms por texto (rede + modelo) e devolve vetores determinísticos por texto
+    """
+
+    latency_ms = 50.0
+    per_text_ms = 0.5
+    dimensions = 1536
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        texts = payload['input'] if isinstance(payload['input'], list) else [payload['input']]
+        time.sleep((self.latency_ms + self.per_text_ms * len(texts)) / 1000)
+
+        data = []
+        for i, text in enumerate(texts):
+            seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+            vector = np.random.RandomState(seed).normal(0, 1, self.dimensions)
+            data.append({'object': 'embedding', 'index': i, 'embedding': (vector / np.linalg.norm(vector)).tolist()})
+
+        body = json.dumps({'object': 'list', 'data': data, 'model': payload.get('model')}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StandInClient:
+    """Cliente com a interface openai.Embedding.create usada pelo EmbeddingGenerator, via HTTP"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.Embedding = self
+        self.requests = 0
+
+    def create(self, input, model):
+        request = urllib.request.Request(
+            f"{self.base_url}/v1/embeddings",
+            data=json.dumps({'input': input, 'model': model}).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request) as response:
+            self.requests += 1
+            return json.loads(response.read())
+
+def create_chunk_texts(num_texts: int) -> list:
+    """Textos de chunks reais (recursive_500_100) de um corpus sintético"""
+    engine = ChunkingEngine(load_strategies(Path(__file__).parent / 'config.yaml'))
+    texts = []
+    seed = 0
+    while len(texts) < num_texts:
+        corpus = create_corpus(0.5, header_rate=0.15, page_rate=0.05, long_paragraph_rate=0.1, seed=seed)
+        texts.extend(chunk['text'] for chunk in engine.create_chunks(corpus, 'recursive_500_100'))
+        seed += 1
+    return texts[:num_texts]
+
+def start_stand_in_server(latency_ms: float, per_text_ms: float) -> ThreadingHTTPServer:
+    """Inicia o servidor local de embeddings em uma thread"""
+    StandInEmbeddingHandler.latency_ms = latency_ms
+    StandInEmbeddingHandler.per_text_ms = per_text_ms
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInEmbeddingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def create_api_generator(server: ThreadingHTTPServer, batch_size: int, cache: EmbeddingCache = None):
+    """EmbeddingGenerator OpenAI apontado para o servidor local"""
+    generator = EmbeddingGenerator(provider='fallback', batch_size=batch_size, cache=cache)
+    generator.provider = 'openai'
+    generator.client = StandInClient(f"http://127.0.0.1:{server.server_address[1]}")
+    return generator
+
+def benchmark_api(texts: list, batch_sizes: list, latency_ms: float, per_text_ms: float) -> None:
+    """Geração via API (servidor local) com diferentes batch_size"""
+    server = start_stand_in_server(latency_ms, per_text_ms)
+
+    print(f"\n🌐 API de embeddings local: {len(texts)} textos, {latency_ms:.0f}ms por requisição "
+          f"+ {per_text_ms}ms por texto")
+    print("-" * 78)
+
+    try:
+        baseline = None
+        reference = None
+        for batch_size in batch_sizes:
+            generator = create_api_generator(server, batch_size)
+
+            start = time.perf_counter()
+            embeddings = generator.generate_embeddings(texts)
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            reference = reference or embeddings
+            print(f"batch_size={batch_size:<5d} {generator.client.requests:5d} requisições | {elapsed:7.2f}s | "
+                  f"{len(texts) / elapsed:8.1f} textos/s | {baseline / elapsed:6.1f}x | "
+                  f"idênticos: {'✅' if embeddings == reference else '❌'}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def benchmark_reindex(texts: list, batch_size: int, latency_ms: float, per_text_ms: float) -> None:
+    """Re-indexação com o cache persistente: indexação inicial, reinício e corpus com textos novos"""
+    server = start_stand_in_server(latency_ms, per_text_ms)
+    changed = texts[:len(texts) * 9 // 10] + [f"{text} (revisado)" for text in texts[len(texts) * 9 // 10:]]
+
+    print(f"\n🗄️ Cache persistente de embeddings: {len(texts)} textos, batch_size={batch_size}")
+    print("-" * 78)
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_directory:
+            runs = [('Indexação inicial', texts), ('Reinício, corpus inalterado', texts),
+                    ('Reinício, 10% dos textos novos', changed)]
+            for name, run_texts in runs:
+                # Cada execução abre o cache do zero, como um novo processo
+                cache = EmbeddingCache(cache_directory)
+                generator = create_api_generator(server, batch_size, cache)
+
+                start = time.perf_counter()
+                generator.generate_embeddings(run_texts)
+                elapsed = time.perf_counter() - start
+
+                stats = cache.get_stats()
+                cache.close()
+                print(f"{name:32s} {generator.client.requests:4d} requisições | {elapsed:7.3f}s | "
+                      f"hit rate {stats['hit_rate']:6.1%} | {stats['entries']} entradas, {stats['size_mb']:.1f}MB")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def benchmark_local_model(texts: list, model: str, batch_sizes: list, repeats: int) -> None:
+    """Geração com o modelo sentence-transformers local com diferentes batch_size"""
+    print(f"\n🧠 Modelo local {model}: {len(texts)} textos")
+    print("-" * 78)
+
+    generator = EmbeddingGenerator(provider='local', model=model)
+    if generator.provider != 'local':
+        print("⚠️ sentence-transformers ou o modelo não estão disponíveis; benchmark do modelo local ignorado")
+        return
+
+    baseline = None
+    reference = None
+    for batch_size in batch_sizes:
+        generator.batch_size = batch_size
+        times = []
+        for _ in range(repeats):
+            generator.embedding_cache.clear()
+            start = time.perf_counter()
+            embeddings = np.asarray(generator.generate_embeddings(texts), dtype=np.float32)
+            times.append(time.perf_counter() - start)
+
+        best = min(times)
+        baseline = baseline or best
+        reference = embeddings if reference is None else reference
+        print(f"batch_size={batch_size:<5d} {best:7.2f}s | {len(texts) / best:8.1f} textos/s | "
+              f"{baseline / best:6.1f}x | iguais: {'✅' if np.allclose(embeddings, reference, atol=1e-4) else '❌'}")
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da geração de embeddings em lotes")
+    parser.add_argument('--texts', type=int, default=500, help="Número de chunks embedados")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 64, 256],
+                        help="Valores de batch_size medidos (o primeiro é a referência)")
+    parser.add_argument('--latency-ms', type=float, default=50, help="Latência por requisição do servidor local")
+    parser.add_argument('--per-text-ms', type=float, default=0.5, help="Custo por texto no servidor local")
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help="Modelo sentence-transformers local")
+    parser.add_argument('--repeats', type=int, default=3, help="Execuções no modelo local (melhor tempo)")
+    args = parser.parse_args()
+
+    # Silencia também os erros esperados de inicialização (gerador reconfigurado para o servidor local)
+    logging.disable(logging.ERROR)
+
+    texts = create_chunk_texts(args.texts)
+    benchmark_api(texts, args.batch_sizes, args.latency_ms, args.per_text_ms)
+    benchmark_reindex(texts, args.batch_sizes[-1], args.latency_ms, args.per_text_ms)
+    benchmark_local_model(texts, args.model, args.batch_sizes, args.repeats)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
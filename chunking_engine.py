@@ -3,23 +3,214 @@ Chunking Engine - Motor de Segmentação
 Implementa múltiplas estratégias de chunking com métricas
 """
 
+import os
 import re
+import bisect
 import logging
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from collections.abc import Mapping
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from sentence_segmenter import iter_sentence_boundaries, segment_sentences
+from extraction_pool import START_METHOD
+from token_counter import get_tokenizer, get_approximate_counter
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class ChunkMetrics:
-    """Métricas de um chunk"""
-    chunk_id: str
-    size: int
-    token_count: int
-    overlap_with_previous: int
-    semantic_score: float = 0.0
+# Separadores do chunking recursivo, em ordem de prioridade (depois deles: corte por caracteres);
+# fins de frase vêm do segmentador de frases (abreviações como "Sr." e "art." não cortam)
+RECURSIVE_SEPARATORS = ('\n\n', '\n', iter_sentence_boundaries, ' ')
+
+# Cabeçalho de seção no início de linha: Markdown, seção numerada, SEÇÃO/CAPÍTULO N,
+# "TÍTULO:" e linhas curtas (6 a 49 caracteres) em maiúsculas (sem minúsculas latinas
+# e com ao menos uma maiúscula)
+SECTION_HEADER_PATTERN = (
+    r'[ \t]*(?:'
+    r'#{1,6}[ \t]'
+    r'|\d+\.[ \t]+[A-Z]'
+    r'|SEÇÃO[ \t]+\d'
+    r'|CAPÍTULO[ \t]+\d'
+    r'|[A-Z][A-Z \t]+:[ \t\r]*$'
+    r'|(?=[^\n]*[A-ZÀ-Þ])[^\sa-zß-ÿ][^\n\fa-zß-ÿ]{4,47}[^\sa-zß-ÿ][ \t\r]*$'
+    r')'
+)
+FIRST_LINE_HEADER = re.compile(SECTION_HEADER_PATTERN, re.MULTILINE)
+
+# Cabeçalhos (após '\n') e marcadores de página em uma única varredura do texto. Toda
+# alternativa começa por um caractere literal fora do grupo, o que permite ao re saltar
+# direto para as posições candidatas; o grupo nomeado identifica o tipo encontrado.
+STRUCTURE_SCANNER = re.compile(
+    r'\n(?P<header>' + SECTION_HEADER_PATTERN + r')'
+    r'|-(?P<page_dashes>-- Página \d+ ---)'
+    r'|\[(?P<page_brackets>Página \d+\])'
+    r'|P(?P<page_english>age \d+)'
+    r'|\f(?P<page_form_feed>)',
+    re.MULTILINE
+)
+
+# Tipos de marcador de página em ordem de prioridade (vale o primeiro presente no texto)
+PAGE_MARKER_KINDS = ('page_dashes', 'page_brackets', 'page_english', 'page_form_feed')
+
+# Marcadores de página sozinhos, para o chunking por páginas (sem o custo de buscar cabeçalhos)
+PAGE_MARKER_PATTERNS = {
+    'page_dashes': re.compile(r'--- Página \d+ ---'),
+    'page_brackets': re.compile(r'\[Página \d+\]'),
+    'page_english': re.compile(r'Page \d+'),
+    'page_form_feed': re.compile(r'\f')
+}
+
+# Texto novo acumulado pelo create_chunks_iter antes de cada rodada de chunking
+STREAM_BUFFER_SIZE = 1024 * 1024
+
+# Bytes de continuação UTF-8 (não iniciam caractere), para converter offsets de bytes em caracteres
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# Threads do encode em lote do tiktoken (create_chunks_batch)
+TOKENIZER_BATCH_THREADS = 8
+
+# Caracteres por tarefa do chunk_corpus: documentos pequenos são agrupados para diluir o custo de IPC
+CORPUS_TASK_CHARS = 256 * 1024
+
+# Tarefas em andamento por worker no chunk_corpus (limita os documentos em memória)
+CORPUS_TASKS_PER_WORKER = 2
+
+class RecordMapping(Mapping):
+    """
+    Base de registros com __slots__ acessíveis como dict somente leitura
+    (record['text'], record.get('page_number'), dict(record)), para compatibilidade
+    com o código que trata chunks como dicts
+    """
+    __slots__ = ()
+    
+    # Chaves do dict, em ordem; as opcionais são omitidas quando valem None
+    _fields: Tuple[str, ...] = ()
+    _optional: Tuple[str, ...] = ()
+    
+    def __getitem__(self, key: str):
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is not None or key not in self._optional:
+                return value
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self._fields if key not in self._optional or getattr(self, key) is not None)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+    
+    def to_dict(self) -> Dict:
+        """Cópia do registro como dict"""
+        return dict(self)
+
+class Chunk(RecordMapping):
+    """Chunk com métricas, em __slots__ (sem dict nem chunk_id armazenado por chunk)"""
+    __slots__ = ('text', 'strategy', 'position', 'size', 'token_count', 'overlap_with_previous',
+                 'start_char', 'end_char', 'page_number', 'section')
+    
+    _fields = ('text', 'chunk_id', 'size', 'token_count', 'overlap_with_previous', 'strategy', 'position',
+               'start_char', 'end_char', 'page_number', 'section')
+    _optional = ('start_char', 'end_char', 'page_number', 'section')
+    
+    def __init__(self, text: str, strategy: str, position: int, token_count: int,
+                 overlap_with_previous: int = 0, start_char: int = None, end_char: int = None,
+                 page_number: int = None, section: str = None):
+        self.text = text
+        self.strategy = strategy
+        self.position = position
+        self.size = len(text)
+        self.token_count = token_count
+        self.overlap_with_previous = overlap_with_previous
+        self.start_char = start_char
+        self.end_char = end_char
+        self.page_number = page_number
+        self.section = section
+    
+    @property
+    def chunk_id(self) -> str:
+        """Identificador do chunk (estratégia e posição)"""
+        return f"{self.strategy}_{self.position}"
+
+class ChunkBatch:
+    """
+    Chunks de um documento em colunas: offsets e métricas em arrays NumPy sobre o
+    texto de origem, sem uma string nem um objeto por chunk. Os chunks (Chunk,
+    acessíveis como dict) são montados sob demanda em batch[i] e na iteração.
+    """
+    __slots__ = ('source_text', 'strategy', 'start_char', 'end_char', 'token_count',
+                 'overlap_with_previous', 'page_number')
+    
+    def __init__(self, source_text: str, strategy: str, start_char: np.ndarray, end_char: np.ndarray,
+                 token_count: np.ndarray, overlap_with_previous: np.ndarray,
+                 page_number: Optional[np.ndarray] = None):
+        self.source_text = source_text
+        self.strategy = strategy
+        self.start_char = start_char
+        self.end_char = end_char
+        self.token_count = token_count
+        self.overlap_with_previous = overlap_with_previous
+        self.page_number = page_number  # -1: chunk sem página
+    
+    @classmethod
+    def from_chunks(cls, source_text: str, strategy: str, chunks: List[Mapping]) -> 'ChunkBatch':
+        """
+        Converte chunks com start_char/end_char em colunas
+        
+        Args:
+            source_text: Texto segmentado (cada chunk é source_text[start_char:end_char])
+            strategy: Nome da estratégia
+            chunks: Chunks de create_chunks
+            
+        Returns:
+            ChunkBatch: Chunks em colunas
+        """
+        count = len(chunks)
+        column = lambda key, dtype: np.fromiter((chunk[key] for chunk in chunks), dtype=dtype, count=count)
+        
+        page_number = None
+        if any('page_number' in chunk for chunk in chunks):
+            page_number = np.fromiter((chunk.get('page_number', -1) for chunk in chunks), dtype=np.int32, count=count)
+        
+        return cls(source_text, strategy, column('start_char', np.int64), column('end_char', np.int64),
+                   column('token_count', np.int32), column('overlap_with_previous', np.int32), page_number)
+    
+    def __len__(self) -> int:
+        return len(self.start_char)
+    
+    def __getitem__(self, position: int) -> Chunk:
+        if position < 0:
+            position += len(self)
+        start, end = int(self.start_char[position]), int(self.end_char[position])
+        page_number = None
+        if self.page_number is not None and self.page_number[position] >= 0:
+            page_number = int(self.page_number[position])
+        
+        return Chunk(self.source_text[start:end], self.strategy, position, int(self.token_count[position]),
+                     int(self.overlap_with_previous[position]), start, end, page_number)
+    
+    def __iter__(self) -> Iterator[Chunk]:
+        return (self[position] for position in range(len(self)))
+    
+    def text(self, position: int) -> str:
+        """Texto de um chunk (fatiado do texto de origem)"""
+        return self.source_text[int(self.start_char[position]):int(self.end_char[position])]
+    
+    def to_dicts(self) -> List[Dict]:
+        """Chunks como dicts (formato de create_chunks)"""
+        return [chunk.to_dict() for chunk in self]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes das colunas numéricas (sem o texto de origem, que é compartilhado)"""
+        columns = [self.start_char, self.end_char, self.token_count, self.overlap_with_previous, self.page_number]
+        return sum(column.nbytes for column in columns if column is not None)
 
 class ChunkingEngine:
     """
@@ -27,11 +218,24 @@ class ChunkingEngine:
     Suporta chunking recursivo, por tokens, semântico e por páginas
     """
     
-    def __init__(self, strategies_config: Dict = None):
-        """Inicializa o motor de chunking"""
+    def __init__(self, strategies_config: Dict = None, verify_overlap: bool = False,
+                 embedding_generator=None, approximate_tokens: bool = False):
+        """
+        Inicializa o motor de chunking
+        
+        Args:
+            strategies_config: Estratégias de chunking (chunking_strategies do config.yaml)
+            verify_overlap: Recalcula o overlap por busca de substring (resultado anterior)
+                            e registra divergências com o overlap gravado na construção
+            embedding_generator: EmbeddingGenerator do chunking semântico (criado sob demanda se None)
+            approximate_tokens: token_count estimado por caracteres (token_counter), sem tokenizar
+                                o documento; o chunking por tokens continua exato
+        """
         self.strategies_config = strategies_config or self._get_default_config()
-        self.tokenizer = None
-        self._initialize_tokenizer()
+        self.verify_overlap = verify_overlap
+        self.embedding_generator = embedding_generator
+        self.approximate_tokens = approximate_tokens
+        self._tokenizer = None
         logger.info("🔧 Chunking Engine inicializado")
     
     def _get_default_config(self) -> Dict:
@@ -58,21 +262,68 @@ class ChunkingEngine:
             }
         }
     
-    def _initialize_tokenizer(self):
-        """Inicializa tokenizer para contagem de tokens"""
-        try:
-            import tiktoken
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-        except Exception as e:
-            logger.warning(f"⚠️ Erro inicializando tokenizer: {e}")
+    @property
+    def tokenizer(self):
+        """Tokenizer compartilhado pelo processo, carregado no primeiro uso (None se indisponível)"""
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer()
+        return self._tokenizer
+    
+    def tokenize(self, text: str) -> Optional[List[int]]:
+        """
+        Tokeniza um documento para create_chunks (None sem tokenizer)
+        
+        Args:
+            text: Texto do documento
+            
+        Returns:
+            Optional[List[int]]: Ids dos tokens
+        """
+        if not self.tokenizer:
+            return None
+        return self.tokenizer.encode_ordinary(text)
+    
+    def create_chunks_batch(self, texts: List[str], strategy: str = 'recursive_500_100',
+                            offset_maps: List[Dict] = None,
+                            num_threads: int = TOKENIZER_BATCH_THREADS) -> List[List[Dict]]:
+        """
+        Cria chunks de vários documentos, tokenizados juntos pelo encode em lote do tiktoken
+        
+        Args:
+            texts: Textos dos documentos
+            strategy: Nome da estratégia
+            offset_maps: Mapas de páginas/seções por documento (opcional)
+            num_threads: Threads do encode em lote
+            
+        Returns:
+            List[List[Dict]]: Chunks de cada documento, na ordem de texts
+        """
+        exact_tokens = not self.approximate_tokens or self.strategies_config.get(strategy, {}).get('type') == 'token'
+        if exact_tokens and self.tokenizer:
+            token_lists = self.tokenizer.encode_ordinary_batch(texts, num_threads=num_threads)
+        else:
+            token_lists = [None] * len(texts)
+        
+        offset_maps = offset_maps or [None] * len(texts)
+        return [
+            self.create_chunks(text, strategy, offset_map, tokens)
+            for text, offset_map, tokens in zip(texts, offset_maps, token_lists)
+        ]
     
-    def create_chunks(self, text: str, strategy: str = 'recursive_500_100') -> List[Dict]:
+    def create_chunks(self, text: str, strategy: str = 'recursive_500_100',
+                      offset_map: Dict = None, tokens: List[int] = None) -> List[Dict]:
         """
         Cria chunks usando estratégia especificada
         
+        O documento é tokenizado uma única vez: o chunking por tokens corta a lista de
+        ids e as contagens de tokens dos chunks vêm da mesma tokenização.
+        
         Args:
             text: Texto para segmentar
             strategy: Nome da estratégia
+            offset_map: Mapa de páginas/seções de DocumentProcessor.extract_text (opcional);
+                        permite chunking por páginas sem reprocessar marcadores
+            tokens: Ids dos tokens de text, se já tokenizado (tokenize/create_chunks_batch)
             
         Returns:
             List[Dict]: Lista de chunks com metadados
@@ -85,261 +336,846 @@ class ChunkingEngine:
         
         logger.info(f"📝 Criando chunks com estratégia: {strategy}")
         
+        chunks_with_metrics = self._build_chunks(text, strategy, config, offset_map, tokens)
+        
+        logger.info(f"✅ Criados {len(chunks_with_metrics)} chunks")
+        return chunks_with_metrics
+
+    def create_chunk_batch(self, text: str, strategy: str = 'recursive_500_100',
+                           offset_map: Dict = None, tokens: List[int] = None) -> ChunkBatch:
+        """
+        Cria chunks como create_chunks, em representação de colunas (ChunkBatch)
+
+        Para corpora grandes: guarda só offsets e métricas em arrays NumPy sobre o
+        texto do documento, sem uma string e um registro por chunk.
+
+        Args:
+            text: Texto para segmentar
+            strategy: Nome da estratégia
+            offset_map: Mapa de páginas/seções de DocumentProcessor.extract_text (opcional)
+            tokens: Ids dos tokens de text, se já tokenizado
+
+        Returns:
+            ChunkBatch: Chunks em colunas (batch[i] e a iteração montam cada Chunk)
+        """
+        chunks = self.create_chunks(text, strategy, offset_map, tokens)
+        strategy = chunks[0].strategy if chunks else strategy
+        return ChunkBatch.from_chunks(text, strategy, chunks)
+
+    def chunk_corpus(self, texts: Iterable[str], strategy: str = 'recursive_500_100',
+                     max_workers: int = None, ordered: bool = True,
+                     task_chars: int = CORPUS_TASK_CHARS) -> Iterator[Tuple[int, ChunkBatch]]:
+        """
+        Segmenta um corpus em um pool de processos, um ChunkBatch por documento
+
+        Cada worker cria seu próprio ChunkingEngine (tokenizer carregado uma vez por
+        processo) e recebe grupos de documentos de até task_chars caracteres. Os
+        textos são consumidos sob demanda: no máximo CORPUS_TASKS_PER_WORKER tarefas
+        por worker ficam em andamento. Os workers devolvem só as colunas de cada
+        ChunkBatch; o texto do documento não volta pelo pipe.
+
+        Args:
+            texts: Textos dos documentos
+            strategy: Nome da estratégia
+            max_workers: Número de processos (padrão: os.cpu_count(); 1 segmenta no próprio processo)
+            ordered: Entrega na ordem de texts (True) ou à medida que ficam prontos (False)
+            task_chars: Caracteres por tarefa enviada a um worker
+
+        Yields:
+            Tuple[int, ChunkBatch]: Posição do documento em texts e seus chunks
+        """
+        if strategy not in self.strategies_config:
+            logger.warning(f"⚠️ Estratégia {strategy} não encontrada, usando padrão")
+            strategy = 'recursive_500_100'
+
+        max_workers = max(1, max_workers or os.cpu_count() or 1)
+        logger.info(f"📝 Criando chunks do corpus com estratégia: {strategy} ({max_workers} processos)")
+
+        documents = 0
+        chunks = 0
+        if max_workers == 1:
+            config = self.strategies_config[strategy]
+            for index, text in enumerate(texts):
+                batch = ChunkBatch.from_chunks(text, strategy, self._build_chunks(text, strategy, config))
+                documents += 1
+                chunks += len(batch)
+                yield index, batch
+        else:
+            for index, batch in self._chunk_corpus_parallel(texts, strategy, max_workers, ordered, task_chars):
+                documents += 1
+                chunks += len(batch)
+                yield index, batch
+
+        logger.info(f"✅ Criados {chunks} chunks de {documents} documentos")
+
+    def _chunk_corpus_parallel(self, texts: Iterable[str], strategy: str, max_workers: int,
+                               ordered: bool, task_chars: int) -> Iterator[Tuple[int, ChunkBatch]]:
+        """Distribui grupos de documentos entre os workers e devolve os ChunkBatch (ver chunk_corpus)"""
+        tasks = self._iter_corpus_tasks(texts, task_chars)
+        pending_texts = {}  # Documentos enviados e ainda não entregues
+        completed = {}  # Modo ordenado: ChunkBatch prontos à espera dos anteriores
+        next_index = 0
+        in_flight = set()
+        exhausted = False
+
+        # Mesmo método de início do pool de extração: nunca fork de um processo com threads
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(START_METHOD),
+                                 initializer=_init_corpus_worker,
+                                 initargs=(self.strategies_config, self.approximate_tokens)) as executor:
+            while True:
+                while not exhausted and len(in_flight) < max_workers * CORPUS_TASKS_PER_WORKER:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    for index, text in task:
+                        pending_texts[index] = text
+                    in_flight.add(executor.submit(_chunk_corpus_task, task, strategy))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for index, batch in future.result():
+                        batch.source_text = pending_texts.pop(index)
+                        if not ordered:
+                            yield index, batch
+                        else:
+                            completed[index] = batch
+
+                while next_index in completed:
+                    yield next_index, completed.pop(next_index)
+                    next_index += 1
+
+    @staticmethod
+    def _iter_corpus_tasks(texts: Iterable[str], task_chars: int) -> Iterator[List[Tuple[int, str]]]:
+        """Agrupa (index, texto) em tarefas de até task_chars caracteres (ou um documento maior)"""
+        task = []
+        task_size = 0
+        for index, text in enumerate(texts):
+            task.append((index, text))
+            task_size += len(text)
+            if task_size >= task_chars:
+                yield task
+                task = []
+                task_size = 0
+        if task:
+            yield task
+
+    def create_chunks_iter(self, blocks: Iterable[Union[str, Mapping]], strategy: str = 'recursive_500_100',
+                           buffer_size: int = STREAM_BUFFER_SIZE) -> Iterator[Dict]:
+        """
+        Cria chunks de um texto recebido em blocos, sob demanda
+        
+        Blocos de texto (str) são acumulados até buffer_size caracteres novos e então
+        segmentados; todos os chunks menos o último são emitidos, e o texto a partir do
+        último (que pode continuar no próximo bloco) fica como sobra para a rodada seguinte.
+        Em memória ficam só a sobra (até buffer_size) e os blocos novos, nunca o texto inteiro.
+        
+        Registros de página (dicts de DocumentProcessor.iter_pages: 'text', 'page_number',
+        'char_offset' e, opcionalmente, 'section') são segmentados um a um: nenhum chunk
+        atravessa o limite de uma página, e cada chunk recebe o page_number e a section
+        do seu registro.
+        
+        Args:
+            blocks: Blocos de texto consecutivos ou registros de página
+            strategy: Nome da estratégia (recursive, token, semantic ou page)
+            buffer_size: Caracteres novos por rodada de chunking
+            
+        Yields:
+            Dict: Chunks com os mesmos metadados de create_chunks; start_char/end_char
+                  são relativos ao texto completo (concatenação dos blocos, ou o conteúdo
+                  de extract_text para registros com char_offset)
+        """
+        if strategy not in self.strategies_config:
+            logger.warning(f"⚠️ Estratégia {strategy} não encontrada, usando padrão")
+            strategy = 'recursive_500_100'
+        
+        config = self.strategies_config.get(strategy)
+        logger.info(f"📝 Criando chunks em fluxo com estratégia: {strategy}")
+        
+        pending = []  # Blocos de texto ainda não segmentados
+        pending_size = 0
+        carry = ''  # Texto a partir do último chunk da rodada anterior
+        carry_offset = 0  # Posição de carry no texto completo
+        position = 0
+        previous_end = 0
+        
+        def emit(chunks: List[Chunk], text_offset: int, page: Mapping = None) -> Iterator[Chunk]:
+            """Converte os chunks de uma rodada para o texto completo e os numera"""
+            nonlocal position, previous_end
+            for chunk in chunks:
+                chunk.start_char += text_offset
+                chunk.end_char += text_offset
+                chunk.overlap_with_previous = max(0, previous_end - chunk.start_char) if position else 0
+                chunk.position = position
+                if page is not None:
+                    chunk.page_number = page.get('page_number')
+                    chunk.section = page.get('section')
+                previous_end = chunk.end_char
+                position += 1
+                yield chunk
+        
+        blocks = iter(blocks)
+        exhausted = False
+        
+        while not exhausted:
+            block = next(blocks, None)
+            page = None
+            if block is None:
+                exhausted = True
+            elif isinstance(block, Mapping):
+                page = block
+            elif block:
+                pending.append(block)
+                pending_size += len(block)
+            
+            if not exhausted and page is None and pending_size < buffer_size:
+                continue
+            
+            # Fim do fluxo ou início de página: o texto acumulado termina aqui
+            final = exhausted or page is not None
+            if carry or pending:
+                text = carry + ''.join(pending)
+                text_offset = carry_offset
+                pending = []
+                pending_size = 0
+                carry = ''
+                carry_offset = text_offset + len(text)
+                chunks = self._build_chunks(text, strategy, config)
+                
+                # O último chunk pode continuar no próximo bloco: volta para a sobra, a menos
+                # que já passe de buffer_size (ex.: página sem quebra por tamanho), quando é
+                # emitido como está para a sobra não crescer sem limite
+                if not final and chunks:
+                    last = chunks[-1]
+                    cut = last['end_char'] if len(text) - last['start_char'] > buffer_size else last['start_char']
+                    if cut == last['start_char']:
+                        chunks.pop()
+                    carry = text[cut:]
+                    carry_offset = text_offset + cut
+                
+                yield from emit(chunks, text_offset)
+            
+            if page is not None:
+                page_offset = page.get('char_offset', carry_offset)
+                yield from emit(self._build_chunks(page['text'], strategy, config), page_offset, page)
+                carry_offset = page_offset + len(page['text'])
+        
+        logger.info(f"✅ Criados {position} chunks")
+    
+    def create_chunks_multi(self, text: str, strategies: List[str] = None,
+                            offset_map: Dict = None, tokens: List[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Cria chunks com várias estratégias sobre o mesmo documento (ex.: testes A/B)
+        
+        O pré-processamento caro do documento (tokenização, cabeçalhos e marcadores de
+        página, frases e distâncias entre embeddings de frases) é feito uma única vez
+        e compartilhado por todas as estratégias.
+        
+        Args:
+            text: Texto para segmentar
+            strategies: Nomes das estratégias (padrão: todas as configuradas)
+            offset_map: Mapa de páginas/seções de DocumentProcessor.extract_text (opcional)
+            tokens: Ids dos tokens de text, se já tokenizado
+            
+        Returns:
+            Dict[str, List[Dict]]: Chunks de cada estratégia
+        """
+        strategies = strategies or list(self.strategies_config)
+        unknown = [strategy for strategy in strategies if strategy not in self.strategies_config]
+        if unknown:
+            raise ValueError(f"Estratégias não encontradas: {', '.join(unknown)}")
+        
+        logger.info(f"📝 Criando chunks com {len(strategies)} estratégias: {', '.join(strategies)}")
+        
+        shared = {}
+        results = {
+            strategy: self._build_chunks(text, strategy, self.strategies_config[strategy],
+                                         offset_map, tokens, shared)
+            for strategy in strategies
+        }
+        
+        logger.info(f"✅ Criados {sum(len(chunks) for chunks in results.values())} chunks")
+        return results
+    
+    def _build_chunks(self, text: str, strategy: str, config: Dict, offset_map: Dict = None,
+                      tokens: List[int] = None, shared: Dict = None) -> List[Dict]:
+        """
+        Segmenta o texto com a configuração da estratégia e calcula as métricas
+        
+        shared guarda o pré-processamento do documento entre estratégias (create_chunks_multi)
+        """
         chunk_type = config['type']
+        extras = None
+        shared = {} if shared is None else shared
+        
+        # Tokenização única do documento e início (em caracteres) de cada token; com
+        # approximate_tokens, só o chunking por tokens tokeniza
+        token_starts = None
+        if (chunk_type == 'token' or not self.approximate_tokens) and self.tokenizer:
+            token_starts = self._shared(shared, 'token_starts', lambda: self._token_starts(
+                tokens if tokens is not None else self.tokenizer.encode_ordinary(text)
+            ))
         
         if chunk_type == 'recursive':
-            chunks = self._recursive_chunking(text, config)
+            chunks, extras = self._recursive_chunking(text, config)
         elif chunk_type == 'token':
-            chunks = self._token_chunking(text, config)
+            chunks, extras = self._token_chunking(text, config, token_starts)
         elif chunk_type == 'semantic':
-            chunks = self._semantic_chunking(text, config)
+            chunks, extras = self._semantic_chunking(text, config, shared)
+        elif chunk_type == 'page' and offset_map and len(offset_map.get('pages') or []) > 1:
+            # Mapa de página única (TXT, MD, DOCX) não diz nada: detectar marcadores no texto
+            chunks, extras = self._page_chunking_from_map(text, offset_map['pages'], config)
         elif chunk_type == 'page':
-            chunks = self._page_chunking(text, config)
+            chunks, extras = self._page_chunking(text, config, shared)
         else:
             raise ValueError(f"Tipo de chunking não suportado: {chunk_type}")
         
-        # Adicionar métricas
-        chunks_with_metrics = self._calculate_metrics(chunks, strategy)
+        # Página de cada chunk a partir do seu offset no texto
+        if extras and offset_map and offset_map.get('pages'):
+            self._assign_pages(extras, offset_map['pages'])
         
-        logger.info(f"✅ Criados {len(chunks_with_metrics)} chunks")
-        return chunks_with_metrics
+        token_counts = None
+        if self.approximate_tokens and chunk_type != 'token':
+            counter = get_approximate_counter(sample=text)
+            token_counts = [counter.count(chunk) for chunk in chunks]
+        elif token_starts is not None:
+            token_counts = self._count_chunk_tokens(chunks, extras, token_starts)
+        
+        # Adicionar métricas
+        return self._calculate_metrics(chunks, strategy, extras, token_counts)
+    
+    @staticmethod
+    def _shared(shared: Dict, key, compute):
+        """Pré-processamento do documento calculado na primeira estratégia que o usa"""
+        if key not in shared:
+            shared[key] = compute()
+        return shared[key]
     
-    def _recursive_chunking(self, text: str, config: Dict) -> List[str]:
-        """Chunking recursivo que preserva estrutura natural"""
+    def _recursive_chunking(self, text: str, config: Dict) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking recursivo que preserva estrutura natural
+        
+        Trabalha sobre intervalos (start, end) do texto original: cada nível de
+        separador percorre só as partes que excedem chunk_size, e o texto só é
+        fatiado ao emitir o chunk. O overlap estende o início do chunk para
+        dentro do anterior, de modo que todo chunk é exatamente text[start:end].
+        
+        Returns:
+            Tuple[List[str], List[Dict]]: Textos, intervalos (start_char, end_char) e overlap dos chunks
+        """
         chunk_size = config.get('chunk_size', 500)
         chunk_overlap = config.get('chunk_overlap', 100)
         
-        # Separadores em ordem de prioridade
-        separators = ['\n\n', '\n', '. ', ' ', '']
+        spans = []
+        self._pack_spans(text, 0, len(text), chunk_size, 0, spans)
         
         chunks = []
-        current_chunk = ""
+        extras = []
+        previous = None
+        
+        for start, end in spans:
+            chunk_start = start
+            if previous and chunk_overlap > 0:
+                # Final do chunk anterior (inteiro, se for menor que o overlap)
+                chunk_start = max(previous[0], previous[1] - chunk_overlap)
+            
+            chunks.append(text[chunk_start:end])
+            extras.append({
+                'start_char': chunk_start,
+                'end_char': end,
+                'overlap_with_previous': previous[1] - chunk_start if previous else 0
+            })
+            previous = (start, end)
+        
+        return chunks, extras
+    
+    def _pack_spans(self, text: str, start: int, end: int, chunk_size: int,
+                    level: int, spans: List[Tuple[int, int]]):
+        """
+        Agrupa as partes de text[start:end] delimitadas pelo separador do nível em
+        intervalos de até chunk_size; partes maiores descem para o próximo separador
+        """
+        if level == len(RECURSIVE_SEPARATORS):
+            # Nenhum separador disponível: dividir por caracteres
+            for position in range(start, end, chunk_size):
+                self._emit_span(text, position, min(position + chunk_size, end), spans)
+            return
         
-        # Dividir texto por parágrafos primeiro
-        paragraphs = text.split('\n\n')
+        chunk_start = chunk_end = None
+        part_start = start
+        boundaries = self._iter_separators(text, RECURSIVE_SEPARATORS[level], start, end)
         
-        for paragraph in paragraphs:
-            # Se parágrafo cabe no chunk atual
-            if len(current_chunk) + len(paragraph) <= chunk_size:
-                current_chunk += paragraph + '\n\n'
+        while True:
+            part_end, next_start = next(boundaries, (end, None))
+            
+            if chunk_start is not None and part_end - chunk_start <= chunk_size:
+                chunk_end = part_end
             else:
-                # Salvar chunk atual se não estiver vazio
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
+                if chunk_start is not None:
+                    self._emit_span(text, chunk_start, chunk_end, spans)
+                    chunk_start = None
                 
-                # Se parágrafo é muito grande, dividir recursivamente
-                if len(paragraph) > chunk_size:
-                    sub_chunks = self._split_text_recursively(
-                        paragraph, chunk_size, separators
-                    )
-                    chunks.extend(sub_chunks)
-                    current_chunk = ""
+                if part_end - part_start > chunk_size:
+                    self._pack_spans(text, part_start, part_end, chunk_size, level + 1, spans)
                 else:
-                    current_chunk = paragraph + '\n\n'
+                    chunk_start, chunk_end = part_start, part_end
+            
+            if next_start is None:
+                break
+            part_start = next_start
         
-        # Adicionar último chunk se não estiver vazio
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        if chunk_start is not None:
+            self._emit_span(text, chunk_start, chunk_end, spans)
+    
+    @staticmethod
+    def _iter_separators(text: str, separator, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """
+        Ocorrências de um separador de RECURSIVE_SEPARATORS em text[start:end]: fim da
+        parte anterior e início da seguinte. De um separador em texto, a parte não-branca
+        fica na parte anterior; um separador chamável devolve as fronteiras ele mesmo
+        """
+        if callable(separator):
+            yield from separator(text, start, end)
+            return
         
-        # Aplicar overlap
-        if chunk_overlap > 0:
-            chunks = self._apply_overlap(chunks, chunk_overlap)
+        kept = len(separator.rstrip())
+        position = text.find(separator, start, end)
+        while position != -1:
+            yield position + kept, position + len(separator)
+            position = text.find(separator, position + len(separator), end)
+    
+    @staticmethod
+    def _emit_span(text: str, start: int, end: int, spans: List[Tuple[int, int]]):
+        """Registra um intervalo sem os espaços das pontas (intervalos vazios são descartados)"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
+    
+    @staticmethod
+    def _assign_pages(extras: List[Dict], pages: List[Dict]):
+        """Define page_number de cada chunk pela página que contém seu início"""
+        page_starts = [page['start'] for page in pages]
         
-        return chunks
+        for extra in extras:
+            if 'page_number' in extra or 'start_char' not in extra:
+                continue
+            index = max(0, bisect.bisect_right(page_starts, extra['start_char']) - 1)
+            extra['page_number'] = pages[index]['page_number']
     
-    def _split_text_recursively(self, text: str, chunk_size: int, separators: List[str]) -> List[str]:
-        """Divide texto recursivamente usando separadores"""
-        if len(text) <= chunk_size:
-            return [text]
+    def _token_chunking(self, text: str, config: Dict,
+                        token_starts: List[int] = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking baseado em contagem de tokens
         
-        # Tentar cada separador
-        for separator in separators:
-            if separator in text:
-                parts = text.split(separator)
-                
-                chunks = []
-                current_chunk = ""
-                
-                for part in parts:
-                    if len(current_chunk) + len(part) + len(separator) <= chunk_size:
-                        current_chunk += part + separator
-                    else:
-                        if current_chunk:
-                            chunks.append(current_chunk.rstrip(separator))
-                        
-                        if len(part) > chunk_size:
-                            # Recursão para partes muito grandes
-                            sub_chunks = self._split_text_recursively(
-                                part, chunk_size, separators[1:]
-                            )
-                            chunks.extend(sub_chunks)
-                            current_chunk = ""
-                        else:
-                            current_chunk = part + separator
-                
-                if current_chunk:
-                    chunks.append(current_chunk.rstrip(separator))
-                
-                return [chunk for chunk in chunks if chunk.strip()]
+        Janelas de chunk_size tokens sobre a tokenização do documento; o texto de cada
+        chunk é fatiado do original pelos offsets dos tokens, sem decodificar.
         
-        # Se nenhum separador funcionar, dividir por caracteres
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-    
-    def _token_chunking(self, text: str, config: Dict) -> List[str]:
-        """Chunking baseado em contagem de tokens"""
+        Returns:
+            Tuple[List[str], List[Dict]]: Textos, intervalos e overlap (em caracteres) dos chunks
+        """
         chunk_size = config.get('chunk_size', 400)
         chunk_overlap = config.get('chunk_overlap', 50)
+        # Overlap >= chunk_size não avança a janela: o resto do documento seria descartado
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) deve ser menor que chunk_size ({chunk_size})")
         
-        if not self.tokenizer:
+        if token_starts is None:
             logger.warning("⚠️ Tokenizer não disponível, usando chunking por caracteres")
             return self._character_chunking(text, chunk_size * 4, chunk_overlap * 4)
         
-        # Tokenizar texto completo
-        tokens = self.tokenizer.encode(text)
-        
         chunks = []
+        extras = []
         start_idx = 0
+        previous_end = 0
+        num_tokens = len(token_starts)
         
-        while start_idx < len(tokens):
-            end_idx = min(start_idx + chunk_size, len(tokens))
+        while start_idx < num_tokens:
+            end_idx = min(start_idx + chunk_size, num_tokens)
             
-            # Extrair tokens do chunk
-            chunk_tokens = tokens[start_idx:end_idx]
+            # Intervalo de caracteres dos tokens do chunk
+            start_char = token_starts[start_idx]
+            end_char = token_starts[end_idx] if end_idx < num_tokens else len(text)
+            chunks.append(text[start_char:end_char])
             
-            # Decodificar de volta para texto
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-            chunks.append(chunk_text)
+            extras.append({
+                'start_char': start_char,
+                'end_char': end_char,
+                'overlap_with_previous': max(0, previous_end - start_char)
+            })
+            previous_end = end_char
             
             # Aplicar overlap
             start_idx = end_idx - chunk_overlap
             
-            if start_idx >= end_idx:
+            if start_idx >= end_idx or end_idx == num_tokens:
                 break
         
-        return chunks
+        return chunks, extras
     
-    def _semantic_chunking(self, text: str, config: Dict) -> List[str]:
-        """Chunking semântico baseado em significado"""
-        # Implementação simplificada - dividir por tópicos/seções
+    def _token_starts(self, tokens: List[int]) -> List[int]:
+        """Offset em caracteres do início de cada token no texto tokenizado"""
+        starts = []
+        position = 0
         
-        # Detectar cabeçalhos e seções
-        lines = text.split('\n')
-        chunks = []
-        current_chunk = ""
-        
-        for line in lines:
-            # Detectar início de nova seção
-            if self._is_section_header(line):
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = line + '\n'
+        for token_bytes in self.tokenizer.decode_tokens_bytes(tokens):
+            # Token que começa no meio de um caractere multibyte pertence a esse caractere
+            starts.append(position - (position > 0 and 0x80 <= token_bytes[0] < 0xC0))
+            # Caracteres = bytes que não são de continuação UTF-8
+            position += len(token_bytes.translate(None, UTF8_CONTINUATION_BYTES))
+        
+        return starts
+    
+    def _count_chunk_tokens(self, chunks: List[str], extras: Optional[List[Dict]],
+                            token_starts: List[int]) -> List[int]:
+        """
+        Conta os tokens de cada chunk
+        
+        Chunks com intervalo (start_char, end_char) usam a tokenização do documento
+        (tokens que intersectam o intervalo); os demais são tokenizados em um único lote.
+        """
+        if not extras or 'start_char' not in extras[0]:
+            return [len(tokens) for tokens in self.tokenizer.encode_ordinary_batch(chunks)]
+        
+        counts = []
+        for extra in extras:
+            first = max(0, bisect.bisect_right(token_starts, extra['start_char']) - 1)
+            counts.append(bisect.bisect_left(token_starts, extra['end_char']) - first)
+        return counts
+    
+    def scan_boundaries(self, text: str) -> Dict:
+        """
+        Encontra cabeçalhos de seção e marcadores de página em uma única varredura
+        
+        Args:
+            text: Texto do documento
+            
+        Returns:
+            Dict: 'headers' (offset do início de cada linha de cabeçalho) e
+                  'page_markers' (intervalos do tipo de marcador de maior prioridade presente)
+        """
+        headers = [0] if FIRST_LINE_HEADER.match(text) else []
+        markers = {kind: [] for kind in PAGE_MARKER_KINDS}
+        
+        for match in STRUCTURE_SCANNER.finditer(text):
+            if match.lastgroup == 'header':
+                headers.append(match.start() + 1)
             else:
-                current_chunk += line + '\n'
-                
-                # Verificar se chunk está muito grande
-                max_size = config.get('max_chunk_size', 1000)
-                if len(current_chunk) > max_size:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
-    
-    def _page_chunking(self, text: str, config: Dict) -> List[str]:
-        """Chunking por páginas (detecta marcadores de página)"""
-        # Detectar marcadores de página
-        page_markers = [
-            r'--- Página \d+ ---',
-            r'\[Página \d+\]',
-            r'Page \d+',
-            r'\f'  # Form feed
-        ]
+                markers[match.lastgroup].append(match.span())
         
-        chunks = []
+        page_markers = next((markers[kind] for kind in PAGE_MARKER_KINDS if markers[kind]), [])
+        return {'headers': headers, 'page_markers': page_markers}
+    
+    @staticmethod
+    def scan_page_markers(text: str) -> List[Tuple[int, int]]:
+        """
+        Encontra só os marcadores de página (intervalos do tipo de maior prioridade presente)
         
-        # Tentar detectar páginas
-        for marker_pattern in page_markers:
-            if re.search(marker_pattern, text):
-                pages = re.split(marker_pattern, text)
-                chunks = [page.strip() for page in pages if page.strip()]
-                break
+        Cada tipo é buscado com o seu padrão, na ordem de prioridade, até o primeiro
+        presente no texto; bem mais barato que scan_boundaries quando os cabeçalhos
+        não são necessários.
+        """
+        for kind in PAGE_MARKER_KINDS:
+            spans = [match.span() for match in PAGE_MARKER_PATTERNS[kind].finditer(text)]
+            if spans:
+                return spans
+        return []
+    
+    def _semantic_chunking(self, text: str, config: Dict,
+                           shared: Dict = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking semântico baseado em significado
+        
+        Divide o texto em frases, gera embeddings em lotes e corta nos picos da distância
+        de cosseno entre janelas de frases adjacentes (acima do percentil breakpoint_percentile),
+        respeitando min_chunk_size/max_chunk_size. Cabeçalhos de seção também são pontos de corte.
+        Com embeddings: false na estratégia, divide apenas por cabeçalhos (_section_chunking).
+        
+        Returns:
+            Tuple[List[str], List[Dict]]: Textos e intervalos (start_char, end_char) dos chunks
+        """
+        if not config.get('embeddings', True):
+            return self._section_chunking(text, config, shared)
+        
+        max_size = config.get('max_chunk_size', 1000)
+        min_size = config.get('min_chunk_size', 200)
+        window = config.get('window_size', 2)
+        shared = {} if shared is None else shared
+        
+        sentences = self._shared(shared, 'sentences', lambda: segment_sentences(text))
+        if len(sentences) < 2:
+            spans = []
+            for start, end in sentences:
+                self._pack_spans(text, start, end, max_size, 0, spans)
+            return self._spans_to_chunks(text, spans)
+        
+        distances = self._shared(shared, ('distances', window), lambda: self._window_distances(
+            text, sentences, window, config.get('batch_size', 256)
+        ))
+        
+        # Picos locais acima do percentil; cabeçalhos de seção sempre são candidatos
+        threshold = np.percentile(distances, config.get('breakpoint_percentile', 90))
+        padded = np.concatenate(([-np.inf], distances, [-np.inf]))
+        peaks = (distances >= threshold) & (distances >= padded[:-2]) & (distances >= padded[2:])
+        headers = self._shared(shared, 'boundaries', lambda: self.scan_boundaries(text))['headers']
+        cuts = peaks | self._header_breaks(sentences, headers)
+        
+        spans = []
+        chunk_start = None
+        chunk_end = None
+        
+        for i, (start, end) in enumerate(sentences):
+            # Frase maior que max_size: dividida pelos separadores do chunking recursivo
+            if end - start > max_size:
+                if chunk_start is not None:
+                    spans.append((chunk_start, chunk_end))
+                    chunk_start = None
+                self._pack_spans(text, start, end, max_size, 0, spans)
+                continue
+            
+            if chunk_start is not None and end - chunk_start > max_size:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = None
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+            
+            if i < len(cuts) and cuts[i] and chunk_end - chunk_start >= min_size:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = None
+        
+        if chunk_start is not None:
+            # Resto menor que min_size volta para o chunk anterior, se couber
+            if spans and chunk_end - chunk_start < min_size and chunk_end - spans[-1][0] <= max_size:
+                chunk_start = spans.pop()[0]
+            spans.append((chunk_start, chunk_end))
+        
+        return self._spans_to_chunks(text, spans)
+    
+    def _window_distances(self, text: str, sentences: List[Tuple[int, int]],
+                          window: int, batch_size: int) -> np.ndarray:
+        """
+        Distância de cosseno entre as janelas de frases antes e depois de cada fronteira
+        
+        distances[b] compara a soma dos embeddings das frases b-window+1..b com a das
+        frases b+1..b+window. Os embeddings são gerados em lotes de batch_size e só as
+        linhas ainda necessárias ficam em memória; cada lote é uma operação NumPy.
+        """
+        if self.embedding_generator is None:
+            from embedding_generator import EmbeddingGenerator
+            self.embedding_generator = EmbeddingGenerator()
+        
+        window = max(1, window)
+        num_sentences = len(sentences)
+        distances = np.zeros(num_sentences - 1, dtype=np.float32)
+        rows = None
+        base = 0  # Índice da frase na primeira linha de rows
+        next_boundary = 0
+        
+        for batch_start in range(0, num_sentences, batch_size):
+            batch = sentences[batch_start:batch_start + batch_size]
+            embeddings = self.embedding_generator.generate_embedding_matrix(
+                [text[start:end] for start, end in batch]
+            )
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+            rows = embeddings if rows is None else np.vstack([rows, embeddings])
+            top = batch_start + len(batch)
+            
+            # Última fronteira cuja janela seguinte já está disponível
+            last_boundary = num_sentences - 2 if top == num_sentences else top - 1 - window
+            if last_boundary < next_boundary:
+                continue
+            
+            # cumulative[k] = soma das linhas base..base+k-1
+            cumulative = np.vstack([np.zeros((1, rows.shape[1]), dtype=np.float32), np.cumsum(rows, axis=0)])
+            boundary = np.arange(next_boundary, last_boundary + 1)
+            split = boundary + 1 - base
+            left = cumulative[split] - cumulative[np.maximum(boundary + 1 - window, base) - base]
+            right = cumulative[np.minimum(boundary + 1 + window, top) - base] - cumulative[split]
+            
+            similarity = np.einsum('ij,ij->i', left, right) / np.maximum(
+                np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1), 1e-12
+            )
+            distances[next_boundary:last_boundary + 1] = 1.0 - similarity
+            
+            next_boundary = last_boundary + 1
+            new_base = max(0, next_boundary - window + 1)
+            rows = rows[new_base - base:]
+            base = new_base
+        
+        return distances
+    
+    @staticmethod
+    def _header_breaks(sentences: List[Tuple[int, int]], headers: List[int]) -> np.ndarray:
+        """Fronteiras entre frases (índice da frase anterior) onde começa um cabeçalho de seção"""
+        breaks = np.zeros(len(sentences) - 1, dtype=bool)
+        if not headers:
+            return breaks
+        
+        starts = np.fromiter((start for start, _ in sentences), dtype=np.int64, count=len(sentences))
+        # Primeira frase que começa na linha do cabeçalho ou depois dela
+        following = np.searchsorted(starts, np.asarray(headers, dtype=np.int64))
+        following = following[(following > 0) & (following < len(sentences))]
+        breaks[following - 1] = True
+        return breaks
+    
+    def _section_chunking(self, text: str, config: Dict,
+                          shared: Dict = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking por seções (semântico sem embeddings)
+        
+        Cada cabeçalho de seção inicia um chunk; seções maiores que max_chunk_size
+        são fechadas no fim da linha que ultrapassa o limite.
+        
+        Returns:
+            Tuple[List[str], List[Dict]]: Textos e intervalos (start_char, end_char) dos chunks
+        """
+        # Implementação simplificada - dividir por tópicos/seções
+        max_size = config.get('max_chunk_size', 1000)
+        boundaries = self._shared({} if shared is None else shared, 'boundaries',
+                                  lambda: self.scan_boundaries(text))
+        
+        section_starts = boundaries['headers']
+        if not section_starts or section_starts[0] != 0:
+            section_starts = [0] + section_starts
+        section_ends = section_starts[1:] + [len(text)]
+        
+        spans = []
+        for section_start, section_end in zip(section_starts, section_ends):
+            start = section_start
+            while start < section_end:
+                # Fim da linha que leva o chunk além de max_size
+                newline = text.find('\n', start + max_size, section_end)
+                end = section_end if newline == -1 else newline
+                self._emit_span(text, start, end, spans)
+                start = end + 1
+        
+        return self._spans_to_chunks(text, spans)
+    
+    def _page_chunking(self, text: str, config: Dict,
+                       shared: Dict = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking por páginas (detecta marcadores de página)
+        
+        Páginas maiores que chunk_size são divididas por tamanho, como o texto sem marcadores
+        
+        Returns:
+            Tuple[List[str], List[Dict]]: Textos e intervalos (start_char, end_char) dos chunks
+        """
+        chunk_size = config.get('chunk_size', 2000)
+        shared = {} if shared is None else shared
+        if 'boundaries' in shared:
+            # Varredura completa já feita por outra estratégia (create_chunks_multi)
+            page_markers = shared['boundaries']['page_markers']
+        else:
+            page_markers = self._shared(shared, 'page_markers', lambda: self.scan_page_markers(text))
         
         # Se não encontrar marcadores, dividir por tamanho
-        if not chunks:
-            chunk_size = config.get('chunk_size', 2000)
-            chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+        if not page_markers:
+            spans = [(i, min(i + chunk_size, len(text))) for i in range(0, len(text), chunk_size)]
+            return self._spans_to_chunks(text, spans)
         
-        return chunks
+        # Texto entre marcadores consecutivos
+        spans = []
+        page_start = 0
+        for marker_start, marker_end in page_markers:
+            self._emit_page(text, page_start, marker_start, chunk_size, spans)
+            page_start = marker_end
+        self._emit_page(text, page_start, len(text), chunk_size, spans)
+        
+        return self._spans_to_chunks(text, spans)
+    
+    @classmethod
+    def _emit_page(cls, text: str, start: int, end: int, chunk_size: int, spans: List[Tuple[int, int]]):
+        """Registra uma página sem os espaços das pontas, dividida em partes de até chunk_size"""
+        page = []
+        cls._emit_span(text, start, end, page)
+        for page_start, page_end in page:
+            spans.extend((position, min(position + chunk_size, page_end))
+                         for position in range(page_start, page_end, chunk_size))
+    
+    @staticmethod
+    def _spans_to_chunks(text: str, spans: List[Tuple[int, int]]) -> Tuple[List[str], List[Dict]]:
+        """Fatia os intervalos do texto em chunks sem overlap"""
+        chunks = [text[start:end] for start, end in spans]
+        extras = [{'start_char': start, 'end_char': end} for start, end in spans]
+        return chunks, extras
+    
+    def _page_chunking_from_map(self, text: str, pages: List[Dict],
+                                config: Dict) -> Tuple[List[str], List[Dict]]:
+        """
+        Chunking por páginas usando os intervalos já conhecidos (sem busca de marcadores)
+        
+        Páginas maiores que chunk_size são divididas como em _page_chunking
+        """
+        chunk_size = config.get('chunk_size', 2000)
+        chunks = []
+        extras = []
+        
+        for page in pages:
+            spans = []
+            self._emit_page(text, page['start'], page['end'], chunk_size, spans)
+            for start, end in spans:
+                chunks.append(text[start:end])
+                extras.append({
+                    'page_number': page['page_number'],
+                    'start_char': start,
+                    'end_char': end
+                })
+        
+        return chunks, extras
     
-    def _character_chunking(self, text: str, chunk_size: int, overlap: int) -> List[str]:
-        """Chunking simples por caracteres"""
+    def _character_chunking(self, text: str, chunk_size: int, overlap: int) -> Tuple[List[str], List[Dict]]:
+        """Chunking simples por caracteres (extras: intervalos e overlap de cada chunk)"""
+        if overlap >= chunk_size:
+            raise ValueError(f"Overlap ({overlap}) deve ser menor que o tamanho do chunk ({chunk_size})")
+        
         chunks = []
+        extras = []
         start = 0
+        previous_end = 0
         
         while start < len(text):
-            end = start + chunk_size
+            end = min(start + chunk_size, len(text))
             chunk = text[start:end]
             chunks.append(chunk)
+            extras.append({
+                'start_char': start,
+                'end_char': end,
+                'overlap_with_previous': max(0, previous_end - start)
+            })
+            previous_end = end
             start = end - overlap
             
-            if start >= end:
+            if start >= end or end == len(text):
                 break
         
-        return chunks
+        return chunks, extras
     
-    def _apply_overlap(self, chunks: List[str], overlap_size: int) -> List[str]:
-        """Aplica overlap entre chunks"""
-        if len(chunks) <= 1 or overlap_size <= 0:
-            return chunks
-        
-        overlapped_chunks = [chunks[0]]
-        
-        for i in range(1, len(chunks)):
-            prev_chunk = chunks[i-1]
-            current_chunk = chunks[i]
-            
-            # Pegar final do chunk anterior
-            overlap_text = prev_chunk[-overlap_size:] if len(prev_chunk) > overlap_size else prev_chunk
-            
-            # Combinar com início do chunk atual
-            combined_chunk = overlap_text + ' ' + current_chunk
-            overlapped_chunks.append(combined_chunk)
-        
-        return overlapped_chunks
-    
-    def _is_section_header(self, line: str) -> bool:
-        """Detecta se linha é cabeçalho de seção"""
-        line = line.strip()
-        
-        # Padrões de cabeçalho
-        header_patterns = [
-            r'^#{1,6}\s+',  # Markdown headers
-            r'^\d+\.\s+[A-Z]',  # Numbered sections
-            r'^[A-Z][A-Z\s]+:$',  # All caps headers
-            r'^SEÇÃO\s+\d+',  # Section markers
-            r'^CAPÍTULO\s+\d+',  # Chapter markers
-        ]
-        
-        for pattern in header_patterns:
-            if re.match(pattern, line):
-                return True
-        
-        # Verificar se linha é muito curta e em maiúsculas
-        if len(line) < 50 and line.isupper() and len(line) > 5:
-            return True
+    def _calculate_metrics(self, chunks: List[str], strategy: str,
+                           extras: List[Dict] = None, token_counts: List[int] = None) -> List[Chunk]:
+        """
+        Calcula métricas para os chunks (extras: metadados adicionais por chunk)
         
-        return False
-    
-    def _calculate_metrics(self, chunks: List[str], strategy: str) -> List[Dict]:
-        """Calcula métricas para os chunks"""
+        O overlap com o chunk anterior vem de extras['overlap_with_previous'], gravado
+        pela estratégia ao construir o chunk (0 para estratégias sem overlap).
+        Sem token_counts (contagens da tokenização do documento), cada chunk é tokenizado.
+        """
         chunks_with_metrics = []
+        divergent = 0
         
         for i, chunk in enumerate(chunks):
             # Contagem de tokens
             token_count = 0
-            if self.tokenizer:
+            if token_counts is not None:
+                token_count = token_counts[i]
+            elif self.tokenizer:
                 try:
                     token_count = len(self.tokenizer.encode(chunk))
                 except:
@@ -348,27 +1184,25 @@ class ChunkingEngine:
                 token_count = len(chunk.split())
             
             # Overlap com chunk anterior
-            overlap = 0
-            if i > 0:
-                prev_chunk = chunks[i-1]
-                overlap = self._calculate_overlap(prev_chunk, chunk)
-            
-            chunk_data = {
-                'text': chunk,
-                'chunk_id': f"{strategy}_{i}",
-                'size': len(chunk),
-                'token_count': token_count,
-                'overlap_with_previous': overlap,
-                'strategy': strategy,
-                'position': i
-            }
+            overlap = extras[i].get('overlap_with_previous', 0) if extras else 0
+            if self.verify_overlap and i > 0:
+                searched = self._calculate_overlap(chunks[i-1], chunk)
+                divergent += searched != overlap
+                overlap = searched
             
-            chunks_with_metrics.append(chunk_data)
+            extra = extras[i] if extras else {}
+            chunks_with_metrics.append(Chunk(
+                chunk, strategy, i, token_count, overlap,
+                extra.get('start_char'), extra.get('end_char'), extra.get('page_number')
+            ))
+        
+        if divergent:
+            logger.warning(f"⚠️ Overlap por busca diverge do gravado em {divergent} chunks")
         
         return chunks_with_metrics
     
     def _calculate_overlap(self, chunk1: str, chunk2: str) -> int:
-        """Calcula overlap entre dois chunks"""
+        """Calcula overlap entre dois chunks por busca de substring (O(n²), só para verify_overlap)"""
         # Implementação simples - buscar substring comum no final/início
         min_length = min(len(chunk1), len(chunk2)) // 2
         
@@ -380,8 +1214,24 @@ class ChunkingEngine:
     
     def evaluate_chunking_strategy(self, text: str, strategy: str) -> Dict:
         """Avalia qualidade de uma estratégia de chunking"""
-        chunks = self.create_chunks(text, strategy)
+        return self._evaluate_chunks(text, strategy, self.create_chunks(text, strategy))
+    
+    def evaluate_chunking_strategies(self, text: str, strategies: List[str] = None) -> Dict[str, Dict]:
+        """
+        Avalia várias estratégias sobre o mesmo texto, com pré-processamento compartilhado
         
+        Args:
+            text: Texto para segmentar
+            strategies: Nomes das estratégias (ex.: experiments_config.a_b_testing.strategies_to_compare)
+            
+        Returns:
+            Dict[str, Dict]: Métricas de cada estratégia
+        """
+        results = self.create_chunks_multi(text, strategies)
+        return {strategy: self._evaluate_chunks(text, strategy, chunks) for strategy, chunks in results.items()}
+    
+    def _evaluate_chunks(self, text: str, strategy: str, chunks: List[Dict]) -> Dict:
+        """Métricas de avaliação dos chunks de uma estratégia"""
         if not chunks:
             return {'error': 'Nenhum chunk criado'}
         
@@ -412,6 +1262,23 @@ class ChunkingEngine:
         variance = sum((x - mean) ** 2 for x in values) / len(values)
         return variance
 
+# ChunkingEngine de cada worker do chunk_corpus (criado uma vez por processo)
+_corpus_engine = None
+
+def _init_corpus_worker(strategies_config: Dict, approximate_tokens: bool):
+    """Inicializa o worker do chunk_corpus: engine criado uma única vez (tokenizer compartilhado no processo)"""
+    global _corpus_engine
+    _corpus_engine = ChunkingEngine(strategies_config, approximate_tokens=approximate_tokens)
+
+def _chunk_corpus_task(task: List[Tuple[int, str]], strategy: str) -> List[Tuple[int, ChunkBatch]]:
+    """Segmenta um grupo de documentos; o texto de origem fica fora dos ChunkBatch devolvidos"""
+    config = _corpus_engine.strategies_config[strategy]
+    results = []
+    for index, text in task:
+        chunks = _corpus_engine._build_chunks(text, strategy, config)
+        results.append((index, ChunkBatch.from_chunks(None, strategy, chunks)))
+    return results
+
 def main():
     """Função de teste"""
     engine = ChunkingEngine()
@@ -0,0 +1,400 @@
+"""
+Deduplication - Eliminação de Quase Duplicatas
+Assinaturas MinHash com índice LSH para detectar documentos e chunks quase idênticos na ingestão
+"""
+
+import re
+import zlib
+import logging
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Multiplicador do hash polinomial que combina as palavras de um shingle
+SHINGLE_MULTIPLIER = np.uint64(1099511628211)
+
+# Shingles processados por vez no cálculo da assinatura (limita a matriz permutações x shingles)
+SHINGLE_BLOCK_SIZE = 4096
+
+class MinHasher:
+    """
+    Calcula assinaturas MinHash sobre shingles de palavras
+    A fração de posições iguais entre duas assinaturas estima a similaridade de Jaccard
+    """
+
+    def __init__(self, num_permutations: int = 128, shingle_size: int = 5, seed: int = 42):
+        """
+        Inicializa o MinHasher
+
+        Args:
+            num_permutations: Tamanho da assinatura
+            shingle_size: Palavras por shingle
+            seed: Semente das permutações (assinaturas só são comparáveis com a mesma semente)
+        """
+        self.num_permutations = num_permutations
+        self.shingle_size = max(1, shingle_size)
+
+        # Hashing multiply-add-shift: (a * x + b) mod 2^64 >> 32, com a ímpar, para x de 32 bits
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 2 ** 63, size=(num_permutations, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 2 ** 63, size=(num_permutations, 1), dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Calcula a assinatura de um texto
+
+        Args:
+            text: Texto a assinar
+
+        Returns:
+            Optional[np.ndarray]: Assinatura (uint64) ou None se o texto não tiver palavras
+        """
+        shingles = self._shingle_hashes(text)
+        if shingles.size == 0:
+            return None
+
+        signature = np.full(self.num_permutations, np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for start in range(0, shingles.size, SHINGLE_BLOCK_SIZE):
+                block = shingles[start:start + SHINGLE_BLOCK_SIZE]
+                permuted = (self._a * block + self._b) >> np.uint64(32)
+                np.minimum(signature, permuted.min(axis=1), out=signature)
+
+        return signature
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Hashes de 32 bits (únicos) dos shingles de palavras normalizadas"""
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+
+        vocabulary = {word: zlib.crc32(word.encode('utf-8')) for word in set(words)}
+        word_hashes = np.fromiter((vocabulary[word] for word in words), dtype=np.uint64, count=len(words))
+
+        # Textos menores que um shingle viram um único shingle
+        k = min(self.shingle_size, len(words))
+        count = len(words) - k + 1
+
+        # Hash polinomial de cada janela de k palavras (aritmética módulo 2^64)
+        shingles = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(k):
+                shingles = shingles * SHINGLE_MULTIPLIER + word_hashes[offset:offset + count]
+
+        folded = (shingles ^ (shingles >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+        return np.unique(folded)
+
+class LSHIndex:
+    """
+    Índice LSH por bandas sobre assinaturas MinHash
+    Candidatos que colidem em alguma banda são confirmados pela similaridade estimada
+    """
+
+    def __init__(self, num_permutations: int, threshold: float):
+        """
+        Inicializa o índice
+
+        Args:
+            num_permutations: Tamanho das assinaturas indexadas
+            threshold: Similaridade de Jaccard mínima para considerar duplicata
+        """
+        self.threshold = threshold
+        self.bands, self.rows = self._choose_bands(num_permutations, threshold)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self._owners = {}
+        self._keys_by_owner = {}
+
+    @staticmethod
+    def _choose_bands(num_permutations: int, threshold: float) -> Tuple[int, int]:
+        """Escolhe (bandas, linhas) cujo limiar de colisão (1/b)^(1/r) mais se aproxima do threshold"""
+        options = [(b, num_permutations // b) for b in range(1, num_permutations + 1)
+                   if num_permutations % b == 0]
+        return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+    def _band_keys(self, signature: np.ndarray):
+        """Chave de cada banda da assinatura"""
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        Busca a entrada mais similar acima do threshold
+
+        Args:
+            signature: Assinatura consultada
+
+        Returns:
+            Optional[Tuple[str, float]]: (chave, similaridade estimada) ou None
+        """
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+
+        return best
+
+    def owner(self, key: str) -> str:
+        """Dono de uma entrada"""
+        return self._owners[key]
+
+    def add(self, key: str, signature: np.ndarray, owner: str):
+        """Indexa uma assinatura"""
+        self._signatures[key] = signature
+        self._owners[key] = owner
+        self._keys_by_owner.setdefault(owner, []).append(key)
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def remove_owner(self, owner: str):
+        """Remove todas as entradas de um dono"""
+        for key in self._keys_by_owner.pop(owner, []):
+            signature = self._signatures.pop(key)
+            del self._owners[key]
+            for band, band_key in self._band_keys(signature):
+                bucket = self._buckets[band].get(band_key, [])
+                if key in bucket:
+                    bucket.remove(key)
+                if not bucket:
+                    self._buckets[band].pop(band_key, None)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+class Deduplicator:
+    """
+    Filtro de quase duplicatas aplicado na ingestão, antes dos embeddings
+    Modo 'skip' descarta as cópias; modo 'link' também registra as fontes
+    duplicadas junto ao original, para citação nas respostas
+    """
+
+    def __init__(self, config: Dict = None):
+        """
+        Inicializa o deduplicador
+
+        Args:
+            config: deduplication_config (mode, num_permutations, shingle_size,
+                    document_threshold, chunk_threshold)
+        """
+        config = config or {}
+        self.mode = config.get('mode', 'skip')
+        if self.mode not in ('skip', 'link'):
+            raise ValueError(f"Modo de deduplicação não suportado: {self.mode}")
+
+        num_permutations = config.get('num_permutations', 128)
+        self.hasher = MinHasher(num_permutations, config.get('shingle_size', 5))
+        self.document_index = LSHIndex(num_permutations, config.get('document_threshold', 0.9))
+        self.chunk_index = LSHIndex(num_permutations, config.get('chunk_threshold', 0.95))
+
+        # Fonte duplicada -> fonte original (ambos os modos: cópias contam como já indexadas)
+        self.duplicate_documents = {}
+        # Modo 'link': fonte original -> {chunk_id original: fontes com chunks equivalentes}
+        self.chunk_links = {}
+
+        # Índices reversos, para esquecer uma fonte sem varrer todos os vínculos
+        self._duplicates_of = {}
+        self._linked_into = {}
+        # Fonte original -> fontes com chunks descartados como cópias dos seus (ambos os modos)
+        self._chunk_copies_of = {}
+        # Resultado de filter ainda não armazenado, por fonte (aplicado em commit)
+        self._staged = {}
+
+        self._lock = threading.Lock()
+        self.stats = {'documents_checked': 0, 'duplicate_documents': 0, 'chunks_checked': 0,
+                      'duplicate_chunks': 0, 'embeddings_saved': 0, 'tokens_saved': 0}
+
+        logger.info(f"🧬 Deduplicador inicializado: modo {self.mode}, "
+                    f"{self.document_index.bands}x{self.document_index.rows} bandas (documentos), "
+                    f"{self.chunk_index.bands}x{self.chunk_index.rows} bandas (chunks)")
+
+    def filter(self, source: str, text: str, chunks: List[Dict]) -> List[Dict]:
+        """
+        Remove um documento quase duplicado ou seus chunks quase duplicados
+
+        Os índices só mudam em commit, depois que os chunks devolvidos foram armazenados
+        (discard, se a ingestão da fonte falhar)
+
+        Args:
+            source: Fonte do documento (mesma usada em RAGAgent._store_chunks)
+            text: Conteúdo completo do documento
+            chunks: Chunks do documento, na ordem em que seriam armazenados
+
+        Returns:
+            List[Dict]: Chunks a embedar e armazenar (vazia se o documento é duplicata)
+        """
+        document_signature = self.hasher.signature(text)
+        chunk_signatures = [self.hasher.signature(chunk['text']) for chunk in chunks]
+
+        with self._lock:
+            # Reingestão da mesma fonte substitui as entradas anteriores
+            self._forget(source)
+            self.stats['documents_checked'] += 1
+            self.stats['chunks_checked'] += len(chunks)
+
+            if document_signature is not None:
+                match = self.document_index.query(document_signature)
+                if match:
+                    original, similarity = match
+                    self._staged[source] = {'duplicate_of': original, 'saved': chunks}
+                    logger.info(f"🧬 {source} é quase duplicata de {original} ({similarity:.2f}), ignorado")
+                    return []
+
+            # Chunks do próprio documento são comparados entre si em um índice temporário
+            own_index = LSHIndex(self.hasher.num_permutations, self.chunk_index.threshold)
+            staged = {'document_signature': document_signature, 'chunks': [], 'links': [], 'saved': []}
+            kept = []
+            for chunk, signature in zip(chunks, chunk_signatures):
+                if signature is not None:
+                    match = self.chunk_index.query(signature)
+                    if match:
+                        staged['links'].append((self.chunk_index.owner(match[0]), match[0]))
+                        staged['saved'].append(chunk)
+                        continue
+                    if own_index.query(signature):
+                        staged['saved'].append(chunk)
+                        continue
+                    # chunk_id que RAGAgent._store_chunks atribuirá a este chunk
+                    chunk_id = f"{source}_{len(kept)}"
+                    own_index.add(chunk_id, signature, owner=source)
+                    staged['chunks'].append((chunk_id, signature))
+                kept.append(chunk)
+
+            self._staged[source] = staged
+            return kept
+
+    def commit(self, source: str):
+        """
+        Registra nos índices o resultado do último filter da fonte
+
+        Chamar só depois que os chunks devolvidos por filter foram armazenados: assinaturas
+        de chunks que nunca chegaram ao store descartariam cópias futuras deles.
+        """
+        with self._lock:
+            staged = self._staged.pop(source, None)
+            if staged is None:
+                return
+
+            self.stats['embeddings_saved'] += len(staged['saved'])
+            self.stats['tokens_saved'] += sum(chunk.get('token_count', 0) for chunk in staged['saved'])
+
+            if 'duplicate_of' in staged:
+                original = staged['duplicate_of']
+                self.duplicate_documents[source] = original
+                self._duplicates_of.setdefault(original, set()).add(source)
+                self.stats['duplicate_documents'] += 1
+                return
+
+            if staged['document_signature'] is not None:
+                self.document_index.add(source, staged['document_signature'], owner=source)
+            for chunk_id, signature in staged['chunks']:
+                self.chunk_index.add(chunk_id, signature, owner=source)
+
+            for original, chunk_id in staged['links']:
+                if original == source:
+                    continue
+                self._chunk_copies_of.setdefault(original, set()).add(source)
+                self._linked_into.setdefault(source, set()).add(original)
+                if self.mode == 'link':
+                    self.chunk_links.setdefault(original, {}).setdefault(chunk_id, []).append(source)
+            self.stats['duplicate_chunks'] += len(staged['saved'])
+
+    def discard(self, source: str):
+        """Descarta o resultado do último filter da fonte (embeddings ou armazenamento falharam)"""
+        with self._lock:
+            self._staged.pop(source, None)
+
+    def is_duplicate(self, source: str) -> bool:
+        """Indica se a fonte foi descartada como duplicata de outro documento"""
+        return source in self.duplicate_documents
+
+    def linked_sources(self, source: str, chunk_id: str) -> List[str]:
+        """Fontes com conteúdo equivalente a um chunk armazenado (modo 'link')"""
+        if self.mode != 'link':
+            return []
+
+        with self._lock:
+            linked = list(self.chunk_links.get(source, {}).get(chunk_id, []))
+            linked.extend(sorted(self._duplicates_of.get(source, ())))
+        return list(dict.fromkeys(linked))
+
+    def remove_sources(self, sources: set) -> set:
+        """
+        Esquece fontes removidas do store
+
+        Duplicatas cujo original foi removido deixam de contar como indexadas,
+        para que a próxima ingestão as processe.
+
+        Returns:
+            set: Demais fontes que tinham documento ou chunks descartados como cópias
+                 das removidas; o store não tem mais esse conteúdo e elas devem ser reindexadas
+        """
+        affected = set()
+        with self._lock:
+            for source in sources:
+                affected.update(self._forget(source))
+        return affected - set(sources)
+
+    def _forget(self, source: str) -> set:
+        """
+        Remove uma fonte dos índices e dos vínculos (chamar com o lock)
+
+        Returns:
+            set: Fontes com documento ou chunks descartados como cópias desta fonte
+        """
+        self._staged.pop(source, None)
+        self.document_index.remove_owner(source)
+        self.chunk_index.remove_owner(source)
+
+        # Como duplicata: desfazer o vínculo com o original
+        original = self.duplicate_documents.pop(source, None)
+        if original is not None:
+            self._duplicates_of[original].discard(source)
+
+        # Como original: suas duplicatas voltam a ser tratadas como não indexadas
+        affected = self._duplicates_of.pop(source, set())
+        for duplicate in affected:
+            self.duplicate_documents.pop(duplicate, None)
+
+        for links in self.chunk_links.pop(source, {}).values():
+            for linked_source in links:
+                self._linked_into.get(linked_source, set()).discard(source)
+
+        copies = self._chunk_copies_of.pop(source, set())
+        for copy in copies:
+            self._linked_into.get(copy, set()).discard(source)
+        affected |= copies
+
+        for original in self._linked_into.pop(source, ()):
+            self._chunk_copies_of.get(original, set()).discard(source)
+            for chunk_id, links in self.chunk_links.get(original, {}).items():
+                links[:] = [s for s in links if s != source]
+
+        return affected
+
+    def get_stats(self, embedding_dimension: int = 0) -> Dict:
+        """
+        Retorna estatísticas da deduplicação
+
+        Args:
+            embedding_dimension: Dimensão dos embeddings, para estimar o espaço economizado no índice
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                'mode': self.mode,
+                'indexed_documents': len(self.document_index),
+                'indexed_chunks': len(self.chunk_index),
+                # Vetores float32 que deixaram de ser armazenados
+                'index_bytes_saved': self.stats['embeddings_saved'] * embedding_dimension * 4
+            }
@@ -3,9 +3,18 @@ Document Processor - Processamento de Documentos
 Extrai texto de múltiplos formatos (PDF, DOCX, TXT)
 """
 
+import io
 import os
+import re
+import mmap
+import time
+import codecs
+import hashlib
 import logging
-from typing import Dict, List, Optional
+import tarfile
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import mimetypes
 
@@ -13,23 +22,102 @@ import mimetypes
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Versão dos extratores: incrementar quando a saída de extração mudar (invalida o cache)
+EXTRACTOR_VERSION = "4"
+
+# Amostra usada para detectar o encoding de arquivos de texto
+TEXT_SAMPLE_SIZE = 64 * 1024
+
+# Tamanho dos blocos decodificados de arquivos de texto
+TEXT_BLOCK_SIZE = 1024 * 1024
+
+# Tags WordprocessingML usadas pelo extrator DOCX em streaming
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_BODY, DOCX_PARAGRAPH, DOCX_TABLE = f'{_W}body', f'{_W}p', f'{_W}tbl'
+DOCX_ROW, DOCX_CELL, DOCX_TEXT = f'{_W}tr', f'{_W}tc', f'{_W}t'
+DOCX_TAB, DOCX_BREAKS = f'{_W}tab', (f'{_W}br', f'{_W}cr')
+DOCX_STYLE, DOCX_VAL = f'{_W}pStyle', f'{_W}val'
+
+# Estilos de título do Word (ids em inglês e português) e títulos Markdown
+DOCX_HEADING_STYLE = re.compile(r'^(?:Heading|T[ií]?tulo)\s*(\d)$', re.IGNORECASE)
+MARKDOWN_HEADER = re.compile(r'^(#{1,6})[ \t]+(\S[^\n]*?)[ \t#]*$', re.MULTILINE)
+
+# Arquivos compactados aceitos por iter_archive (tar em qualquer compressão suportada por tarfile)
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Separador entre o arquivo compactado e o membro nos caminhos reportados
+ARCHIVE_MEMBER_SEPARATOR = '::'
+
 class DocumentProcessor:
     """
     Processador de documentos multi-formato
     Suporta PDF, DOCX, TXT e outros formatos
     """
     
-    def __init__(self):
-        """Inicializa o processador de documentos"""
+    def __init__(self, config: Dict = None):
+        """
+        Inicializa o processador de documentos
+        
+        Args:
+            config: Configuração do sistema (config.yaml), opcional
+        """
+        self.config = config or {}
+        concurrency = self.config.get('performance_config', {}).get('concurrency', {})
+        self.max_workers = concurrency.get('max_workers', os.cpu_count() or 1)
+        content_filtering = self.config.get('security_config', {}).get('content_filtering', {})
+        self.max_document_size = int(content_filtering.get('max_document_size_mb', 100) * 1024 * 1024)
+        self.cache = self._setup_cache()
         self.supported_formats = {
             '.pdf': self._extract_pdf,
             '.docx': self._extract_docx,
             '.txt': self._extract_txt,
-            '.md': self._extract_txt,
+            '.md': self._extract_markdown,
             '.rtf': self._extract_rtf
         }
         logger.info("📄 Document Processor inicializado")
     
+    def _setup_cache(self):
+        """Configura o cache de extração (storage_config.document_cache)"""
+        cache_config = self.config.get('storage_config', {}).get('document_cache', {})
+        
+        if not cache_config.get('enabled', False):
+            return None
+        
+        try:
+            from extraction_cache import ExtractionCache
+            return ExtractionCache(
+                cache_directory=cache_config.get('cache_directory', './cache'),
+                max_size_mb=cache_config.get('max_size_mb', 500)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Cache de extração desabilitado: {e}")
+            return None
+    
+    @staticmethod
+    def compute_file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+        """
+        Calcula o hash SHA-256 do conteúdo de um arquivo, lendo em blocos
+        
+        Args:
+            file_path: Caminho do arquivo
+            block_size: Tamanho do bloco de leitura
+            
+        Returns:
+            str: Hash hexadecimal do conteúdo
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def get_cache_stats(self) -> Dict:
+        """Retorna estatísticas do cache de extração (hits, misses, tamanho)"""
+        if not self.cache:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.get_stats()}
+    
     def extract_text(self, file_path: str) -> Dict:
         """
         Extrai texto de um arquivo
@@ -38,7 +126,9 @@ class DocumentProcessor:
             file_path: Caminho para o arquivo
             
         Returns:
-            Dict: Dados extraídos do documento
+            Dict: Dados extraídos do documento. 'offset_map' traz as páginas
+                  ('pages': page_number, start, end) e seções ('sections': title,
+                  level, start, end) como intervalos de caracteres em 'content'
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
@@ -51,9 +141,9 @@ class DocumentProcessor:
         logger.info(f"📖 Extraindo texto de: {file_path}")
         
         try:
-            # Chamar função de extração apropriada
-            extract_function = self.supported_formats[file_extension]
-            result = extract_function(file_path)
+            result = self._extract_cached(
+                file_path, file_extension, lambda: self.compute_file_hash(file_path)
+            )
             
             # Adicionar metadados
             result.update({
@@ -70,65 +160,336 @@ class DocumentProcessor:
             logger.error(f"❌ Erro extraindo texto de {file_path}: {e}")
             raise
     
-    def _extract_pdf(self, file_path: str) -> Dict:
-        """Extrai texto de arquivo PDF"""
+    def extract_bytes(self, data: bytes, file_name: str) -> Dict:
+        """
+        Extrai texto de um documento já em memória (ex.: membro de um arquivo compactado)
+        
+        Args:
+            data: Conteúdo binário do documento
+            file_name: Nome do documento; a extensão define o extrator
+            
+        Returns:
+            Dict: Dados extraídos, no mesmo formato de extract_text
+        """
+        file_extension = Path(file_name).suffix.lower()
+        
+        if file_extension not in self.supported_formats:
+            raise ValueError(f"Formato não suportado: {file_extension}")
+        
+        logger.info(f"📖 Extraindo texto de: {file_name}")
+        
         try:
-            import PyPDF2
+            result = self._extract_cached(
+                data, file_extension, lambda: hashlib.sha256(data).hexdigest()
+            )
             
-            content = ""
-            metadata = {}
+            result.update({
+                'file_path': file_name,
+                'file_name': Path(file_name.split(ARCHIVE_MEMBER_SEPARATOR)[-1]).name,
+                'file_extension': file_extension,
+                'file_size': len(data)
+            })
             
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extrair metadados
+            logger.info(f"✅ Texto extraído: {len(result['content'])} caracteres")
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ Erro extraindo texto de {file_name}: {e}")
+            raise
+    
+    def _extract_cached(self, source: Union[str, bytes], file_extension: str, hash_function) -> Dict:
+        """Executa o extrator do formato, consultando o cache pelo hash do conteúdo"""
+        result = None
+        cache_key = None
+        
+        if self.cache:
+            cache_key = self.cache.make_key(hash_function(), file_extension, EXTRACTOR_VERSION)
+            result = self.cache.get(cache_key)
+        
+        if result is None:
+            # Chamar função de extração apropriada
+            extract_function = self.supported_formats[file_extension]
+            result = extract_function(source)
+            
+            # Formatos sem paginação: documento inteiro como página única
+            result.setdefault('offset_map', {
+                'pages': [{'page_number': 1, 'start': 0, 'end': len(result['content'])}],
+                'sections': []
+            })
+            
+            # Falhas de extração não são armazenadas
+            if cache_key and 'error' not in result:
+                self.cache.put(cache_key, result)
+        
+        return result
+    
+    @staticmethod
+    def _open_binary(source: Union[str, bytes]):
+        """Abre um caminho de arquivo ou conteúdo em memória como arquivo binário"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return io.BytesIO(source)
+        return open(source, 'rb')
+    
+    def iter_pages(self, file_path: str) -> Iterator[Dict]:
+        """
+        Extrai texto página a página, sem montar o documento inteiro em memória
+        
+        PDFs são lidos uma página por vez; demais formatos produzem um único
+        registro com todo o conteúdo. O offset de cada página corresponde à
+        posição do texto dela em extract_text()['content'].
+        
+        Args:
+            file_path: Caminho para o arquivo
+            
+        Yields:
+            Dict: Registro da página (page_number, text, char_offset)
+            
+        Raises:
+            ValueError: Se a extração falhar (nenhuma página é gerada)
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        
+        file_extension = Path(file_path).suffix.lower()
+        
+        if file_extension not in self.supported_formats:
+            raise ValueError(f"Formato não suportado: {file_extension}")
+        
+        if file_extension == '.pdf':
+            yield from self._iter_pdf_pages(file_path)
+        else:
+            result = self.supported_formats[file_extension](file_path)
+            # Extratores devolvem 'error' em vez de lançar: o texto é a mensagem de erro, não uma página
+            if 'error' in result:
+                raise ValueError(result['error'])
+            yield {'page_number': 1, 'text': result['content'], 'char_offset': 0}
+    
+    def _iter_pdf_pages(self, source: Union[str, bytes], metadata: Dict = None) -> Iterator[Dict]:
+        """Gera as páginas de um PDF conforme são extraídas (requer PyPDF2)"""
+        import PyPDF2
+        
+        with self._open_binary(source) as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            
+            # Extrair metadados (número de páginas mesmo sem dicionário de informações)
+            if metadata is not None:
+                metadata['pages'] = len(pdf_reader.pages)
                 if pdf_reader.metadata:
-                    metadata = {
+                    metadata.update({
                         'title': pdf_reader.metadata.get('/Title', ''),
                         'author': pdf_reader.metadata.get('/Author', ''),
-                        'creator': pdf_reader.metadata.get('/Creator', ''),
-                        'pages': len(pdf_reader.pages)
-                    }
+                        'creator': pdf_reader.metadata.get('/Creator', '')
+                    })
+            
+            # Offset do texto da página no conteúdo final (ver _extract_pdf)
+            char_offset = 0
+            for page_num, page in enumerate(pdf_reader.pages):
+                try:
+                    page_text = page.extract_text()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro na página {page_num + 1}: {e}")
+                    continue
                 
-                # Extrair texto de todas as páginas
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        content += f"\n--- Página {page_num + 1} ---\n{page_text}\n"
-                    except Exception as e:
-                        logger.warning(f"⚠️ Erro na página {page_num + 1}: {e}")
+                header = self._pdf_page_header(page_num + 1, char_offset == 0)
+                char_offset += len(header)
+                yield {'page_number': page_num + 1, 'text': page_text, 'char_offset': char_offset}
+                char_offset += len(page_text)
+    
+    @staticmethod
+    def _pdf_page_header(page_number: int, is_first: bool) -> str:
+        """Marcador que precede o texto de cada página no conteúdo do PDF"""
+        prefix = "" if is_first else "\n\n"
+        return f"{prefix}--- Página {page_number} ---\n"
+    
+    def _extract_pdf(self, source: Union[str, bytes]) -> Dict:
+        """Extrai texto de arquivo PDF (caminho ou conteúdo em memória)"""
+        try:
+            metadata = {}
+            parts = []
+            pages = []
+            
+            for page in self._iter_pdf_pages(source, metadata):
+                parts.append(self._pdf_page_header(page['page_number'], not parts))
+                parts.append(page['text'])
+                pages.append({
+                    'page_number': page['page_number'],
+                    'start': page['char_offset'],
+                    'end': page['char_offset'] + len(page['text'])
+                })
+            
+            content = ''.join(parts).strip()
             
             return {
-                'content': content.strip(),
+                'content': content,
                 'metadata': metadata,
-                'format': 'pdf'
+                'format': 'pdf',
+                'offset_map': {'pages': self._clamp_spans(pages, 0, len(content)), 'sections': []}
             }
             
         except ImportError:
             logger.error("❌ PyPDF2 não instalado. Use: pip install PyPDF2")
-            return {'content': f"Erro: PyPDF2 não encontrado para processar {file_path}", 'metadata': {}, 'format': 'pdf'}
+            return {'content': "Erro: PyPDF2 não encontrado para processar o PDF", 'metadata': {}, 'format': 'pdf', 'error': "PyPDF2 não instalado"}
         except Exception as e:
             logger.error(f"❌ Erro processando PDF: {e}")
-            return {'content': f"Erro processando PDF: {e}", 'metadata': {}, 'format': 'pdf'}
+            return {'content': f"Erro processando PDF: {e}", 'metadata': {}, 'format': 'pdf', 'error': str(e)}
     
-    def _extract_docx(self, file_path: str) -> Dict:
-        """Extrai texto de arquivo DOCX"""
+    def _extract_docx(self, source: Union[str, bytes]) -> Dict:
+        """Extrai texto de arquivo DOCX (streaming do XML, com python-docx como fallback)"""
+        try:
+            lines = []
+            sections = []
+            offset = 0
+            metadata = {'paragraphs': 0, 'tables': 0}
+            
+            for block in self.iter_docx_blocks(source):
+                lines.append(block['text'])
+                if block['type'] == 'paragraph':
+                    metadata['paragraphs'] += 1
+                    if block.get('heading_level') and block['text'].strip():
+                        sections.append({
+                            'title': block['text'].strip(),
+                            'level': block['heading_level'],
+                            'start': offset
+                        })
+                elif block['row'] == 0:
+                    metadata['tables'] += 1
+                offset += len(block['text']) + 1
+            
+            joined = '\n'.join(lines)
+            content = joined.strip()
+            shift = len(joined) - len(joined.lstrip())
+            
+            return {
+                'content': content,
+                'metadata': metadata,
+                'format': 'docx',
+                'offset_map': {
+                    'pages': [{'page_number': 1, 'start': 0, 'end': len(content)}],
+                    'sections': self._close_sections(self._clamp_spans(sections, shift, len(content)), len(content))
+                }
+            }
+            
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            logger.warning(f"⚠️ Extração DOCX em streaming falhou ({e}), usando python-docx")
+            return self._extract_docx_python_docx(source)
+        except Exception as e:
+            logger.error(f"❌ Erro processando DOCX: {e}")
+            return {'content': f"Erro processando DOCX: {e}", 'metadata': {}, 'format': 'docx', 'error': str(e)}
+    
+    def iter_docx_blocks(self, source: Union[str, bytes]) -> Iterator[Dict]:
+        """
+        Lê um DOCX em streaming, direto do word/document.xml
+        
+        Parágrafos e linhas de tabela são entregues em ordem de leitura assim
+        que são lidos; elementos já processados são descartados, mantendo a
+        memória constante independente do tamanho do documento.
+        
+        Args:
+            source: Caminho do arquivo DOCX ou seu conteúdo em memória
+            
+        Yields:
+            Dict: Bloco ('type': 'paragraph' ou 'table_row', 'text', 'heading_level'
+                  para parágrafos com estilo de título e 'row' para tabelas)
+        """
+        with zipfile.ZipFile(self._open_binary(source)) as archive, archive.open('word/document.xml') as xml_file:
+            depth = 0
+            body = None
+            table_depth = 0
+            row_index = 0
+            cell_parts = []
+            row_cells = []
+            
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if elem.tag == DOCX_BODY:
+                        body = elem
+                    elif elem.tag == DOCX_TABLE:
+                        table_depth += 1
+                        if table_depth == 1:
+                            row_index = 0
+                    continue
+                
+                depth -= 1
+                tag = elem.tag
+                
+                if tag == DOCX_PARAGRAPH:
+                    text = self._docx_paragraph_text(elem)
+                    if table_depth:
+                        # Parágrafos de células (inclusive de tabelas aninhadas) compõem a célula externa
+                        cell_parts.append(text)
+                    else:
+                        yield {'type': 'paragraph', 'text': text,
+                               'heading_level': self._docx_heading_level(elem)}
+                elif tag == DOCX_CELL and table_depth == 1:
+                    row_cells.append('\n'.join(cell_parts))
+                    cell_parts = []
+                elif tag == DOCX_ROW and table_depth == 1:
+                    yield {'type': 'table_row', 'text': ' '.join(row_cells), 'row': row_index}
+                    row_index += 1
+                    row_cells = []
+                elif tag == DOCX_TABLE:
+                    table_depth -= 1
+                
+                # Fim de um filho direto do body: descartar o que já foi processado
+                if depth == 2 and body is not None:
+                    body.clear()
+    
+    @staticmethod
+    def _docx_paragraph_text(paragraph) -> str:
+        """Texto de um elemento w:p (runs, tabulações e quebras)"""
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == DOCX_TEXT:
+                parts.append(node.text or '')
+            elif node.tag == DOCX_TAB:
+                parts.append('\t')
+            elif node.tag in DOCX_BREAKS:
+                parts.append('\n')
+        return ''.join(parts)
+    
+    @staticmethod
+    def _docx_heading_level(paragraph) -> Optional[int]:
+        """Nível de título de um w:p pelo estilo (Heading1, Título2...), ou None"""
+        style = paragraph.find(f'{_W}pPr/{DOCX_STYLE}')
+        if style is None:
+            return None
+        match = DOCX_HEADING_STYLE.match(style.get(DOCX_VAL, ''))
+        return int(match.group(1)) if match else None
+    
+    @staticmethod
+    def _clamp_spans(spans: List[Dict], shift: int, length: int) -> List[Dict]:
+        """Desloca intervalos (após strip do início) e os limita ao tamanho do conteúdo"""
+        for span in spans:
+            span['start'] = min(max(span['start'] - shift, 0), length)
+            if 'end' in span:
+                span['end'] = min(max(span['end'] - shift, span['start']), length)
+        return spans
+    
+    @staticmethod
+    def _close_sections(sections: List[Dict], length: int) -> List[Dict]:
+        """Cada seção termina onde começa a seguinte (ou no fim do conteúdo)"""
+        for current, following in zip(sections, sections[1:] + [None]):
+            current['end'] = following['start'] if following else length
+        return sections
+    
+    def _extract_docx_python_docx(self, source: Union[str, bytes]) -> Dict:
+        """Extrai texto de arquivo DOCX carregando o modelo completo do python-docx"""
         try:
             import docx
             
-            doc = docx.Document(file_path)
-            content = ""
+            with self._open_binary(source) as file:
+                doc = docx.Document(file)
+            lines = []
             
             # Extrair texto de parágrafos
             for paragraph in doc.paragraphs:
-                content += paragraph.text + "\n"
+                lines.append(paragraph.text)
             
             # Extrair texto de tabelas
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        content += cell.text + " "
-                    content += "\n"
+                    lines.append(' '.join(cell.text for cell in row.cells))
             
             # Metadados básicos
             metadata = {
@@ -137,63 +498,155 @@ class DocumentProcessor:
             }
             
             return {
-                'content': content.strip(),
+                'content': '\n'.join(lines).strip(),
                 'metadata': metadata,
                 'format': 'docx'
             }
             
         except ImportError:
             logger.error("❌ python-docx não instalado. Use: pip install python-docx")
-            return {'content': f"Erro: python-docx não encontrado para processar {file_path}", 'metadata': {}, 'format': 'docx'}
+            return {'content': "Erro: python-docx não encontrado para processar o DOCX", 'metadata': {}, 'format': 'docx', 'error': "python-docx não instalado"}
         except Exception as e:
             logger.error(f"❌ Erro processando DOCX: {e}")
-            return {'content': f"Erro processando DOCX: {e}", 'metadata': {}, 'format': 'docx'}
+            return {'content': f"Erro processando DOCX: {e}", 'metadata': {}, 'format': 'docx', 'error': str(e)}
     
-    def _extract_txt(self, file_path: str) -> Dict:
+    def _extract_markdown(self, source: Union[str, bytes]) -> Dict:
+        """Extrai texto de arquivo MD (TXT com seções pelos cabeçalhos Markdown)"""
+        return self._extract_txt(source, markdown=True)
+    
+    def _extract_txt(self, source: Union[str, bytes], markdown: bool = False) -> Dict:
         """Extrai texto de arquivo TXT/MD"""
         try:
-            # Tentar diferentes encodings
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            content = ""
-            encoding_used = ""
-            
-            for encoding in encodings:
+            with self._open_text_buffer(source) as buffer:
+                encoding_used = self._detect_encoding(buffer)
+                
                 try:
-                    with open(file_path, 'r', encoding=encoding) as file:
-                        content = file.read()
-                    encoding_used = encoding
-                    break
+                    blocks = list(self._decode_blocks(buffer, encoding_used))
                 except UnicodeDecodeError:
-                    continue
+                    # Amostra era UTF-8 válido, mas o restante não: decodificar tudo como latin-1
+                    encoding_used = 'latin-1'
+                    blocks = list(self._decode_blocks(buffer, encoding_used))
             
-            if not content:
+            # Metadados básicos (contados por bloco, sem materializar linhas)
+            line_breaks = sum(block.count('\n') for block in blocks)
+            chars = sum(len(block) for block in blocks)
+            
+            if not chars:
                 raise ValueError("Não foi possível decodificar o arquivo com nenhum encoding")
             
-            # Metadados básicos
-            lines = content.split('\n')
+            content = ''.join(blocks)
+            del blocks
+            
             metadata = {
-                'lines': len(lines),
+                'lines': line_breaks + 1,
                 'encoding': encoding_used,
-                'chars': len(content)
+                'chars': chars
             }
             
+            content = content.strip()
+            
+            sections = []
+            if markdown:
+                sections = self._close_sections([
+                    {'title': match.group(2), 'level': len(match.group(1)), 'start': match.start()}
+                    for match in MARKDOWN_HEADER.finditer(content)
+                ], len(content))
+            
             return {
-                'content': content.strip(),
+                'content': content,
                 'metadata': metadata,
-                'format': 'txt'
+                'format': 'txt',
+                'offset_map': {
+                    'pages': [{'page_number': 1, 'start': 0, 'end': len(content)}],
+                    'sections': sections
+                }
             }
             
         except Exception as e:
             logger.error(f"❌ Erro processando TXT: {e}")
-            return {'content': f"Erro processando arquivo de texto: {e}", 'metadata': {}, 'format': 'txt'}
+            return {'content': f"Erro processando arquivo de texto: {e}", 'metadata': {}, 'format': 'txt', 'error': str(e)}
+    
+    def iter_text_blocks(self, file_path: str, block_size: int = TEXT_BLOCK_SIZE) -> Iterator[str]:
+        """
+        Decodifica um arquivo TXT/MD em blocos de tamanho limitado
+        
+        O arquivo é mapeado em memória e o encoding detectado por uma amostra.
+        Se um trecho posterior não for UTF-8 válido, o restante do arquivo é
+        decodificado como latin-1 (blocos já entregues não são refeitos).
+        
+        Args:
+            file_path: Caminho do arquivo
+            block_size: Bytes lidos por bloco
+            
+        Yields:
+            str: Blocos de texto decodificado (quebras de linha normalizadas para '\\n')
+        """
+        with self._open_text_buffer(file_path) as buffer:
+            encoding = self._detect_encoding(buffer)
+            position = 0
+            
+            try:
+                for block, position in self._decode_blocks(buffer, encoding, block_size, track_position=True):
+                    if block:
+                        yield block
+            except UnicodeDecodeError:
+                logger.warning(f"⚠️ {file_path}: conteúdo não UTF-8 após {position} bytes, usando latin-1")
+                # Janelas de block_size a partir de position, sem copiar o restante do arquivo
+                yield from self._decode_blocks(buffer, 'latin-1', block_size, start=position)
+    
+    def _open_text_buffer(self, source: Union[str, bytes]):
+        """Mapeia um arquivo em memória (ou lê os bytes se mmap não for possível)"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return memoryview(source)
+        
+        with open(source, 'rb') as file:
+            try:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Arquivos vazios e não regulares não podem ser mapeados
+                return memoryview(file.read())
+    
+    @staticmethod
+    def _detect_encoding(buffer) -> str:
+        """Detecta o encoding de um texto a partir de uma amostra limitada"""
+        sample = bytes(buffer[:TEXT_SAMPLE_SIZE])
+        
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        
+        try:
+            # final=False: um caractere multibyte cortado no fim da amostra não é erro
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            # latin-1 decodifica qualquer sequência de bytes
+            return 'latin-1'
+    
+    @staticmethod
+    def _decode_blocks(buffer, encoding: str, block_size: int = TEXT_BLOCK_SIZE,
+                       track_position: bool = False, start: int = 0) -> Iterator:
+        """Decodifica um buffer incrementalmente a partir do byte start, validando bloco a bloco"""
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True
+        )
+        total = len(buffer)
+        
+        for block_start in range(start, total, block_size):
+            end = min(block_start + block_size, total)
+            block = decoder.decode(bytes(buffer[block_start:end]), final=end == total)
+            if track_position:
+                # Bytes efetivamente consumidos (descontando um caractere multibyte pendente)
+                yield block, end - len(decoder.getstate()[0])
+            elif block:
+                yield block
     
-    def _extract_rtf(self, file_path: str) -> Dict:
+    def _extract_rtf(self, source: Union[str, bytes]) -> Dict:
         """Extrai texto de arquivo RTF"""
         try:
             from striprtf.striprtf import rtf_to_text
             
-            with open(file_path, 'r', encoding='utf-8') as file:
-                rtf_content = file.read()
+            with self._open_binary(source) as file:
+                rtf_content = file.read().decode('utf-8')
             
             content = rtf_to_text(rtf_content)
             
@@ -209,41 +662,281 @@ class DocumentProcessor:
             
         except ImportError:
             logger.error("❌ striprtf não instalado. Use: pip install striprtf")
-            return {'content': f"Erro: striprtf não encontrado para processar {file_path}", 'metadata': {}, 'format': 'rtf'}
+            return {'content': "Erro: striprtf não encontrado para processar o RTF", 'metadata': {}, 'format': 'rtf', 'error': "striprtf não instalado"}
         except Exception as e:
             logger.error(f"❌ Erro processando RTF: {e}")
-            return {'content': f"Erro processando RTF: {e}", 'metadata': {}, 'format': 'rtf'}
+            return {'content': f"Erro processando RTF: {e}", 'metadata': {}, 'format': 'rtf', 'error': str(e)}
     
-    def process_directory(self, directory_path: str, recursive: bool = True) -> List[Dict]:
+    def process_directory(self, directory_path: str, recursive: bool = True,
+                          parallel: bool = False, max_workers: int = None) -> List[Dict]:
         """
         Processa todos os documentos em um diretório
         
         Args:
             directory_path: Caminho do diretório
             recursive: Se deve processar subdiretórios
+            parallel: Se deve extrair em um pool de processos
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            
+        Returns:
+            List[Dict]: Lista de documentos processados (na ordem de descoberta)
+        """
+        results = list(self.iter_directory(directory_path, recursive, parallel, max_workers))
+        results.sort(key=lambda r: r['index'])
+        
+        documents = [r['document'] for r in results if r['success']]
+        
+        logger.info(f"📁 Processados {len(documents)} documentos de {directory_path}")
+        return documents
+    
+    def iter_directory(self, directory_path: str, recursive: bool = True,
+                       parallel: bool = False, max_workers: int = None) -> Iterator[Dict]:
+        """
+        Extrai os documentos de um diretório, entregando cada resultado assim que fica pronto
+        
+        No modo paralelo os resultados saem na ordem de conclusão; use o campo
+        'index' para recuperar a ordem de descoberta. Documentos que excedem
+        performance_config.timeouts.document_processing ou o limite de memória
+        do worker são reportados como falha, sem interromper a ingestão.
+        
+        Args:
+            directory_path: Caminho do diretório
+            recursive: Se deve processar subdiretórios
+            parallel: Se deve extrair em um pool de processos
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            
+        Yields:
+            Dict: Resultado por arquivo (index, file_path, success, document, error, processing_time)
+        """
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
+        
+        yield from self.iter_files(self._discover_files(directory_path, recursive), parallel, max_workers)
+    
+    def iter_files(self, file_paths: Iterable[str], parallel: bool = False,
+                   max_workers: int = None) -> Iterator[Dict]:
+        """
+        Extrai uma lista de arquivos, entregando cada resultado assim que fica pronto
+        
+        Os caminhos são consumidos sob demanda: no modo paralelo um novo arquivo
+        só é lido quando há worker ocioso, o que permite aplicar backpressure.
+        
+        Args:
+            file_paths: Caminhos dos arquivos ('index' segue a ordem recebida)
+            parallel: Se deve extrair em um pool de processos
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            
+        Yields:
+            Dict: Resultado por arquivo, no formato de iter_directory
+        """
+        if parallel:
+            yield from self._iter_parallel(enumerate(file_paths), max_workers or self.max_workers)
+        else:
+            for index, file_path in enumerate(file_paths):
+                yield self._process_file(index, file_path)
+    
+    def is_archive(self, file_path: str) -> bool:
+        """Indica se o caminho é um arquivo compactado aceito por iter_archive (ZIP/TAR)"""
+        return str(file_path).lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+    
+    def process_archive(self, archive_path: str, parallel: bool = False,
+                        max_workers: int = None) -> List[Dict]:
+        """
+        Processa todos os documentos de um arquivo ZIP/TAR sem descompactá-lo em disco
+        
+        Args:
+            archive_path: Caminho do arquivo compactado
+            parallel: Se deve extrair em um pool de processos
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            
+        Returns:
+            List[Dict]: Lista de documentos processados (na ordem do arquivo compactado)
+        """
+        results = list(self.iter_archive(archive_path, parallel, max_workers))
+        results.sort(key=lambda r: r['index'])
+        
+        documents = [r['document'] for r in results if r['success']]
+        
+        logger.info(f"🗜️ Processados {len(documents)} documentos de {archive_path}")
+        return documents
+    
+    def iter_archive(self, archive_path: str, parallel: bool = False,
+                     max_workers: int = None) -> Iterator[Dict]:
+        """
+        Extrai os documentos de um arquivo ZIP/TAR, lendo os membros direto do arquivo compactado
+        
+        Cada membro suportado é lido para a memória e entregue ao extrator do
+        seu formato; nada é gravado em disco. TARs são lidos sequencialmente
+        (inclusive .tar.gz/.bz2/.xz) e, no modo paralelo, só os membros em
+        processamento ficam em memória. Membros acima de
+        security_config.content_filtering.max_document_size_mb são reportados
+        como falha sem serem lidos. O 'file_path' de cada resultado tem o
+        formato '<arquivo compactado>::<membro>'.
+        
+        Args:
+            archive_path: Caminho do arquivo compactado
+            parallel: Se deve extrair em um pool de processos
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            
+        Yields:
+            Dict: Resultado por membro, no formato de iter_directory
+        """
+        if not os.path.exists(archive_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {archive_path}")
+        
+        if not self.is_archive(archive_path):
+            raise ValueError(f"Formato de arquivo compactado não suportado: {Path(archive_path).name}")
+        
+        # Membros recusados na leitura são entregues entre os resultados da extração
+        rejected = []
+        tasks = self._iter_archive_tasks(archive_path, rejected)
+        
+        if parallel:
+            results = self._iter_parallel(tasks, max_workers or self.max_workers)
+        else:
+            results = (self._process_file(*task) for task in tasks)
+        
+        for result in results:
+            while rejected:
+                yield rejected.pop(0)
+            yield result
+        
+        while rejected:
+            yield rejected.pop(0)
+    
+    def _iter_archive_tasks(self, archive_path: str, rejected: List[Dict]) -> Iterator[Tuple[int, str, bytes]]:
+        """Lê os membros suportados como tarefas (index, file_path, conteúdo)"""
+        for index, (member_name, member_size, read_member) in enumerate(self._iter_archive_members(archive_path)):
+            file_path = f"{archive_path}{ARCHIVE_MEMBER_SEPARATOR}{member_name}"
+            error = None
+            
+            if member_size > self.max_document_size:
+                error = f"membro maior que o limite de {self.max_document_size / (1024 * 1024):.0f}MB"
+            else:
+                try:
+                    data = read_member()
+                except Exception as e:
+                    error = f"erro lendo membro: {e}"
+            
+            if error:
+                logger.error(f"❌ Erro processando {file_path}: {error}")
+                rejected.append({
+                    'index': index,
+                    'file_path': file_path,
+                    'success': False,
+                    'document': None,
+                    'error': error,
+                    'processing_time': 0.0
+                })
+                continue
+            
+            yield index, file_path, data
+    
+    def _iter_archive_members(self, archive_path: str) -> Iterator[Tuple[str, int, Callable[[], bytes]]]:
+        """Lista os membros suportados de um arquivo compactado (nome, tamanho, leitor)"""
+        if str(archive_path).lower().endswith(ZIP_SUFFIXES):
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or Path(info.filename).suffix.lower() not in self.supported_formats:
+                        continue
+                    yield info.filename, info.file_size, lambda info=info: archive.read(info)
+        else:
+            # 'r|*': leitura em fluxo, sem seek, com detecção automática da compressão
+            with tarfile.open(archive_path, 'r|*') as archive:
+                for member in archive:
+                    if not member.isfile() or Path(member.name).suffix.lower() not in self.supported_formats:
+                        continue
+                    yield member.name, member.size, lambda member=member: archive.extractfile(member).read()
+    
+    def scan_changes(self, directory_path: str, manifest, recursive: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Compara um diretório com o manifesto de ingestão sem extrair texto
+        
+        Args:
+            directory_path: Caminho do diretório
+            manifest: IngestionManifest com o estado da última ingestão
+            recursive: Se deve considerar subdiretórios
             
         Returns:
-            List[Dict]: Lista de documentos processados
+            Dict: Arquivos 'added', 'modified', 'unchanged' e 'deleted'
         """
         if not os.path.exists(directory_path):
             raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
         
-        documents = []
-        path_obj = Path(directory_path)
+        file_infos = (
+            self.get_document_info(file_path)
+            for file_path in self._discover_files(directory_path, recursive)
+        )
+        changes = manifest.diff(file_infos, self.compute_file_hash, scope=directory_path)
         
+        logger.info(
+            f"🔎 {directory_path}: {len(changes['added'])} novos, {len(changes['modified'])} modificados, "
+            f"{len(changes['deleted'])} removidos, {len(changes['unchanged'])} inalterados"
+        )
+        return changes
+    
+    def _discover_files(self, directory_path: str, recursive: bool) -> Iterator[str]:
+        """Lista arquivos suportados de um diretório"""
         # Padrão de busca
         pattern = "**/*" if recursive else "*"
         
-        for file_path in path_obj.glob(pattern):
+        for file_path in Path(directory_path).glob(pattern):
             if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
-                try:
-                    doc_data = self.extract_text(str(file_path))
-                    documents.append(doc_data)
-                except Exception as e:
-                    logger.error(f"❌ Erro processando {file_path}: {e}")
+                yield str(file_path)
+    
+    def _process_file(self, index: int, file_path: str, data: bytes = None) -> Dict:
+        """Extrai um arquivo (ou conteúdo em memória) e empacota o resultado (nunca propaga exceções)"""
+        start_time = time.time()
+        result = {
+            'index': index,
+            'file_path': file_path,
+            'success': False,
+            'document': None,
+            'error': None
+        }
         
-        logger.info(f"📁 Processados {len(documents)} documentos de {directory_path}")
-        return documents
+        hits_before = self.cache.stats['hits'] if self.cache else 0
+        
+        try:
+            if data is not None:
+                document = self.extract_bytes(data, file_path)
+            else:
+                document = self.extract_text(file_path)
+            
+            # Extratores devolvem 'error' em vez de lançar: o texto é a mensagem de erro, não o documento
+            if 'error' in document:
+                logger.error(f"❌ Erro processando {file_path}: {document['error']}")
+                result['error'] = document['error']
+            else:
+                result['document'] = document
+                result['success'] = True
+        except Exception as e:
+            logger.error(f"❌ Erro processando {file_path}: {e}")
+            result['error'] = str(e)
+        
+        if self.cache:
+            result['cache_hit'] = self.cache.stats['hits'] > hits_before
+        
+        result['processing_time'] = time.time() - start_time
+        return result
+    
+    def _iter_parallel(self, tasks: Iterable[Tuple], max_workers: int) -> Iterator[Dict]:
+        """Extrai tarefas (index, file_path[, conteúdo]) em um pool supervisionado (timeout e limite de memória)"""
+        from extraction_pool import SupervisedExtractionPool
+        
+        with SupervisedExtractionPool(self.config, max_workers=max_workers) as pool:
+            for result in pool.imap_unordered(tasks):
+                self._record_worker_cache_status(result)
+                yield result
+        
+        # Workers gravaram no cache de forma independente: reaplicar o limite global
+        if self.cache:
+            self.cache.refresh()
+    
+    def _record_worker_cache_status(self, result: Dict):
+        """Contabiliza no processador os hits/misses de cache ocorridos nos workers"""
+        if self.cache and result.get('success') and 'cache_hit' in result:
+            self.cache.stats['hits' if result['cache_hit'] else 'misses'] += 1
     
     def validate_file(self, file_path: str) -> Dict:
         """
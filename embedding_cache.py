@@ -0,0 +1,292 @@
+"""
+Embedding Cache - Cache de Embeddings em Disco
+Guarda embeddings como vetores float32 compactados, endereçados por (provedor, modelo, hash do texto)
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = 'embeddings.sqlite3'
+
+# Espera máxima (segundos) pelo lock de escrita de outro processo
+LOCK_TIMEOUT = 30
+
+# Entradas removidas por consulta durante a remoção LRU
+EVICTION_BATCH = 256
+
+# Acessos (acertos) acumulados em memória antes de uma transação própria para gravá-los;
+# antes disso eles vão junto com a próxima escrita (put_many) ou com close()
+ACCESS_FLUSH_THRESHOLD = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (provider, model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access);
+CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_meta VALUES ('size_bytes', 0);
+CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings BEGIN
+    UPDATE cache_meta SET value = value + length(NEW.vector) WHERE name = 'size_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings BEGIN
+    UPDATE cache_meta SET value = value - length(OLD.vector) WHERE name = 'size_bytes';
+END;
+"""
+
+CacheKey = Tuple[str, str, bytes]
+
+class EmbeddingCache:
+    """
+    Cache de embeddings persistente e limitado em bytes
+    Vetores float32 em um banco SQLite (modo WAL), removidos por LRU ao exceder o limite de tamanho
+
+    Vários processos podem ler e escrever no mesmo diretório ao mesmo tempo: cada um abre
+    a sua instância, leituras não bloqueiam e escritas são transações serializadas pelo
+    SQLite. Dentro de um processo, a instância pode ser compartilhada entre threads.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = './cache', max_size_mb: float = 200):
+        """
+        Inicializa o cache de embeddings
+
+        Args:
+            cache_directory: Diretório base do cache (None: cache só em memória, do processo)
+            max_size_mb: Tamanho máximo dos vetores armazenados
+        """
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        # Chaves lidas cujo acesso ainda não foi gravado (ordem de acesso)
+        self._pending_access = {}
+
+        if cache_directory is None:
+            self.cache_path = None
+            database = ':memory:'
+        else:
+            Path(cache_directory).mkdir(parents=True, exist_ok=True)
+            self.cache_path = Path(cache_directory) / CACHE_FILE_NAME
+            database = str(self.cache_path)
+
+        # Transações explícitas (isolation_level=None); timeout espera o lock de outros processos
+        self._connection = sqlite3.connect(database, timeout=LOCK_TIMEOUT, isolation_level=None,
+                                           check_same_thread=False)
+        if self.cache_path:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        stats = self.get_stats()
+        logger.info(f"🗄️ Embedding Cache inicializado: {stats['entries']} entradas, {stats['size_mb']:.1f}MB")
+
+    @staticmethod
+    def make_key(provider: str, model: str, text: str) -> CacheKey:
+        """Gera a chave de cache de um texto para um provedor e modelo"""
+        return provider, model, hashlib.sha256(text.encode('utf-8', 'surrogatepass')).digest()
+
+    def get(self, key: CacheKey) -> Optional[np.ndarray]:
+        """
+        Busca um embedding no cache
+
+        Args:
+            key: Chave gerada por make_key
+
+        Returns:
+            Optional[np.ndarray]: Vetor float32 ou None se ausente
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[CacheKey]) -> List[Optional[np.ndarray]]:
+        """
+        Busca vários embeddings no cache (um acesso ao banco)
+
+        Args:
+            keys: Chaves geradas por make_key
+
+        Returns:
+            List[Optional[np.ndarray]]: Vetor float32 de cada chave, ou None se ausente
+        """
+        vectors = [None] * len(keys)
+        if not keys:
+            return vectors
+
+        try:
+            with self._lock:
+                # Transação só de leitura: no modo WAL não espera escritas de outros processos
+                self._connection.execute("BEGIN")
+                try:
+                    for i, key in enumerate(keys):
+                        row = self._connection.execute(
+                            "SELECT vector FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?", key
+                        ).fetchone()
+                        if row is not None:
+                            vectors[i] = np.frombuffer(row[0], dtype=np.float32)
+                            self._pending_access.pop(key, None)
+                            self._pending_access[key] = None
+                finally:
+                    self._connection.execute("COMMIT")
+
+                # Acessos para a política LRU são gravados em lote, fora do caminho de leitura
+                if len(self._pending_access) >= ACCESS_FLUSH_THRESHOLD:
+                    self._connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        self._flush_access()
+                        self._connection.execute("COMMIT")
+                    except sqlite3.Error:
+                        self._connection.execute("ROLLBACK")
+                        raise
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Erro lendo cache de embeddings: {e}")
+
+        found = sum(vector is not None for vector in vectors)
+        self.stats['hits'] += found
+        self.stats['misses'] += len(keys) - found
+        return vectors
+
+    def put(self, key: CacheKey, embedding: Sequence[float]):
+        """
+        Armazena um embedding no cache
+
+        Args:
+            key: Chave gerada por make_key
+            embedding: Vetor do embedding (armazenado como float32)
+        """
+        self.put_many([(key, embedding)])
+
+    def put_many(self, items: Iterable[Tuple[CacheKey, Sequence[float]]]):
+        """
+        Armazena vários embeddings no cache (uma transação) e reaplica o limite de tamanho
+
+        Args:
+            items: Pares (chave gerada por make_key, vetor do embedding)
+        """
+        rows = []
+        for key, embedding in items:
+            vector = np.asarray(embedding, dtype=np.float32).tobytes()
+            if len(vector) > self.max_size_bytes:
+                logger.warning(f"⚠️ Embedding maior que o cache ({len(vector)} bytes), não armazenado")
+                continue
+            rows.append((*key, vector))
+        if not rows:
+            return
+
+        try:
+            with self._lock:
+                self._connection.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush_access()
+                    access = self._next_access()
+                    self._connection.executemany(
+                        "INSERT INTO embeddings VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (provider, model, text_hash) DO UPDATE SET last_access = excluded.last_access",
+                        [(*row, access) for row in rows]
+                    )
+                    evicted = self._evict()
+                    self._connection.execute("COMMIT")
+                except sqlite3.Error:
+                    self._connection.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Erro gravando cache de embeddings: {e}")
+            return
+
+        self.stats['writes'] += len(rows)
+        self.stats['evictions'] += evicted
+
+    def _flush_access(self):
+        """Grava os acessos pendentes com um novo valor do relógio lógico (dentro da transação de escrita)"""
+        if not self._pending_access:
+            return
+        access = self._next_access()
+        self._connection.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+            [(access, *key) for key in self._pending_access]
+        )
+        self._pending_access.clear()
+    
+    def _next_access(self) -> int:
+        """
+        Próximo valor do relógio lógico de acesso (dentro da transação de escrita)
+
+        Um contador no próprio banco, e não o relógio do sistema, ordena os acessos de
+        todos os processos sem empates entre escritas consecutivas.
+        """
+        return self._connection.execute("SELECT COALESCE(MAX(last_access), 0) + 1 FROM embeddings").fetchone()[0]
+
+    def _size_bytes(self) -> int:
+        """Bytes ocupados pelos vetores (mantido pelos triggers do banco)"""
+        return self._connection.execute("SELECT value FROM cache_meta WHERE name = 'size_bytes'").fetchone()[0]
+
+    def _evict(self) -> int:
+        """Remove as entradas menos usadas até respeitar max_size_mb (dentro da transação de escrita)"""
+        evicted = 0
+        excess = self._size_bytes() - self.max_size_bytes
+        while excess > 0:
+            oldest = self._connection.execute(
+                "SELECT provider, model, text_hash, length(vector) FROM embeddings "
+                "ORDER BY last_access LIMIT ?", (EVICTION_BATCH,)
+            ).fetchall()
+            if not oldest:
+                break
+
+            # Remover só o necessário do lote mais antigo
+            for provider, model, text_hash, size in oldest:
+                if excess <= 0:
+                    break
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?",
+                    (provider, model, text_hash)
+                )
+                excess -= size
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._pending_access.clear()
+            self._connection.execute("DELETE FROM embeddings")
+
+    def close(self):
+        """Grava os acessos pendentes e fecha a conexão com o banco"""
+        with self._lock:
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush_access()
+                    self._connection.execute("COMMIT")
+                except sqlite3.Error:
+                    self._connection.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Erro gravando acessos do cache de embeddings: {e}")
+            self._connection.close()
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do cache (acertos deste processo; entradas e tamanho do cache compartilhado)"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            size_bytes = self._size_bytes()
+
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0,
+            'entries': entries,
+            'size_mb': round(size_bytes / (1024 * 1024), 2),
+            'max_size_mb': round(self.max_size_bytes / (1024 * 1024), 2)
+        }
@@ -4,34 +4,54 @@ Cria embeddings para chunks de texto usando diferentes provedores
 """
 
 import os
+import hashlib
 import logging
+import threading
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 import json
 from datetime import datetime
 
+from embedding_cache import EmbeddingCache
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dimensão dos embeddings de fallback
+FALLBACK_EMBEDDING_DIM = 384
+
+# Textos por requisição/passada do modelo (performance_config.batch_size.embedding_generation)
+DEFAULT_BATCH_SIZE = 10
+
+# Limite do cache em memória usado quando nenhum cache persistente é informado
+MEMORY_CACHE_MB = 64
+
+# RandomState por thread, re-semeado a cada embedding de fallback (criar um novo é ~10x mais lento)
+_fallback_rng = threading.local()
+
 class EmbeddingGenerator:
     """
     Gerador de embeddings com suporte a múltiplos provedores
     Suporta OpenAI, Hugging Face, e modelos locais
     """
     
-    def __init__(self, provider: str = 'openai', model: str = None):
+    def __init__(self, provider: str = 'openai', model: str = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache: EmbeddingCache = None):
         """
         Inicializa o gerador de embeddings
         
         Args:
             provider: Provedor de embeddings ('openai', 'huggingface', 'local')
             model: Nome do modelo específico
+            batch_size: Textos por requisição à API / passada do modelo
+            cache: Cache de embeddings (None: cache em memória de MEMORY_CACHE_MB, só deste processo)
         """
         self.provider = provider
         self.model = model or self._get_default_model(provider)
+        self.batch_size = max(1, batch_size)
         self.client = None
-        self.embedding_cache = {}
+        self.embedding_cache = cache if cache is not None else EmbeddingCache(None, MEMORY_CACHE_MB)
         
         self._initialize_provider()
         logger.info(f"🔗 Embedding Generator inicializado: {provider}/{self.model}")
@@ -132,34 +152,77 @@ class EmbeddingGenerator:
         
         logger.info(f"🔄 Gerando embeddings para {len(texts)} textos")
         
-        embeddings = []
+        embeddings = [None] * len(texts)
         
+        # Textos repetidos geram um único embedding
+        positions = {}
         for i, text in enumerate(texts):
-            # Verificar cache primeiro
-            cache_key = self._get_cache_key(text)
-            if cache_key in self.embedding_cache:
-                embeddings.append(self.embedding_cache[cache_key])
+            positions.setdefault(self._get_cache_key(text), []).append(i)
+        
+        # Verificar cache primeiro
+        pending = {}
+        for cache_key, cached in zip(positions, self.embedding_cache.get_many(list(positions))):
+            if cached is None:
+                pending[cache_key] = positions[cache_key]
                 continue
+            embedding = cached.tolist()
+            for i in positions[cache_key]:
+                embeddings[i] = embedding
+        
+        # Gerar os textos fora do cache em lotes de batch_size (uma requisição/passada por lote)
+        pending_keys = list(pending)
+        for batch_start in range(0, len(pending_keys), self.batch_size):
+            batch_keys = pending_keys[batch_start:batch_start + self.batch_size]
+            batch_texts = [texts[pending[cache_key][0]] for cache_key in batch_keys]
             
-            # Gerar embedding
             try:
-                embedding = self._generate_single_embedding(text)
-                embeddings.append(embedding)
-                
-                # Adicionar ao cache
-                self.embedding_cache[cache_key] = embedding
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"📊 Processados {i + 1}/{len(texts)} embeddings")
-                    
+                batch_embeddings = self._generate_batch_embeddings(batch_texts)
             except Exception as e:
-                logger.error(f"❌ Erro gerando embedding para texto {i}: {e}")
-                # Usar embedding de fallback
-                embeddings.append(self._generate_fallback_embedding(text))
+                logger.error(f"❌ Erro gerando embeddings do lote {batch_start // self.batch_size}: {e}")
+                # Usar embeddings de fallback (fora do cache)
+                batch_embeddings = [self._generate_fallback_embedding(text) for text in batch_texts]
+            else:
+                # Mesma precisão do cache (float32): textos inalterados voltam com vetores idênticos
+                batch_embeddings = np.asarray(batch_embeddings, dtype=np.float32).tolist()
+                self.embedding_cache.put_many(zip(batch_keys, batch_embeddings))
+            
+            # Devolver cada embedding às posições originais dos textos
+            for cache_key, embedding in zip(batch_keys, batch_embeddings):
+                for i in pending[cache_key]:
+                    embeddings[i] = embedding
+            
+            processed = min(batch_start + self.batch_size, len(pending_keys))
+            if len(pending_keys) > self.batch_size:
+                logger.info(f"📊 Processados {processed}/{len(pending_keys)} embeddings")
         
         logger.info(f"✅ {len(embeddings)} embeddings gerados")
         return embeddings
     
+    def generate_embedding_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Gera embeddings transitórios como matriz float32, sem passar pelo cache
+        (ex.: frases do chunking semântico, usadas uma única vez)
+        
+        Args:
+            texts: Lista de textos para embedding
+            
+        Returns:
+            np.ndarray: Matriz (len(texts), dimensão) de embeddings
+        """
+        if self.provider == 'fallback':
+            matrix = np.empty((len(texts), FALLBACK_EMBEDDING_DIM))
+            for i, text in enumerate(texts):
+                matrix[i] = self._fallback_sample(text)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            return matrix.astype(np.float32)
+        
+        try:
+            embeddings = self._generate_batch_embeddings(texts)
+        except Exception as e:
+            logger.error(f"❌ Erro gerando embeddings do lote: {e}")
+            embeddings = [self._generate_fallback_embedding(text) for text in texts]
+        return np.asarray(embeddings, dtype=np.float32)
+    
     def _generate_single_embedding(self, text: str) -> List[float]:
         """Gera embedding para um texto único"""
         if self.provider == 'openai':
@@ -169,6 +232,15 @@ class EmbeddingGenerator:
         else:
             return self._generate_fallback_embedding(text)
     
+    def _generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Gera embeddings para um lote de textos em uma única requisição/passada do modelo"""
+        if self.provider == 'openai':
+            return self._generate_openai_embeddings(texts)
+        elif self.provider in ['huggingface', 'local']:
+            return self._generate_transformer_embeddings(texts)
+        else:
+            return [self._generate_fallback_embedding(text) for text in texts]
+    
     def _generate_openai_embedding(self, text: str) -> List[float]:
         """Gera embedding usando OpenAI"""
         try:
@@ -182,6 +254,18 @@ class EmbeddingGenerator:
             logger.error(f"❌ Erro OpenAI embedding: {e}")
             return self._generate_fallback_embedding(text)
     
+    def _generate_openai_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Gera embeddings de um lote usando OpenAI (uma requisição com todos os textos)"""
+        response = self.client.Embedding.create(
+            input=texts,
+            model=self.model
+        )
+        # A resposta traz o índice de cada texto do lote
+        data = sorted(response['data'], key=lambda item: item['index'])
+        if len(data) != len(texts):
+            raise ValueError(f"OpenAI retornou {len(data)} embeddings para {len(texts)} textos")
+        return [item['embedding'] for item in data]
+    
     def _generate_transformer_embedding(self, text: str) -> List[float]:
         """Gera embedding usando Sentence Transformers"""
         try:
@@ -192,28 +276,36 @@ class EmbeddingGenerator:
             logger.error(f"❌ Erro transformer embedding: {e}")
             return self._generate_fallback_embedding(text)
     
+    def _generate_transformer_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Gera embeddings de um lote usando Sentence Transformers (uma passada do modelo)"""
+        return self.client.encode(texts, batch_size=len(texts), convert_to_numpy=True).tolist()
+    
     def _generate_fallback_embedding(self, text: str) -> List[float]:
         """Gera embedding de fallback (baseado em hash do texto)"""
-        # Usar hash do texto para gerar embedding determinístico
-        import hashlib
-        
+        return self._fallback_vector(text).tolist()
+    
+    def _fallback_vector(self, text: str) -> np.ndarray:
+        """Vetor de fallback determinístico e normalizado para o texto"""
+        embedding = self._fallback_sample(text)
+        return embedding / np.linalg.norm(embedding)
+    
+    def _fallback_sample(self, text: str) -> np.ndarray:
+        """Amostra normal determinística (não normalizada) semeada pelo hash do texto"""
         # Criar seed baseado no texto
         seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
-        np.random.seed(seed)
-        
-        # Gerar embedding de dimensão fixa
-        embedding_dim = 384  # Dimensão padrão
-        embedding = np.random.normal(0, 1, embedding_dim)
         
-        # Normalizar
-        embedding = embedding / np.linalg.norm(embedding)
+        # Gerador da thread (mesma sequência de np.random.seed) para ser seguro entre threads
+        rng = getattr(_fallback_rng, 'state', None)
+        if rng is None:
+            rng = _fallback_rng.state = np.random.RandomState()
+        rng.seed(seed)
         
-        return embedding.tolist()
+        # Gerar embedding de dimensão fixa
+        return rng.normal(0, 1, FALLBACK_EMBEDDING_DIM)
     
-    def _get_cache_key(self, text: str) -> str:
+    def _get_cache_key(self, text: str) -> Tuple[str, str, bytes]:
         """Gera chave de cache para o texto"""
-        import hashlib
-        return hashlib.md5(f"{self.provider}_{self.model}_{text}".encode()).hexdigest()
+        return EmbeddingCache.make_key(self.provider, self.model, text)
     
     def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -291,16 +383,14 @@ class EmbeddingGenerator:
         # Gerar embedding da query
         query_embedding = self._generate_single_embedding(query_text)
         
-        # Extrair embeddings dos documentos
-        doc_embeddings = []
-        for doc in documents:
-            if 'embedding' in doc:
-                doc_embeddings.append(doc['embedding'])
-            else:
-                # Gerar embedding se não existir
-                embedding = self._generate_single_embedding(doc.get('text', ''))
+        # Gerar em lote os embeddings que não existirem
+        missing = [doc for doc in documents if 'embedding' not in doc]
+        if missing:
+            for doc, embedding in zip(missing, self.generate_embeddings([doc.get('text', '') for doc in missing])):
                 doc['embedding'] = embedding
-                doc_embeddings.append(embedding)
+        
+        # Extrair embeddings dos documentos
+        doc_embeddings = [doc['embedding'] for doc in documents]
         
         # Encontrar mais similares
         similar_indices = self.find_most_similar(
@@ -310,7 +400,7 @@ class EmbeddingGenerator:
         # Retornar documentos com scores
         results = []
         for idx, score in similar_indices:
-            doc = documents[idx].copy()
+            doc = dict(documents[idx])
             doc['similarity_score'] = score
             results.append(doc)
         
@@ -0,0 +1,190 @@
+"""
+Extraction Cache - Cache de Extração em Disco
+Guarda o texto extraído de documentos, endereçado pelo conteúdo do arquivo
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_SUFFIX = '.json.z'
+
+class ExtractionCache:
+    """
+    Cache de extração endereçado por conteúdo
+    Entradas são JSON comprimido com zlib, removidas por LRU ao exceder o limite de tamanho
+    """
+
+    def __init__(self, cache_directory: str = './cache', max_size_mb: float = 500):
+        """
+        Inicializa o cache de extração
+
+        Args:
+            cache_directory: Diretório base do cache
+            max_size_mb: Tamanho máximo ocupado em disco pelas entradas
+        """
+        self.cache_directory = Path(cache_directory) / 'extractions'
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+
+        # Índice LRU: chave -> tamanho em bytes (mais antigo primeiro)
+        self._entries = OrderedDict()
+        self.current_size = 0
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        self._load_index()
+        logger.info(f"🗄️ Extraction Cache inicializado: {len(self._entries)} entradas, "
+                    f"{self.current_size / (1024 * 1024):.1f}MB")
+
+    @staticmethod
+    def make_key(content_hash: str, file_extension: str, extractor_version: str) -> str:
+        """Gera a chave de cache para um conteúdo e versão de extrator"""
+        raw_key = f"{extractor_version}:{file_extension}:{content_hash}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def _load_index(self):
+        """Reconstrói o índice LRU a partir dos arquivos em disco (último acesso = mtime)"""
+        self._entries.clear()
+        self.current_size = 0
+
+        entries = []
+        for path in self.cache_directory.glob(f"*/*{CACHE_FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.name[:-len(CACHE_FILE_SUFFIX)], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self.current_size += size
+
+    def refresh(self):
+        """
+        Relê o índice do disco e reaplica o limite de tamanho
+
+        Útil após escritas de outros processos (ex.: pool de extração)
+        """
+        self._load_index()
+        self._evict()
+
+    def _entry_path(self, key: str) -> Path:
+        """Caminho do arquivo de uma entrada"""
+        return self.cache_directory / key[:2] / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Busca uma extração no cache
+
+        Args:
+            key: Chave gerada por make_key
+
+        Returns:
+            Optional[Dict]: Resultado da extração ou None se ausente
+        """
+        path = self._entry_path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                result = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            # Registrar acesso para a política LRU (compartilhada entre processos via mtime)
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(key)
+            self.stats['misses'] += 1
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"⚠️ Entrada de cache corrompida {key}: {e}")
+            self._remove(key)
+            self.stats['misses'] += 1
+            return None
+
+        if key not in self._entries:
+            self._entries[key] = path.stat().st_size
+            self.current_size += self._entries[key]
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return result
+
+    def put(self, key: str, result: Dict):
+        """
+        Armazena uma extração no cache
+
+        Args:
+            key: Chave gerada por make_key
+            result: Resultado da extração (serializável em JSON)
+        """
+        data = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+
+        if len(data) > self.max_size_bytes:
+            logger.warning(f"⚠️ Extração maior que o cache ({len(data)} bytes), não armazenada")
+            return
+
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # Escrita atômica: outros processos nunca veem uma entrada parcial
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Erro gravando cache {key}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        self._forget(key)
+        self._entries[key] = len(data)
+        self.current_size += len(data)
+        self.stats['writes'] += 1
+
+        self._evict()
+
+    def _evict(self):
+        """Remove as entradas menos usadas até respeitar max_size_mb"""
+        while self.current_size > self.max_size_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def _forget(self, key: str):
+        """Remove uma entrada apenas do índice"""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.current_size -= size
+
+    def _remove(self, key: str):
+        """Remove uma entrada do índice e do disco"""
+        self._forget(key)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        for key in list(self._entries):
+            self._remove(key)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do cache"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0,
+            'entries': len(self._entries),
+            'size_mb': round(self.current_size / (1024 * 1024), 2),
+            'max_size_mb': round(self.max_size_bytes / (1024 * 1024), 2)
+        }
@@ -0,0 +1,256 @@
+"""
+Extraction Pool - Pool Supervisionado de Extração
+Executa extratores em processos isolados com timeout e limite de memória por documento
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Intervalo máximo entre verificações de memória dos workers (segundos)
+MEMORY_POLL_INTERVAL = 0.5
+
+# Workers nunca são criados por fork do processo atual, que pode ter threads (ex.: o
+# pipeline de ingestão) e locks travados nelas: forkserver quando disponível, senão spawn
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def _worker_main(conn, config: Dict, extract_function: Optional[Callable] = None):
+    """Laço de um worker: recebe (index, file_path[, conteúdo]), devolve o resultado da extração"""
+    from document_processor import DocumentProcessor
+
+    processor = DocumentProcessor(config)
+    extract_function = extract_function or DocumentProcessor._process_file
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if task is None:
+            break
+
+        conn.send(extract_function(processor, *task))
+
+def _get_rss_bytes(pid: int) -> int:
+    """Memória residente de um processo (0 se indisponível)"""
+    if psutil:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except Exception:
+            return 0
+
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+class _Worker:
+    """Processo de extração e a tarefa que ele executa no momento"""
+
+    def __init__(self, context, config: Dict, extract_function: Optional[Callable] = None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, config, extract_function),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.started_at = 0.0
+
+    def assign(self, task: Tuple):
+        """Envia uma tarefa ao worker"""
+        self.task = task
+        self.started_at = time.time()
+        self.conn.send(task)
+
+    def stop(self, force: bool = False):
+        """Encerra o worker (força com kill se necessário)"""
+        if not force:
+            try:
+                self.conn.send(None)
+            except OSError:
+                force = True
+
+        if force:
+            self.process.kill()
+
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class SupervisedExtractionPool:
+    """
+    Pool de processos de extração supervisionado
+    Workers que excedem o timeout ou o limite de memória são encerrados e substituídos
+    """
+
+    def __init__(self, config: Dict = None, max_workers: int = None,
+                 timeout: Optional[float] = None, max_memory_mb: Optional[float] = None,
+                 extract_function: Optional[Callable] = None):
+        """
+        Inicializa o pool
+
+        Args:
+            config: Configuração do sistema, repassada ao DocumentProcessor de cada worker
+            max_workers: Número de processos (padrão: performance_config.concurrency.max_workers)
+            timeout: Tempo máximo por documento em segundos (padrão: performance_config.timeouts.document_processing)
+            max_memory_mb: Memória residente máxima por worker (padrão: performance_config.concurrency.max_worker_memory_mb)
+            extract_function: Função (processor, index, file_path[, conteúdo]) -> resultado executada
+                              nos workers, definida em nível de módulo (padrão: DocumentProcessor._process_file)
+        """
+        self.config = config or {}
+        performance = self.config.get('performance_config', {})
+        concurrency = performance.get('concurrency', {})
+
+        self.max_workers = max(1, max_workers or concurrency.get('max_workers', os.cpu_count() or 1))
+        self.timeout = timeout if timeout is not None else performance.get('timeouts', {}).get('document_processing')
+        memory_mb = max_memory_mb if max_memory_mb is not None else concurrency.get('max_worker_memory_mb')
+        self.max_memory_bytes = int(memory_mb * 1024 * 1024) if memory_mb else None
+
+        self.extract_function = extract_function
+        self._context = multiprocessing.get_context(START_METHOD)
+        self._workers = []
+        self.stats = {'completed': 0, 'timeouts': 0, 'memory_kills': 0, 'crashes': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _spawn_worker(self) -> _Worker:
+        """Cria um novo worker"""
+        worker = _Worker(self._context, self.config, self.extract_function)
+        self._workers.append(worker)
+        return worker
+
+    def _replace_worker(self, worker: _Worker):
+        """Mata um worker e coloca outro no lugar"""
+        self._workers.remove(worker)
+        worker.stop(force=True)
+        self._spawn_worker()
+
+    def close(self):
+        """Encerra todos os workers"""
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+    def imap_unordered(self, tasks: Iterable[Tuple]) -> Iterator[Dict]:
+        """
+        Extrai arquivos, entregando os resultados na ordem de conclusão
+
+        Tarefas são consumidas só quando há worker ocioso: no máximo max_workers
+        conteúdos em memória (membros de arquivos compactados) ficam retidos.
+
+        Args:
+            tasks: Tuplas (index, file_path) ou (index, file_path, conteúdo em bytes)
+
+        Yields:
+            Dict: Resultado por arquivo no formato de DocumentProcessor._process_file
+        """
+        while len(self._workers) < self.max_workers:
+            self._spawn_worker()
+
+        tasks = iter(tasks)
+        exhausted = False
+
+        while True:
+            # Distribuir tarefas para workers ociosos
+            for worker in list(self._workers):
+                if worker.task is None and not exhausted:
+                    try:
+                        worker.assign(next(tasks))
+                    except StopIteration:
+                        exhausted = True
+
+            busy = [w for w in self._workers if w.task is not None]
+            if not busy:
+                break
+
+            ready = wait(
+                [w.conn for w in busy] + [w.process.sentinel for w in busy],
+                timeout=self._wait_timeout(busy)
+            )
+
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        result = worker.conn.recv()
+                    except (EOFError, OSError):
+                        yield self._fail(worker, "worker encerrado inesperadamente", 'crashes')
+                        continue
+                    worker.task = None
+                    self.stats['completed'] += 1
+                    yield result
+                elif worker.process.sentinel in ready:
+                    # Sentinela pronta: o processo terminou; join obtém o código de saída
+                    worker.process.join(timeout=1)
+                    yield self._fail(
+                        worker, f"worker encerrado inesperadamente (código {worker.process.exitcode})", 'crashes'
+                    )
+
+            yield from self._enforce_limits()
+
+    def _wait_timeout(self, busy) -> Optional[float]:
+        """Tempo até o próximo prazo a verificar"""
+        timeouts = []
+        if self.timeout:
+            next_deadline = min(w.started_at for w in busy) + self.timeout
+            timeouts.append(max(0.0, next_deadline - time.time()))
+        if self.max_memory_bytes:
+            timeouts.append(MEMORY_POLL_INTERVAL)
+        return min(timeouts) if timeouts else None
+
+    def _enforce_limits(self) -> Iterator[Dict]:
+        """
+        Encerra workers acima do timeout ou do limite de memória
+
+        O prazo conta desde o envio da tarefa, que o worker começa a executar na hora;
+        um resultado já disponível na conexão significa que o worker terminou a tempo,
+        mesmo que o consumidor tenha demorado a pedir o próximo resultado.
+        """
+        now = time.time()
+
+        for worker in list(self._workers):
+            if worker.task is None or worker.conn.poll():
+                continue
+
+            if self.timeout and now - worker.started_at > self.timeout:
+                yield self._fail(worker, f"timeout de {self.timeout}s excedido", 'timeouts')
+            elif self.max_memory_bytes and _get_rss_bytes(worker.process.pid) > self.max_memory_bytes:
+                limit_mb = self.max_memory_bytes / (1024 * 1024)
+                yield self._fail(worker, f"limite de memória de {limit_mb:.0f}MB excedido", 'memory_kills')
+
+    def _fail(self, worker: _Worker, reason: str, stat_key: str) -> Dict:
+        """Registra a falha da tarefa atual e substitui o worker"""
+        index, file_path = worker.task[:2]
+        processing_time = time.time() - worker.started_at
+
+        logger.error(f"❌ Erro processando {file_path}: {reason}")
+        self.stats[stat_key] += 1
+        self._replace_worker(worker)
+
+        return {
+            'index': index,
+            'file_path': file_path,
+            'success': False,
+            'document': None,
+            'error': reason,
+            'processing_time': processing_time
+        }
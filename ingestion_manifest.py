@@ -0,0 +1,146 @@
+"""
+Ingestion Manifest - Manifesto de Ingestão Incremental
+Registra (caminho, tamanho, mtime, hash) de cada arquivo ingerido para re-sincronizações incrementais
+"""
+
+import os
+import json
+import logging
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+class IngestionManifest:
+    """
+    Manifesto persistente dos arquivos ingeridos
+    Permite detectar arquivos adicionados, modificados e removidos entre execuções
+    """
+
+    def __init__(self, manifest_path: str = './ingestion_manifest.json'):
+        """
+        Inicializa o manifesto
+
+        Args:
+            manifest_path: Caminho do arquivo JSON do manifesto
+        """
+        self.manifest_path = manifest_path
+        self.files = {}
+        self._load()
+        logger.info(f"📒 Manifesto de ingestão carregado: {len(self.files)} arquivos")
+
+    def _load(self):
+        """Carrega o manifesto do disco, se existir"""
+        if not os.path.exists(self.manifest_path):
+            return
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Manifesto ilegível, será recriado: {e}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            logger.warning("⚠️ Versão de manifesto incompatível, será recriado")
+            return
+
+        self.files = data.get('files', {})
+
+    def save(self):
+        """Grava o manifesto de forma atômica"""
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def diff(self, file_infos: Iterable[Dict], hash_function: Callable[[str], str],
+             scope: str = None) -> Dict[str, List[Dict]]:
+        """
+        Compara o estado atual dos arquivos com o manifesto
+
+        O hash do conteúdo só é calculado quando tamanho ou mtime mudaram; se o
+        conteúdo for o mesmo, a entrada tem tamanho/mtime atualizados no manifesto.
+
+        Args:
+            file_infos: Informações dos arquivos atuais (formato de get_document_info)
+            hash_function: Função que calcula o hash do conteúdo de um arquivo
+            scope: Diretório sincronizado; só entradas dentro dele podem ser dadas como removidas
+
+        Returns:
+            Dict: Listas 'added', 'modified', 'unchanged' e 'deleted' de registros
+                  (file_path, file_size, modified_time, content_hash)
+        """
+        changes = {'added': [], 'modified': [], 'unchanged': [], 'deleted': []}
+        seen = set()
+
+        for info in file_infos:
+            file_path = os.path.abspath(info['file_path'])
+            seen.add(file_path)
+
+            record = {
+                'file_path': file_path,
+                'file_size': info['file_size'],
+                'modified_time': info['modified_time']
+            }
+            entry = self.files.get(file_path)
+
+            if entry and entry['file_size'] == record['file_size'] \
+                    and entry['modified_time'] == record['modified_time']:
+                record['content_hash'] = entry['content_hash']
+                changes['unchanged'].append(record)
+                continue
+
+            record['content_hash'] = hash_function(file_path)
+
+            if entry is None:
+                changes['added'].append(record)
+            elif entry['content_hash'] == record['content_hash']:
+                # Apenas metadados mudaram (ex.: touch/cópia): conteúdo idêntico
+                entry.update(file_size=record['file_size'], modified_time=record['modified_time'])
+                changes['unchanged'].append(record)
+            else:
+                changes['modified'].append(record)
+
+        scope_prefix = os.path.join(os.path.abspath(scope), '') if scope else None
+        for file_path, entry in self.files.items():
+            if file_path in seen:
+                continue
+            if scope_prefix and not file_path.startswith(scope_prefix):
+                continue
+            changes['deleted'].append({'file_path': file_path, **entry})
+
+        return changes
+
+    def update(self, record: Dict, **extra):
+        """
+        Registra um arquivo ingerido
+
+        Args:
+            record: Registro produzido por diff (file_path, file_size, modified_time, content_hash)
+            **extra: Campos adicionais (ex.: chunk_count)
+        """
+        self.files[os.path.abspath(record['file_path'])] = {
+            'file_size': record['file_size'],
+            'modified_time': record['modified_time'],
+            'content_hash': record['content_hash'],
+            'ingested_at': datetime.now().isoformat(),
+            **extra
+        }
+
+    def remove(self, file_path: str):
+        """Remove um arquivo do manifesto"""
+        self.files.pop(os.path.abspath(file_path), None)
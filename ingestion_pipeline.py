@@ -0,0 +1,262 @@
+"""
+Ingestion Pipeline - Pipeline de Ingestão Assíncrono
+Sobrepõe extração, chunking, embeddings e armazenamento com filas limitadas entre os estágios
+"""
+
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marcador de fim de fluxo entre estágios
+_END = object()
+
+class IngestionPipeline:
+    """
+    Pipeline de ingestão em estágios: extração → chunking → embeddings → armazenamento
+    Cada estágio tem concorrência própria; filas limitadas entre eles aplicam
+    backpressure, de modo que no máximo queue_size documentos esperam em cada fila
+    """
+
+    def __init__(self, doc_processor, chunking_engine, embedding_generator,
+                 store_function: Callable[[List[Dict], List, str], None],
+                 config: Dict = None, chunk_strategy: str = 'recursive_500_100',
+                 chunk_filter: Callable[[str, str, List[Dict]], List[Dict]] = None,
+                 chunk_commit: Callable[[str], None] = None,
+                 chunk_discard: Callable[[str], None] = None):
+        """
+        Inicializa o pipeline
+
+        Args:
+            doc_processor: DocumentProcessor usado na extração
+            chunking_engine: ChunkingEngine usado na segmentação
+            embedding_generator: EmbeddingGenerator usado nos embeddings
+            store_function: Função (chunks, embeddings, source_file) que grava no vector store
+            config: Configuração do sistema (performance_config.pipeline)
+            chunk_strategy: Estratégia de chunking
+            chunk_filter: Função (source_file, conteúdo, chunks) -> chunks a embedar,
+                          chamada no estágio de chunking (ex.: Deduplicator.filter; deve ser thread-safe)
+            chunk_commit: Função (source_file) chamada depois que os chunks filtrados foram
+                          armazenados (ex.: Deduplicator.commit)
+            chunk_discard: Função (source_file) chamada quando um estágio posterior ao
+                           filtro falha (ex.: Deduplicator.discard)
+        """
+        self.doc_processor = doc_processor
+        self.chunking_engine = chunking_engine
+        self.embedding_generator = embedding_generator
+        self.store_function = store_function
+        self.chunk_strategy = chunk_strategy
+        self.chunk_filter = chunk_filter
+        self.chunk_commit = chunk_commit
+        self.chunk_discard = chunk_discard
+
+        performance = (config or {}).get('performance_config', {})
+        pipeline_config = performance.get('pipeline', {})
+        default_extract_workers = performance.get('concurrency', {}).get('max_workers', 1)
+
+        self.queue_size = max(1, pipeline_config.get('queue_size', 8))
+        self.extract_workers = max(1, pipeline_config.get('extract_workers', default_extract_workers))
+        self.chunk_workers = max(1, pipeline_config.get('chunk_workers', 2))
+        self.embed_workers = max(1, pipeline_config.get('embed_workers', 4))
+
+    def process(self, file_paths: Iterable[str]) -> Dict:
+        """Executa o pipeline de forma síncrona (ver run)"""
+        return asyncio.run(self.run(file_paths))
+
+    async def run(self, file_paths: Iterable[str]) -> Dict:
+        """
+        Ingere documentos com todos os estágios trabalhando em paralelo
+
+        A extração roda no pool supervisionado do DocumentProcessor (uma thread
+        alimenta a fila de chunking); chunking e embeddings rodam em threads e o
+        armazenamento em um único consumidor, no loop de eventos.
+
+        Args:
+            file_paths: Caminhos dos arquivos
+
+        Returns:
+            Dict: Resultado no formato de RAGAgent.process_documents, mais
+                  'throughput' (docs/s, chunks/s) e 'stages' (itens, tempo ocupado,
+                  utilização e profundidade da fila de entrada por estágio)
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+
+        state = {
+            'processed_files': [],
+            'total_chunks': 0,
+            'chunks_per_file': {},
+            'errors': [],
+            'stages': {
+                name: {'workers': workers, 'items': 0, 'errors': 0, 'busy_time': 0.0,
+                       'queue_max': 0, 'queue_total': 0, 'queue_samples': 0}
+                for name, workers in [('extract', self.extract_workers), ('chunk', self.chunk_workers),
+                                      ('embed', self.embed_workers), ('store', 1)]
+            }
+        }
+        queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in ('chunk', 'embed', 'store')}
+
+        executor = ThreadPoolExecutor(max_workers=self.chunk_workers + self.embed_workers,
+                                      thread_name_prefix='ingestion')
+        try:
+            await asyncio.gather(
+                asyncio.to_thread(self._extract_stage, loop, file_paths, queues['chunk'], state),
+                self._run_stage('chunk', self._chunk, queues['chunk'], queues['embed'], state, executor),
+                self._run_stage('embed', self._embed, queues['embed'], queues['store'], state, executor),
+                self._run_stage('store', lambda item: self._store(item, state), queues['store'], None, state)
+            )
+        finally:
+            executor.shutdown(wait=False)
+
+        return self._build_report(state, time.perf_counter() - start_time)
+
+    def _extract_stage(self, loop, file_paths: Iterable[str], out_queue: asyncio.Queue, state: Dict):
+        """Estágio de extração (thread própria): a fila cheia bloqueia a thread e, com ela, o pool"""
+        stage = state['stages']['extract']
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(self._put(out_queue, item, state['stages']['chunk']), loop).result()
+
+        try:
+            results = self.doc_processor.iter_files(
+                file_paths, parallel=self.extract_workers > 1, max_workers=self.extract_workers
+            )
+            for result in results:
+                stage['items'] += 1
+                stage['busy_time'] += result['processing_time']
+
+                if result['success']:
+                    put({'source': result['file_path'], 'document': result['document']})
+                else:
+                    stage['errors'] += 1
+                    put({'source': result['file_path'], 'error': result['error']})
+        finally:
+            asyncio.run_coroutine_threadsafe(out_queue.put(_END), loop).result()
+
+    async def _run_stage(self, name: str, function: Callable[[Dict], Dict], in_queue: asyncio.Queue,
+                         out_queue, state: Dict, executor: ThreadPoolExecutor = None):
+        """Executa os workers de um estágio até o fim do fluxo"""
+        loop = asyncio.get_running_loop()
+        stage = state['stages'][name]
+
+        async def worker():
+            while True:
+                item = await in_queue.get()
+                if item is _END:
+                    # Devolver o marcador para os demais workers do estágio
+                    await in_queue.put(_END)
+                    return
+
+                if 'error' in item:
+                    # Falha de extração: registrada uma única vez, no primeiro estágio seguinte
+                    state['errors'].append(f"{item['source']}: {item['error']}")
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    if executor:
+                        item = await loop.run_in_executor(executor, function, item)
+                    else:
+                        item = function(item)
+                except Exception as e:
+                    logger.error(f"❌ Erro no estágio {name} para {item['source']}: {e}")
+                    if self.chunk_discard:
+                        self.chunk_discard(item['source'])
+                    stage['errors'] += 1
+                    state['errors'].append(f"{item['source']}: {e}")
+                    continue
+                finally:
+                    stage['busy_time'] += time.perf_counter() - started
+
+                stage['items'] += 1
+                if out_queue is not None:
+                    await self._put(out_queue, item, state['stages'][self._next_stage(name)])
+
+        await asyncio.gather(*(worker() for _ in range(stage['workers'])))
+
+        if out_queue is not None:
+            await out_queue.put(_END)
+
+    @staticmethod
+    def _next_stage(name: str) -> str:
+        """Estágio que consome a fila de saída de um estágio"""
+        return {'chunk': 'embed', 'embed': 'store'}[name]
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item: Dict, consumer_stage: Dict):
+        """Enfileira um item (aguardando se a fila estiver cheia) e amostra a profundidade da fila"""
+        await queue.put(item)
+        depth = queue.qsize()
+        consumer_stage['queue_max'] = max(consumer_stage['queue_max'], depth)
+        consumer_stage['queue_total'] += depth
+        consumer_stage['queue_samples'] += 1
+
+    def _chunk(self, item: Dict) -> Dict:
+        """Estágio de chunking"""
+        document = item.pop('document')
+        item['chunks'] = self.chunking_engine.create_chunks(
+            document['content'],
+            strategy=self.chunk_strategy,
+            offset_map=document.get('offset_map')
+        )
+        if self.chunk_filter:
+            item['chunks'] = self.chunk_filter(item['source'], document['content'], item['chunks'])
+        return item
+
+    def _embed(self, item: Dict) -> Dict:
+        """Estágio de embeddings"""
+        item['embeddings'] = self.embedding_generator.generate_embeddings(
+            [chunk['text'] for chunk in item['chunks']]
+        )
+        return item
+
+    def _store(self, item: Dict, state: Dict) -> Dict:
+        """Estágio de armazenamento (consumidor único: o store não precisa ser thread-safe)"""
+        self.store_function(item['chunks'], item['embeddings'], item['source'])
+        if self.chunk_commit:
+            self.chunk_commit(item['source'])
+
+        state['processed_files'].append(item['source'])
+        state['chunks_per_file'][item['source']] = len(item['chunks'])
+        state['total_chunks'] += len(item['chunks'])
+        return item
+
+    @staticmethod
+    def _build_report(state: Dict, elapsed: float) -> Dict:
+        """Monta o resultado final com vazão e métricas por estágio"""
+        stages = {}
+        for name, stage in state['stages'].items():
+            samples = stage['queue_samples']
+            stages[name] = {
+                'workers': stage['workers'],
+                'items': stage['items'],
+                'errors': stage['errors'],
+                'busy_time': round(stage['busy_time'], 3),
+                'utilization': round(stage['busy_time'] / (elapsed * stage['workers']), 3) if elapsed else 0,
+                'queue_max': stage['queue_max'],
+                'queue_avg': round(stage['queue_total'] / samples, 2) if samples else 0
+            }
+
+        documents = len(state['processed_files'])
+        report = {
+            'processed_files': state['processed_files'],
+            'total_chunks': state['total_chunks'],
+            'chunks_per_file': state['chunks_per_file'],
+            'processing_time': elapsed,
+            'errors': state['errors'],
+            'throughput': {
+                'documents_per_second': round(documents / elapsed, 2) if elapsed else 0,
+                'chunks_per_second': round(state['total_chunks'] / elapsed, 2) if elapsed else 0
+            },
+            'stages': stages
+        }
+
+        logger.info(f"🏭 Pipeline: {documents} documentos, {state['total_chunks']} chunks em {elapsed:.2f}s "
+                    f"({report['throughput']['documents_per_second']} docs/s, "
+                    f"{report['throughput']['chunks_per_second']} chunks/s)")
+        return report
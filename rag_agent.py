@@ -9,11 +9,38 @@ import time
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
+import numpy as np
+
+from chunking_engine import RecordMapping
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class StoredChunk(RecordMapping):
+    """
+    Chunk armazenado no vector store, em __slots__: embedding como array float32 e
+    timestamp compartilhado pelos chunks do mesmo documento. Acessível como dict.
+    """
+    __slots__ = ('text', 'embedding', 'source', 'index', 'timestamp', 'page_number')
+    
+    _fields = ('text', 'embedding', 'source', 'chunk_id', 'timestamp', 'page_number')
+    _optional = ('page_number',)
+    
+    def __init__(self, text: str, embedding, source: str, index: int, timestamp: str,
+                 page_number: int = None):
+        self.text = text
+        self.embedding = np.asarray(embedding, dtype=np.float32)
+        self.source = source
+        self.index = index
+        self.timestamp = timestamp
+        self.page_number = page_number
+    
+    @property
+    def chunk_id(self) -> str:
+        """Identificador do chunk (arquivo de origem e posição)"""
+        return f"{self.source}_{self.index}"
+
 class RAGAgent:
     """
     Agente RAG Principal - Coordena todo o sistema
@@ -31,6 +58,7 @@ class RAGAgent:
         self.vector_store = None
         self.llm_client = None
         self.chat_history = []
+        self.deduplicator = None
         
         # Métricas de performance
         self.metrics = {
@@ -92,15 +120,24 @@ class RAGAgent:
         try:
             # Inicializar processador de documentos
             from document_processor import DocumentProcessor
-            self.doc_processor = DocumentProcessor()
+            self.doc_processor = DocumentProcessor(self.config)
             
-            # Inicializar chunking engine
-            from chunking_engine import ChunkingEngine
-            self.chunking_engine = ChunkingEngine(self.config['chunking_strategies'])
+            performance = self.config.get('performance_config', {})
+            
+            # Inicializar gerador de embeddings (textos por requisição em batch_size.embedding_generation)
+            from embedding_generator import EmbeddingGenerator, DEFAULT_BATCH_SIZE
+            self.embedding_generator = EmbeddingGenerator(
+                batch_size=performance.get('batch_size', {}).get('embedding_generation', DEFAULT_BATCH_SIZE),
+                cache=self._setup_embedding_cache()
+            )
             
-            # Inicializar gerador de embeddings
-            from embedding_generator import EmbeddingGenerator
-            self.embedding_generator = EmbeddingGenerator()
+            # Inicializar chunking engine (o chunking semântico usa o mesmo gerador)
+            from chunking_engine import ChunkingEngine
+            token_counting = performance.get('token_counting', 'exact')
+            self.chunking_engine = ChunkingEngine(
+                self.config['chunking_strategies'], embedding_generator=self.embedding_generator,
+                approximate_tokens=token_counting == 'approximate'
+            )
             
             # Inicializar cliente LLM
             self._setup_llm_client()
@@ -112,6 +149,23 @@ class RAGAgent:
             logger.error(f"❌ Erro na inicialização: {e}")
             return False
     
+    def _setup_embedding_cache(self):
+        """Configura o cache persistente de embeddings (storage_config.embedding_cache); None se desabilitado"""
+        cache_config = self.config.get('storage_config', {}).get('embedding_cache', {})
+        
+        if not cache_config.get('enabled', False):
+            return None
+        
+        try:
+            from embedding_cache import EmbeddingCache
+            return EmbeddingCache(
+                cache_directory=cache_config.get('cache_directory', './cache'),
+                max_size_mb=cache_config.get('max_size_mb', 200)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Cache de embeddings em disco desabilitado: {e}")
+            return None
+    
     def _setup_llm_client(self):
         """Configura cliente LLM baseado na configuração"""
         provider = self.config['llm_config']['provider']
@@ -140,53 +194,222 @@ class RAGAgent:
         results = {
             'processed_files': [],
             'total_chunks': 0,
+            'chunks_per_file': {},
             'processing_time': 0,
             'errors': []
         }
         
-        try:
-            for file_path in file_paths:
+        deduplicator = self._get_deduplicator()
+        dedup_before = dict(deduplicator.stats) if deduplicator else None
+        
+        for file_path in file_paths:
+            try:
                 logger.info(f"📄 Processando: {file_path}")
                 
-                # Extrair texto do documento
+                # Extrair texto do documento (falha do extrator não é indexada)
                 text_content = self.doc_processor.extract_text(file_path)
+                if 'error' in text_content:
+                    raise ValueError(text_content['error'])
                 
                 # Aplicar chunking
                 chunks = self.chunking_engine.create_chunks(
-                    text_content, 
-                    strategy='recursive_500_100'
+                    text_content['content'], 
+                    strategy='recursive_500_100',
+                    offset_map=text_content.get('offset_map')
                 )
                 
+                # Descartar quase duplicatas antes de gerar embeddings
+                if deduplicator:
+                    chunks = deduplicator.filter(file_path, text_content['content'], chunks)
+                
                 # Gerar embeddings
-                embeddings = self.embedding_generator.generate_embeddings(chunks)
+                embeddings = self.embedding_generator.generate_embeddings(
+                    [chunk['text'] for chunk in chunks]
+                )
                 
                 # Armazenar no vector store
                 self._store_chunks(chunks, embeddings, file_path)
+                if deduplicator:
+                    deduplicator.commit(file_path)
                 
                 results['processed_files'].append(file_path)
+                results['chunks_per_file'][file_path] = len(chunks)
                 results['total_chunks'] += len(chunks)
                 
                 logger.info(f"✅ {file_path}: {len(chunks)} chunks criados")
+            
+            except Exception as e:
+                if deduplicator:
+                    deduplicator.discard(file_path)
+                results['errors'].append(f"{file_path}: {e}")
+                logger.error(f"❌ Erro processando {file_path}: {e}")
         
-        except Exception as e:
-            results['errors'].append(str(e))
-            logger.error(f"❌ Erro processando documentos: {e}")
+        if deduplicator:
+            results['deduplication'] = self._deduplication_report(dedup_before)
         
         results['processing_time'] = time.time() - start_time
         return results
     
-    def _store_chunks(self, chunks: List[str], embeddings: List, source_file: str):
+    def process_documents_pipelined(self, file_paths: List[str]) -> Dict:
+        """
+        Processa documentos no pipeline assíncrono de ingestão
+        
+        Extração, chunking, embeddings e armazenamento rodam sobrepostos, com
+        filas limitadas entre os estágios (performance_config.pipeline).
+        
+        Args:
+            file_paths: Lista de caminhos para arquivos
+            
+        Returns:
+            Dict: Resultado no formato de process_documents, mais 'throughput' e 'stages'
+        """
+        from ingestion_pipeline import IngestionPipeline
+        
+        deduplicator = self._get_deduplicator()
+        dedup_before = dict(deduplicator.stats) if deduplicator else None
+        
+        pipeline = IngestionPipeline(
+            self.doc_processor,
+            self.chunking_engine,
+            self.embedding_generator,
+            self._store_chunks,
+            self.config,
+            chunk_filter=deduplicator.filter if deduplicator else None,
+            chunk_commit=deduplicator.commit if deduplicator else None,
+            chunk_discard=deduplicator.discard if deduplicator else None
+        )
+        results = pipeline.process(file_paths)
+        
+        if deduplicator:
+            results['deduplication'] = self._deduplication_report(dedup_before)
+        return results
+    
+    def sync_directory(self, directory_path: str, recursive: bool = True) -> Dict:
+        """
+        Sincroniza um diretório de forma incremental usando o manifesto de ingestão
+        
+        Apenas arquivos novos ou modificados são extraídos, segmentados e
+        embedados; chunks de arquivos modificados ou removidos são descartados.
+        
+        Args:
+            directory_path: Diretório de documentos
+            recursive: Se deve considerar subdiretórios
+            
+        Returns:
+            Dict: Resumo da sincronização
+        """
+        start_time = time.time()
+        manifest = self._get_manifest()
+        changes = self.doc_processor.scan_changes(directory_path, manifest, recursive)
+        
+        # Remover chunks obsoletos antes de reprocessar
+        stale_sources = {r['file_path'] for r in changes['modified'] + changes['deleted']}
+        removed_chunks, _ = self._remove_chunks(stale_sources)
+        
+        # Arquivos inalterados que não estão no store (ex.: após reinício, ou que dependiam
+        # de chunks de um arquivo removido) são reprocessados; quase duplicatas descartadas
+        # contam como indexadas enquanto o original existir
+        indexed_sources = {doc['source'] for doc in self.documents}
+        if self.deduplicator:
+            indexed_sources.update(self.deduplicator.duplicate_documents)
+        missing = [r for r in changes['unchanged'] if r['file_path'] not in indexed_sources]
+        to_process = changes['added'] + changes['modified'] + missing
+        
+        results = self.process_documents([r['file_path'] for r in to_process])
+        
+        processed = set(results['processed_files'])
+        for record in to_process:
+            if record['file_path'] in processed:
+                manifest.update(record, chunk_count=results['chunks_per_file'][record['file_path']])
+            else:
+                # Falhou: sem registro, será tentado novamente na próxima sincronização
+                manifest.remove(record['file_path'])
+        for record in changes['deleted']:
+            manifest.remove(record['file_path'])
+        manifest.save()
+        
+        summary = {
+            'added': len(changes['added']),
+            'modified': len(changes['modified']),
+            'deleted': len(changes['deleted']),
+            'unchanged': len(changes['unchanged']) - len(missing),
+            'reindexed_missing': len(missing),
+            'removed_chunks': removed_chunks,
+            'total_chunks': results['total_chunks'],
+            'errors': results['errors'],
+            'processing_time': time.time() - start_time
+        }
+        
+        logger.info(f"🔄 Sincronização de {directory_path}: {summary['added']} novos, "
+                    f"{summary['modified']} modificados, {summary['deleted']} removidos")
+        return summary
+    
+    def _get_deduplicator(self):
+        """Deduplicador de ingestão (deduplication_config), criado sob demanda; None se desabilitado"""
+        if self.deduplicator is None:
+            dedup_config = self.config.get('deduplication_config', {})
+            if dedup_config.get('enabled', False):
+                from deduplication import Deduplicator
+                self.deduplicator = Deduplicator(dedup_config)
+        return self.deduplicator
+    
+    def _deduplication_report(self, stats_before: Dict) -> Dict:
+        """Economia da deduplicação desde stats_before (embeddings, tokens e espaço no índice)"""
+        stats = self.deduplicator.stats
+        report = {key: stats[key] - stats_before[key] for key in
+                  ('duplicate_documents', 'duplicate_chunks', 'embeddings_saved', 'tokens_saved')}
+        
+        embedding_dimension = len(self.documents[0]['embedding']) if self.documents else 0
+        # Vetores float32 que deixaram de ser armazenados
+        report['index_bytes_saved'] = report['embeddings_saved'] * embedding_dimension * 4
+        
+        if report['embeddings_saved']:
+            logger.info(f"🧬 Deduplicação: {report['duplicate_documents']} documentos e "
+                        f"{report['duplicate_chunks']} chunks quase duplicados, "
+                        f"{report['embeddings_saved']} embeddings ({report['tokens_saved']} tokens) economizados")
+        return report
+    
+    def _get_manifest(self):
+        """Carrega o manifesto de ingestão (storage_config.ingestion_manifest)"""
+        from ingestion_manifest import IngestionManifest
+        
+        manifest_config = self.config.get('storage_config', {}).get('ingestion_manifest', {})
+        return IngestionManifest(manifest_config.get('file_path', './ingestion_manifest.json'))
+    
+    def _store_chunks(self, chunks: List[Dict], embeddings: List, source_file: str):
         """Armazena chunks e embeddings no vector store"""
         # Implementação simplificada - usar ChromaDB ou similar
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_data = {
-                'text': chunk,
-                'embedding': embedding,
-                'source': source_file,
-                'chunk_id': f"{source_file}_{i}",
-                'timestamp': datetime.now().isoformat()
-            }
-            self.documents.append(chunk_data)
+        timestamp = datetime.now().isoformat()
+        self.documents.extend(
+            StoredChunk(chunk['text'], embedding, source_file, i, timestamp, chunk.get('page_number'))
+            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+        )
+    
+    def _remove_chunks(self, sources: set) -> Tuple[int, set]:
+        """
+        Remove do store todos os chunks das fontes informadas
+        
+        Fontes que tinham chunks descartados como cópias das removidas (deduplicação)
+        perderiam esse conteúdo: também são removidas, para serem reindexadas.
+        
+        Returns:
+            Tuple[int, set]: Chunks removidos e fontes removidas por dependerem das informadas
+        """
+        if not sources:
+            return 0, set()
+        
+        sources = set(sources)
+        dependents = set()
+        if self.deduplicator:
+            pending = sources
+            while pending:
+                pending = self.deduplicator.remove_sources(pending) - sources - dependents
+                dependents |= pending
+        
+        before = len(self.documents)
+        removed = sources | dependents
+        self.documents = [doc for doc in self.documents if doc['source'] not in removed]
+        return before - len(self.documents), dependents
     
     def query(self, question: str, strategy: str = 'standard') -> Dict:
         """
@@ -223,6 +446,7 @@ class RAGAgent:
                 'question': question,
                 'answer': response,
                 'sources': [doc['source'] for doc in relevant_docs],
+                'citations': [self._build_citation(doc) for doc in relevant_docs],
                 'confidence': confidence,
                 'processing_time': processing_time,
                 'strategy_used': strategy,
@@ -247,6 +471,17 @@ class RAGAgent:
                 'error': str(e)
             }
     
+    def _build_citation(self, doc: Dict) -> Dict:
+        """Citação de um chunk recuperado (com as fontes quase duplicadas, no modo 'link')"""
+        citation = {'source': doc['source'], 'page_number': doc.get('page_number')}
+        
+        if self.deduplicator:
+            linked_sources = self.deduplicator.linked_sources(doc['source'], doc['chunk_id'])
+            if linked_sources:
+                citation['linked_sources'] = linked_sources
+        
+        return citation
+    
     def _retrieve_documents(self, question: str, strategy: str) -> List[Dict]:
         """Busca documentos relevantes"""
         # Implementação simplificada de busca por similaridade
@@ -342,6 +577,13 @@ class RAGAgent:
             )
         }
     
+    def get_embedding_cache_stats(self) -> Dict:
+        """Retorna estatísticas do cache de embeddings (hits, misses, hit rate, tamanho)"""
+        generator = getattr(self, 'embedding_generator', None)
+        if not generator:
+            return {'enabled': False}
+        return {'enabled': True, **generator.embedding_cache.get_stats()}
+    
     def interactive_chat(self):
         """
         Inicia chat interativo no terminal
@@ -0,0 +1,106 @@
+"""
+Sentence Segmenter - Segmentação de Frases em Português
+Segmentador baseado em regras para textos jurídicos e de RH em pt-BR: devolve os
+intervalos das frases em uma única varredura com uma expressão regular pré-compilada
+"""
+
+import re
+from typing import Iterator, List, Tuple
+
+# Abreviações terminadas em ponto que não encerram frase (tratamentos, cargos,
+# remissões legais, endereços e razões sociais), em qualquer caixa ("Art.", "ART.")
+ABBREVIATIONS = (
+    'sr', 'sra', 'srs', 'sras', 'srta', 'dr', 'dra', 'drs', 'dras', 'prof', 'profa', 'profs',
+    'exmo', 'exma', 'ilmo', 'ilma', 'exa', 'exas', 'sa', 'eng', 'adv', 'des', 'rel', 'pres',
+    'art', 'arts', 'inc', 'incs', 'al', 'cap', 'caps', 'tít', 'fl', 'fls', 'pág', 'págs',
+    'p', 'pp', 'n', 'nº', 'núm', 'vol', 'ed', 'cf', 'obs', 'aprox', 'tel', 'ref', 'proc',
+    'resp', 'rec', 'av', 'r', 'rod', 'ltda', 'cia', 'jr', 'gov', 'séc', 'jan', 'fev', 'abr',
+    'mai', 'jun', 'jul', 'ago', 'out', 'nov'
+)
+
+# Abreviações que também são palavras comuns ("no mar.", "um par."): só não encerram a
+# frase quando o próximo trecho começa por número ("15 de mar. 2024", "par. 2º");
+# seguidas de minúscula, nenhuma pontuação encerra frase
+AMBIGUOUS_ABBREVIATIONS = ('mar', 'par', 'min', 'ex', 'set')
+
+# Maior janela antes do ponto examinada pela verificação de abreviação
+_ABBREVIATION_WINDOW = max(len(abbreviation) for abbreviation in ABBREVIATIONS + AMBIGUOUS_ABBREVIATIONS) + 1
+
+# Candidato a fronteira de frase. O padrão começa por uma única classe de caracteres
+# (pontuação final ou quebra de linha), o que permite ao re saltar direto para os
+# candidatos; só então um lookbehind separa os casos:
+# - quebra de linha: fronteira, com os espaços seguintes
+# - pontuação: seguida de aspas/parênteses de fechamento e espaço, sem minúscula depois
+#   ("aprox. dez", "... e depois"); o grupo 'long_word' marca ponto após palavra mais longa
+#   que qualquer abreviação (dispensa a verificação de abreviação) e o grupo 'end', o fim
+#   da frase (a pontuação fica na frase, o espaço não)
+SENTENCE_CANDIDATE = re.compile(
+    r'[.!?…\n](?:(?<=\n)\s*'
+    r'|(?:(?<=\w{%d}\.)(?P<long_word>))?[.!?…]*["\'”’»)\]]*(?P<end>)[ \t]+(?![a-zß-ÿ]))' % _ABBREVIATION_WINDOW
+)
+
+# Ponto que não encerra frase, procurado só na janela que termina no ponto candidato:
+# após abreviação (palavra inteira), inicial maiúscula ("J. Silva", "S.A.") ou numeração
+# de item no início da linha ("1.", "IV.")
+ABBREVIATION_PERIOD = re.compile(
+    r'(?:(?<!\w)(?i:'
+    + '|'.join(sorted(map(re.escape, ABBREVIATIONS), key=len, reverse=True))
+    + r')|(?<!\w)[A-ZÀ-Þ]|^\d{1,3}|^[IVXL]{2,4})\.\Z',
+    re.MULTILINE
+)
+
+# Abreviação ambígua terminando no ponto candidato (confirmada pelo número seguinte)
+AMBIGUOUS_PERIOD = re.compile(
+    r'(?<!\w)(?i:' + '|'.join(sorted(AMBIGUOUS_ABBREVIATIONS, key=len, reverse=True)) + r')\.\Z'
+)
+
+def iter_sentence_boundaries(text: str, start: int = 0, end: int = None) -> Iterator[Tuple[int, int]]:
+    """
+    Fronteiras de frase em text[start:end], em uma única varredura
+
+    Yields:
+        Tuple[int, int]: Fim da frase (após a pontuação final, sem espaços) e início do trecho seguinte
+    """
+    end = len(text) if end is None else end
+    for match in SENTENCE_CANDIDATE.finditer(text, start, end):
+        sentence_end = match.start('end')
+        if sentence_end >= 0:
+            position = match.start()
+            if text[position] == '.' and match.start('long_word') < 0:
+                window_start = max(0, position - _ABBREVIATION_WINDOW)
+                if ABBREVIATION_PERIOD.search(text, window_start, position + 1):
+                    continue
+                if (match.end() < end and text[match.end()].isdigit()
+                        and AMBIGUOUS_PERIOD.search(text, window_start, position + 1)):
+                    continue
+            yield sentence_end, match.end()
+        else:
+            # Quebra de linha: descontar os espaços antes dela
+            sentence_end = match.start()
+            while sentence_end > start and text[sentence_end - 1] in ' \t\r':
+                sentence_end -= 1
+            yield sentence_end, match.end()
+
+def segment_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Segmenta o texto em frases, em uma única varredura
+
+    Args:
+        text: Texto a segmentar
+
+    Returns:
+        List[Tuple[int, int]]: Intervalos (start, end) das frases, sem espaços nas pontas
+    """
+    spans = []
+    sentence_start = len(text) - len(text.lstrip())
+
+    for sentence_end, next_start in iter_sentence_boundaries(text, sentence_start):
+        if sentence_end > sentence_start:
+            spans.append((sentence_start, sentence_end))
+        sentence_start = next_start
+
+    sentence_end = len(text.rstrip())
+    if sentence_end > sentence_start:
+        spans.append((sentence_start, sentence_end))
+
+    return spans
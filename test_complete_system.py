@@ -22,6 +22,44 @@ def print_banner():
     """
     print(banner)
 
+def create_sample_pdf(file_path, page_texts):
+    """Cria um PDF mínimo (fonte Helvetica) com uma página por texto; linhas separadas por \\n"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in page_texts:
+        stream = "BT /F1 12 Tf 14 TL 72 720 Td " + " T* ".join(f"({line}) Tj" for line in text.split("\n")) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+    
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+def misbehaving_extraction(processor, index, file_path, data=None):
+    """Extrator dos testes do pool: trava, estoura memória ou derruba o worker conforme o nome do arquivo"""
+    name = os.path.basename(file_path)
+    if name.startswith("trava"):
+        time.sleep(60)
+    elif name.startswith("memoria"):
+        ballast = b"x" * (400 * 1024 * 1024)
+        time.sleep(60)
+    elif name.startswith("derruba"):
+        os._exit(3)
+    return processor._process_file(index, file_path, data)
+
 def test_imports():
     """Testa importação de todos os módulos"""
     print("\n🔍 TESTE 1: Verificando Módulos do Sistema")
@@ -100,6 +138,378 @@ Todo funcionário tem direito a 30 dias de férias após 12 meses de trabalho.
         print(f"❌ Erro no teste de processamento: {e}")
         return False
 
+def test_parallel_directory_processing():
+    """Testa ingestão paralela de diretório"""
+    print("\n📁 TESTE 2b: Ingestão Paralela de Diretório")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from document_processor import DocumentProcessor
+        
+        processor = DocumentProcessor({'performance_config': {'concurrency': {'max_workers': 2}}})
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(6):
+                with open(os.path.join(temp_dir, f"doc_{i}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(f"Documento {i}: férias e benefícios.")
+            
+            serial = processor.process_directory(temp_dir)
+            parallel = processor.process_directory(temp_dir, parallel=True)
+            results = list(processor.iter_directory(temp_dir, parallel=True))
+            
+            # Falhas de extração (PDF/DOCX inválidos) são isoladas e reportadas como erro
+            for name in ("corrompido.pdf", "corrompido.docx"):
+                with open(os.path.join(temp_dir, name), 'wb') as f:
+                    f.write(b"nao e um documento valido")
+            failed = [r for r in processor.iter_directory(temp_dir, parallel=True) if not r['success']]
+            with_failures = processor.process_directory(temp_dir, parallel=True)
+        
+        same_output = [d['content'] for d in serial] == [d['content'] for d in parallel]
+        print(f"✅ Serial: {len(serial)} | Paralelo: {len(parallel)} | Idênticos: {same_output}")
+        print(f"📊 Resultados por arquivo: {len(results)}")
+        
+        failures_ok = (
+            sorted(os.path.basename(r['file_path']) for r in failed) == ["corrompido.docx", "corrompido.pdf"]
+            and all(r['error'] and r['document'] is None for r in failed)
+            and len(with_failures) == 6
+        )
+        print(f"{'✅' if failures_ok else '❌'} Arquivos inválidos reportados como erro: {len(failed)}")
+        
+        return same_output and len(results) == 6 and failures_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de ingestão paralela: {e}")
+        return False
+
+def test_extraction_cache():
+    """Testa cache de extração endereçado por conteúdo"""
+    print("\n🗄️ TESTE 2c: Cache de Extração")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from document_processor import DocumentProcessor
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                'storage_config': {
+                    'document_cache': {
+                        'enabled': True,
+                        'max_size_mb': 1,
+                        'cache_directory': os.path.join(temp_dir, 'cache')
+                    }
+                }
+            }
+            processor = DocumentProcessor(config)
+            
+            doc_path = os.path.join(temp_dir, "politica.txt")
+            with open(doc_path, 'w', encoding='utf-8') as f:
+                f.write("Férias devem ser solicitadas com 30 dias de antecedência.")
+            
+            first = processor.extract_text(doc_path)
+            second = processor.extract_text(doc_path)
+            stats = processor.get_cache_stats()
+        
+        print(f"✅ Hits: {stats['hits']} | Misses: {stats['misses']} | Entradas: {stats['entries']}")
+        
+        return first['content'] == second['content'] and stats['hits'] == 1 and stats['misses'] == 1
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de cache de extração: {e}")
+        return False
+
+def test_archive_ingestion():
+    """Testa ingestão de arquivos ZIP/TAR sem descompactar em disco"""
+    print("\n🗜️ TESTE 2d: Ingestão de Arquivos Compactados")
+    print("-" * 60)
+    
+    try:
+        import io
+        import tarfile
+        import zipfile
+        import tempfile
+        from document_processor import DocumentProcessor
+        
+        members = {
+            'politicas/ferias.txt': "Férias devem ser solicitadas com 30 dias de antecedência.",
+            'politicas/beneficios.md': "# Benefícios\n\nVale-refeição de R$ 35,00 por dia útil.",
+            'politicas/imagem.png': "não suportado"
+        }
+        config = {'security_config': {'content_filtering': {'max_document_size_mb': 1}}}
+        processor = DocumentProcessor(config)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = os.path.join(temp_dir, "corpus.zip")
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for name, text in members.items():
+                    archive.writestr(name, text)
+                archive.writestr('politicas/grande.txt', "x" * (2 * 1024 * 1024))
+            
+            tar_path = os.path.join(temp_dir, "corpus.tar.gz")
+            with tarfile.open(tar_path, 'w:gz') as archive:
+                for name, text in members.items():
+                    data = text.encode('utf-8')
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+            
+            zip_results = sorted(processor.iter_archive(zip_path), key=lambda r: r['index'])
+            tar_documents = processor.process_archive(tar_path, parallel=True, max_workers=2)
+        
+        failures = [r['file_path'] for r in zip_results if not r['success']]
+        print(f"✅ ZIP: {len(zip_results)} membros, falhas: {failures}")
+        print(f"✅ TAR: {len(tar_documents)} documentos")
+        
+        return (
+            len(zip_results) == 3
+            and failures == [f"{zip_path}::politicas/grande.txt"]
+            and [d['file_name'] for d in tar_documents] == ['ferias.txt', 'beneficios.md']
+            and tar_documents[1]['offset_map']['sections'][0]['title'] == 'Benefícios'
+        )
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de arquivos compactados: {e}")
+        return False
+
+def test_pdf_pages():
+    """Testa extração de PDF página a página"""
+    print("\n📑 TESTE 2e: Extração de PDF por Página")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from document_processor import DocumentProcessor
+        
+        processor = DocumentProcessor()
+        page_texts = [
+            "POLITICA DE FERIAS\nTodo colaborador tem direito a 30 dias de ferias.",
+            "REEMBOLSO\nDespesas devem ser comprovadas em ate 15 dias.",
+            "BENEFICIOS\nVale-refeicao pago no quinto dia util."
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, "politicas.pdf")
+            create_sample_pdf(pdf_path, page_texts)
+            
+            document = processor.extract_text(pdf_path)
+            pages = list(processor.iter_pages(pdf_path))
+        
+        content = document['content']
+        page_map = document['offset_map']['pages']
+        
+        # Cada página aponta para o seu texto no conteúdo de extract_text, na mesma ordem
+        offsets_ok = (
+            len(pages) == len(page_map) == len(page_texts) == document['metadata']['pages']
+            and [page['page_number'] for page in pages] == [1, 2, 3]
+            and all(content[page['char_offset']:page['char_offset'] + len(page['text'])] == page['text']
+                    for page in pages)
+            and [(span['start'], span['end']) for span in page_map]
+            == [(page['char_offset'], page['char_offset'] + len(page['text'])) for page in pages]
+            and all(text.split("\n")[0] in page['text'] for text, page in zip(page_texts, pages))
+        )
+        
+        print(f"{'✅' if offsets_ok else '❌'} {len(pages)} páginas | offsets: "
+              f"{[page['char_offset'] for page in pages]}")
+        
+        # Falha de extração não vira página: TXT vazio e DOCX inválido lançam ValueError
+        failures = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, data in [("vazio.txt", b""), ("invalido.docx", b"nao e um DOCX")]:
+                path = os.path.join(temp_dir, name)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                try:
+                    failures[name] = list(processor.iter_pages(path))
+                except ValueError as e:
+                    failures[name] = str(e)
+        
+        errors_ok = all(isinstance(outcome, str) for outcome in failures.values())
+        print(f"{'✅' if errors_ok else '❌'} Falhas de extração: {failures}")
+        
+        return offsets_ok and errors_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de páginas do PDF: {e}")
+        return False
+
+def test_text_decoding():
+    """Testa decodificação incremental de TXT/MD (mmap, blocos e fallback latin-1)"""
+    print("\n🔤 TESTE 2f: Decodificação de Texto em Blocos")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from document_processor import DocumentProcessor, TEXT_BLOCK_SIZE, TEXT_SAMPLE_SIZE
+        
+        processor = DocumentProcessor()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # UTF-8 com 'ç' (2 bytes) cortado na fronteira de leitura e CRLF dividido entre blocos
+            boundary_text = "a" * (TEXT_BLOCK_SIZE - 1) + "ção\r\nlinha 2\r\nlinha 3"
+            utf8_path = os.path.join(temp_dir, "fronteira.txt")
+            with open(utf8_path, 'wb') as f:
+                f.write(boundary_text.encode('utf-8'))
+            utf8_document = processor.extract_text(utf8_path)
+            
+            expected = boundary_text.replace("\r\n", "\n")
+            small_blocks = list(processor.iter_text_blocks(utf8_path, block_size=7))
+            
+            # Amostra UTF-8 válida seguida de bytes latin-1: o arquivo inteiro é lido como latin-1
+            latin_text = "x" * TEXT_SAMPLE_SIZE + " café com pão\n"
+            latin_path = os.path.join(temp_dir, "latin1.txt")
+            with open(latin_path, 'wb') as f:
+                f.write(latin_text.encode('latin-1'))
+            latin_document = processor.extract_text(latin_path)
+            latin_blocks = ''.join(processor.iter_text_blocks(latin_path, block_size=4096))
+            
+            # Fallback no início de um arquivo grande: decodificado em janelas, sem copiar o restante
+            import tracemalloc
+            large_path = os.path.join(temp_dir, "latin1_grande.txt")
+            with open(large_path, 'wb') as f:
+                f.write(latin_text.encode('latin-1') + b"x" * (8 * TEXT_BLOCK_SIZE))
+            tracemalloc.start()
+            large_chars = 0
+            for block in processor.iter_text_blocks(large_path, block_size=65536):
+                large_chars += len(block)
+            large_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        
+        boundary_ok = (
+            utf8_document['content'] == expected
+            and utf8_document['metadata']['encoding'] == 'utf-8'
+            and utf8_document['metadata']['chars'] == len(expected)
+            and utf8_document['metadata']['lines'] == 3
+            and ''.join(small_blocks) == expected
+        )
+        latin_ok = (
+            latin_document['metadata']['encoding'] == 'latin-1'
+            and latin_document['content'] == latin_text.strip()
+            and latin_document['metadata']['chars'] == len(latin_text)
+            and latin_document['metadata']['lines'] == 2
+            and latin_blocks == latin_text
+        )
+        fallback_bounded = large_chars == len(latin_text) + 8 * TEXT_BLOCK_SIZE and large_peak < TEXT_BLOCK_SIZE
+        
+        print(f"{'✅' if boundary_ok else '❌'} Caractere multibyte na fronteira de leitura: "
+              f"{utf8_document['metadata']['chars']} caracteres, {utf8_document['metadata']['lines']} linhas")
+        print(f"{'✅' if latin_ok else '❌'} Fallback latin-1 após a amostra: {latin_document['metadata']['encoding']}")
+        print(f"{'✅' if fallback_bounded else '❌'} Fallback em janelas: pico de {large_peak / 1024:.0f}KB "
+              f"para {large_chars / TEXT_BLOCK_SIZE:.0f}MB decodificados")
+        
+        return boundary_ok and latin_ok and fallback_bounded
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de decodificação de texto: {e}")
+        return False
+
+def test_supervised_pool():
+    """Testa o pool supervisionado: timeout, limite de memória, queda de worker e consumidor lento"""
+    print("\n🛡️ TESTE 2g: Pool Supervisionado de Extração")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from extraction_pool import SupervisedExtractionPool
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for name in ["ok_1.txt", "trava.txt", "memoria.txt", "derruba.txt", "ok_2.txt"]:
+                paths.append(os.path.join(temp_dir, name))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    f.write(f"Documento {name}")
+            
+            with SupervisedExtractionPool({}, max_workers=2, timeout=3, max_memory_mb=200,
+                                          extract_function=misbehaving_extraction) as pool:
+                results = {os.path.basename(r['file_path']): r for r in pool.imap_unordered(enumerate(paths))}
+                limit_stats = dict(pool.stats)
+            
+            # Consumidor mais lento que o timeout: resultados prontos não são dados como expirados
+            slow_paths = [path for path in paths if os.path.basename(path).startswith("ok")] * 2
+            with SupervisedExtractionPool({}, max_workers=2, timeout=0.5) as pool:
+                slow_results = []
+                for result in pool.imap_unordered(enumerate(slow_paths)):
+                    slow_results.append(result)
+                    time.sleep(0.8)
+                slow_stats = dict(pool.stats)
+        
+        errors = {name: result['error'] for name, result in results.items() if not result['success']}
+        limits_ok = (
+            results["ok_1.txt"]['success'] and results["ok_2.txt"]['success']
+            and "timeout" in errors.get("trava.txt", "")
+            and "memória" in errors.get("memoria.txt", "")
+            and "encerrado inesperadamente" in errors.get("derruba.txt", "")
+            and limit_stats == {'completed': 2, 'timeouts': 1, 'memory_kills': 1, 'crashes': 1}
+        )
+        slow_ok = all(result['success'] for result in slow_results) and slow_stats['timeouts'] == 0
+        
+        print(f"{'✅' if limits_ok else '❌'} Falhas isoladas: {errors}")
+        print(f"{'✅' if slow_ok else '❌'} Consumidor lento: {len(slow_results)} resultados, "
+              f"{slow_stats['timeouts']} timeouts")
+        
+        return limits_ok and slow_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste do pool supervisionado: {e}")
+        return False
+
+def test_docx_streaming():
+    """Testa leitura de DOCX em streaming (ordem de parágrafos e tabelas)"""
+    print("\n📝 TESTE 2h: Leitura de DOCX em Fluxo")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        import docx
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+        from document_processor import DocumentProcessor
+        
+        # DOCX com parágrafos e tabelas intercalados
+        document = docx.Document()
+        document.add_heading("Política de Benefícios", level=1)
+        document.add_paragraph("Os benefícios valem para todos os colaboradores.")
+        table = document.add_table(rows=2, cols=2)
+        for row, values in zip(table.rows, [("Benefício", "Valor"), ("Vale-refeição", "R$ 35,00")]):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+        document.add_heading("Reembolso", level=2)
+        document.add_paragraph("Despesas são reembolsadas em até 15 dias.")
+        table = document.add_table(rows=1, cols=3)
+        for cell, value in zip(table.rows[0].cells, ("Táxi", "Hotel", "Refeição")):
+            cell.text = value
+        document.add_paragraph("Dúvidas: fale com o RH.")
+        
+        # Referência: filhos do body na ordem do documento, lidos pelo python-docx
+        expected = []
+        for child in document.element.body.iterchildren():
+            if child.tag.endswith('}p'):
+                expected.append(Paragraph(child, document).text)
+            elif child.tag.endswith('}tbl'):
+                expected.extend(' '.join(cell.text for cell in row.cells) for row in Table(child, document).rows)
+        
+        processor = DocumentProcessor()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            docx_path = os.path.join(temp_dir, "beneficios.docx")
+            document.save(docx_path)
+            blocks = list(processor.iter_docx_blocks(docx_path))
+            extracted = processor.extract_text(docx_path)
+        
+        order_ok = [block['text'] for block in blocks] == expected
+        headings = [(block['text'], block['heading_level']) for block in blocks if block.get('heading_level')]
+        sections = [(section['title'], section['level']) for section in extracted['offset_map']['sections']]
+        headings_ok = headings == sections == [("Política de Benefícios", 1), ("Reembolso", 2)]
+        metadata_ok = extracted['metadata'] == {'paragraphs': 5, 'tables': 2}
+        
+        print(f"{'✅' if order_ok else '❌'} Ordem de leitura igual à do python-docx: {len(blocks)} blocos")
+        print(f"{'✅' if headings_ok and metadata_ok else '❌'} Títulos: {headings} | {extracted['metadata']}")
+        
+        return order_ok and headings_ok and metadata_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de DOCX em fluxo: {e}")
+        return False
+
 def test_chunking_strategies():
     """Testa estratégias de chunking"""
     print("\n🔧 TESTE 3: Estratégias de Chunking")
@@ -152,18 +562,360 @@ def test_chunking_strategies():
                 avg_size = sum(len(chunk['text']) for chunk in chunks) / len(chunks)
                 print(f"   📊 Tamanho médio: {avg_size:.0f} caracteres")
         
-        return True
+        # Semântico por embeddings: chunks entre min_chunk_size e max_chunk_size (exceto o último)
+        long_text = " ".join(f"Frase {i} sobre o tema {i // 7} da política interna." for i in range(300))
+        semantic_sizes = [chunk['size'] for chunk in engine.create_chunks(long_text, 'semantic_auto')]
+        semantic_ok = all(200 <= size <= 1000 for size in semantic_sizes[:-1]) and max(semantic_sizes) <= 1000
+        print(f"✅ semantic_auto (embeddings): {len(semantic_sizes)} chunks, limites respeitados: {semantic_ok}")
+        
+        # Lote de documentos tokenizados juntos = chunking documento a documento
+        documents = [test_text, test_text.upper()]
+        batch = engine.create_chunks_batch(documents, 'token_400_50')
+        same = batch == [engine.create_chunks(document, 'token_400_50') for document in documents]
+        print(f"✅ create_chunks_batch: {sum(len(chunks) for chunks in batch)} chunks, idêntico ao individual: {same}")
+        
+        # Várias estratégias com pré-processamento compartilhado = uma estratégia por vez
+        multi = engine.create_chunks_multi(test_text, strategies)
+        multi_ok = multi == {strategy: engine.create_chunks(test_text, strategy) for strategy in strategies}
+        print(f"✅ create_chunks_multi: {len(multi)} estratégias, idêntico ao individual: {multi_ok}")
+        
+        # Corpus em pool de processos, na ordem de entrada = chunking documento a documento
+        corpus = [test_text, long_text, test_text.upper()] * 3
+        corpus_batches = list(engine.chunk_corpus(corpus, 'recursive_500_100', max_workers=2, task_chars=1000))
+        corpus_ok = [index for index, _ in corpus_batches] == list(range(len(corpus))) and all(
+            corpus_batch.to_dicts() == [dict(chunk) for chunk in engine.create_chunks(corpus[index], 'recursive_500_100')]
+            for index, corpus_batch in corpus_batches
+        )
+        print(f"✅ chunk_corpus: {len(corpus_batches)} documentos em 2 processos, idêntico ao individual: {corpus_ok}")
+        
+        # Contagem aproximada (opt-in): mesmos chunks, token_count estimado por caracteres
+        from token_counter import get_approximate_counter
+        
+        counter = get_approximate_counter()
+        approximate = ChunkingEngine(approximate_tokens=True).create_chunks(test_text, 'recursive_500_100')
+        exact_chunks = engine.create_chunks(test_text, 'recursive_500_100')
+        approximate_ok = (
+            [chunk['text'] for chunk in approximate] == [chunk['text'] for chunk in exact_chunks]
+            and all(chunk['token_count'] == counter.count(chunk['text']) <= counter.upper_bound(chunk['text'])
+                    for chunk in approximate)
+        )
+        print(f"✅ Tokens aproximados: {counter.chars_per_token:.2f} caracteres/token, consistente: {approximate_ok}")
+        
+        # Overlap >= chunk_size não avança a janela: configuração rejeitada, não truncada
+        rejected = []
+        invalid_engine = ChunkingEngine({'token_50_50': {'type': 'token', 'chunk_size': 50, 'chunk_overlap': 50}})
+        for run in (lambda: invalid_engine.create_chunks(long_text, 'token_50_50'),
+                    lambda: engine._character_chunking(long_text, 100, 150)):
+            try:
+                run()
+            except ValueError:
+                rejected.append(True)
+        windows, _ = engine._character_chunking(long_text, 100, 99)
+        overlap_ok = len(rejected) == 2 and windows[-1] == long_text[-100:]
+        print(f"{'✅' if overlap_ok else '❌'} Overlap >= chunk_size rejeitado: {len(rejected)}/2 | "
+              f"overlap 99/100 cobre o texto: {windows[-1] == long_text[-100:]}")
+        
+        return same and semantic_ok and multi_ok and corpus_ok and approximate_ok and overlap_ok
         
     except Exception as e:
         print(f"❌ Erro no teste de chunking: {e}")
         return False
 
+def test_recursive_chunk_spans():
+    """Testa intervalos do chunking recursivo sobre o texto original"""
+    print("\n🔧 TESTE 3b: Intervalos do Chunking Recursivo")
+    print("-" * 60)
+    
+    try:
+        from chunking_engine import ChunkingEngine
+        
+        engine = ChunkingEngine({
+            'recursive_120_30': {'type': 'recursive', 'chunk_size': 120, 'chunk_overlap': 30}
+        })
+        
+        # Parágrafos curtos, um parágrafo longo sem quebras e uma palavra maior que o chunk
+        test_text = (
+            "Férias devem ser solicitadas com antecedência.\n\n"
+            + "O reembolso exige nota fiscal. " * 12
+            + "\n\n" + "x" * 300 + "\n\nFim do documento."
+        )
+        
+        chunks = engine.create_chunks(test_text, 'recursive_120_30')
+        exact = all(chunk['text'] == test_text[chunk['start_char']:chunk['end_char']] for chunk in chunks)
+        # Fora o overlap (até 30 caracteres do chunk anterior), cada chunk cabe em chunk_size
+        bounded = all(
+            len(test_text[max(chunk['start_char'], previous['end_char']):chunk['end_char']].strip()) <= 120
+            and chunk['start_char'] >= previous['end_char'] - 30
+            for previous, chunk in zip([{'end_char': 0}] + chunks, chunks)
+        )
+        # Overlap gravado na construção = trecho do chunk anterior repetido no início
+        overlap_ok = all(
+            chunk['overlap_with_previous'] == max(0, previous['end_char'] - chunk['start_char'])
+            for previous, chunk in zip([{'end_char': 0}] + chunks, chunks)
+        )
+        print(f"✅ {len(chunks)} chunks | idênticos aos intervalos: {exact} | dentro do limite: {bounded} "
+              f"| overlap gravado: {overlap_ok}")
+        
+        # Fins de frase do segmentador pt-BR: abreviações, iniciais e valores não cortam a frase
+        from sentence_segmenter import segment_sentences
+        
+        legal_text = ("O Sr. Almeida recebe R$ 25,00 conforme o art. 7º, inc. II. "
+                      "A Dra. Souza assinou pela Empresa S.A. em 2024! Fim.")
+        sentences = [legal_text[start:end] for start, end in segment_sentences(legal_text)]
+        segmenter_ok = sentences == ["O Sr. Almeida recebe R$ 25,00 conforme o art. 7º, inc. II.",
+                                     "A Dra. Souza assinou pela Empresa S.A. em 2024!", "Fim."]
+        sentence_chunks = ChunkingEngine({
+            'recursive_70_0': {'type': 'recursive', 'chunk_size': 70, 'chunk_overlap': 0}
+        }).create_chunks(legal_text, 'recursive_70_0')
+        # Frases inteiras agrupadas até chunk_size (o separador '. ' cortaria em "Sr.", "art." e "S.A.")
+        segmenter_ok = segmenter_ok and [chunk['text'] for chunk in sentence_chunks] == [
+            sentences[0], legal_text[legal_text.index("A Dra."):]
+        ]
+        # Abreviações em qualquer caixa; palavras comuns ("mar", "par") só valem antes de número
+        edge_cases = {
+            "Conforme o ART. 7º, INC. II. Ver CF. Art. 5º.": ["Conforme o ART. 7º, INC. II.", "Ver CF. Art. 5º."],
+            "Fomos ao mar. Depois voltamos.": ["Fomos ao mar.", "Depois voltamos."],
+            "Vence em 15 de mar. 2025 o prazo. Fim.": ["Vence em 15 de mar. 2025 o prazo.", "Fim."],
+            "Comprou um par. Era caro.": ["Comprou um par.", "Era caro."],
+        }
+        for case, expected in edge_cases.items():
+            segmenter_ok = segmenter_ok and [case[start:end] for start, end in segment_sentences(case)] == expected
+        print(f"✅ Segmentador de frases: {len(sentences)} frases, chunks nos fins de frase: {segmenter_ok}")
+        
+        # Representação em colunas: mesmos chunks, montados sob demanda
+        batch = engine.create_chunk_batch(test_text, 'recursive_120_30')
+        columnar_ok = len(batch) == len(chunks) and batch.to_dicts() == [dict(chunk) for chunk in chunks]
+        print(f"✅ ChunkBatch: {batch.nbytes} bytes em colunas, idêntico aos chunks: {columnar_ok}")
+        
+        return (exact and bounded and overlap_ok and columnar_ok and segmenter_ok
+                and chunks[-1]['text'].endswith("x\n\nFim do documento."))
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de intervalos: {e}")
+        return False
+
+def test_streaming_chunks():
+    """Testa chunking em fluxo a partir de blocos de texto"""
+    print("\n🔧 TESTE 3c: Chunking em Fluxo")
+    print("-" * 60)
+    
+    try:
+        from chunking_engine import ChunkingEngine
+        
+        engine = ChunkingEngine()
+        pages = [
+            f"--- Página {page} ---\nCAPÍTULO {page}\n" + "Férias devem ser solicitadas com antecedência. " * 40
+            for page in range(1, 21)
+        ]
+        text = ''.join(pages)
+        
+        all_ok = True
+        for strategy in ['recursive_500_100', 'token_400_50', 'semantic_auto', 'page_based']:
+            chunks = list(engine.create_chunks_iter(iter(pages), strategy, buffer_size=4000))
+            exact = all(chunk['text'] == text[chunk['start_char']:chunk['end_char']] for chunk in chunks)
+            ordered = [chunk['position'] for chunk in chunks] == list(range(len(chunks)))
+            complete = chunks and chunks[-1]['end_char'] >= len(text.rstrip())
+            print(f"✅ {strategy}: {len(chunks)} chunks | offsets exatos: {exact} | ordem: {ordered} | até o fim: {complete}")
+            all_ok = all_ok and exact and ordered and bool(complete)
+        
+        # Página única maior que o buffer, sem divisão por tamanho: a sobra não pode acumular a página
+        big_page = "--- Página 1 ---\n" + "Reembolso exige nota fiscal. " * 2000
+        blocks = [big_page[i:i + 1000] for i in range(0, len(big_page), 1000)]
+        read = []
+        
+        def tracked_blocks():
+            for block in blocks:
+                read.append(block)
+                yield block
+        
+        page_engine = ChunkingEngine({'page_whole': {'type': 'page', 'chunk_size': len(big_page)}})
+        stream = page_engine.create_chunks_iter(tracked_blocks(), 'page_whole', buffer_size=4000)
+        first = next(stream)
+        first_read = len(read)
+        lazy = first_read < len(blocks)
+        chunks = [first] + list(stream)
+        # Sobra de até buffer_size mais os blocos novos da rodada
+        bounded = max(chunk['size'] for chunk in chunks) <= 2 * 4000 + 1000
+        exact = all(chunk['text'] == big_page[chunk['start_char']:chunk['end_char']] for chunk in chunks)
+        complete = ''.join(chunk['text'] for chunk in chunks).replace(' ', '') == big_page[17:].replace(' ', '')
+        print(f"{'✅' if lazy and bounded and exact and complete else '❌'} Página de {len(big_page)} caracteres: "
+              f"{len(chunks)} chunks até {max(chunk['size'] for chunk in chunks)} | "
+              f"1º chunk após {first_read} de {len(blocks)} blocos")
+        
+        # Registros de iter_pages: chunks nunca atravessam páginas e levam page_number
+        import tempfile
+        from document_processor import DocumentProcessor
+        
+        processor = DocumentProcessor()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, "paginas.pdf")
+            create_sample_pdf(pdf_path, ["Primeira pagina texto longo", "Segunda pagina", "Terceira",
+                                         "Quarta pagina " * 60])
+            page_texts = {page['page_number']: (page['char_offset'], page['text'])
+                          for page in processor.iter_pages(pdf_path)}
+            page_chunks = {
+                strategy: list(engine.create_chunks_iter(processor.iter_pages(pdf_path), strategy))
+                for strategy in ['page_based', 'recursive_500_100']
+            }
+        
+        pages_ok = [chunk['page_number'] for chunk in page_chunks['page_based']] == [1, 2, 3, 4]
+        for strategy, chunks in page_chunks.items():
+            # Offsets no conteúdo de extract_text = char_offset da página + posição na página
+            within = all(
+                chunk['text'] == page_texts[chunk['page_number']][1][
+                    chunk['start_char'] - page_texts[chunk['page_number']][0]:
+                    chunk['end_char'] - page_texts[chunk['page_number']][0]
+                ] and chunk['start_char'] >= page_texts[chunk['page_number']][0]
+                for chunk in chunks
+            )
+            pages_ok = pages_ok and within and chunks[-1]['page_number'] == 4
+            print(f"{'✅' if within else '❌'} iter_pages + {strategy}: {len(chunks)} chunks, páginas "
+                  f"{sorted({chunk['page_number'] for chunk in chunks})}")
+        
+        records = [{'page_number': 1, 'text': "Férias anuais.", 'section': "Férias"},
+                   {'page_number': 2, 'text': "Reembolso em 15 dias.", 'section': "Reembolso"}]
+        sections = [(chunk['page_number'], chunk['section']) for chunk in engine.create_chunks_iter(records, 'page_based')]
+        sections_ok = sections == [(1, "Férias"), (2, "Reembolso")]
+        print(f"{'✅' if sections_ok else '❌'} Seções dos registros: {sections}")
+        
+        return all_ok and lazy and bounded and exact and complete and pages_ok and sections_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de chunking em fluxo: {e}")
+        return False
+
+def test_page_offset_map():
+    """Testa chunking por páginas com o mapa de offsets de PDF, DOCX e MD"""
+    print("\n🔧 TESTE 3d: Chunking por Páginas com Mapa de Offsets")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        import docx
+        from chunking_engine import ChunkingEngine
+        from document_processor import DocumentProcessor
+        
+        engine = ChunkingEngine({'page_500': {'type': 'page', 'chunk_size': 500}})
+        processor = DocumentProcessor()
+        paragraph = "Despesas de viagem devem ser comprovadas em ate 15 dias. "
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # PDF: uma página curta e uma maior que chunk_size
+            pdf_path = os.path.join(temp_dir, "viagens.pdf")
+            create_sample_pdf(pdf_path, ["VIAGENS\nSolicite com antecedencia.", "REEMBOLSO\n" + paragraph * 20])
+            
+            docx_path = os.path.join(temp_dir, "viagens.docx")
+            document = docx.Document()
+            for _ in range(20):
+                document.add_paragraph(paragraph)
+            document.save(docx_path)
+            
+            # MD: marcadores de página no texto (mapa de página única)
+            md_path = os.path.join(temp_dir, "viagens.md")
+            with open(md_path, 'w', encoding='utf-8') as f:
+                f.write("# Viagens\n\nSolicite com antecedência.\n--- Página 2 ---\n# Reembolso\n\n" + paragraph * 20)
+            
+            documents = {path: processor.extract_text(path) for path in (pdf_path, docx_path, md_path)}
+        
+        all_ok = True
+        for path, extracted in documents.items():
+            content = extracted['content']
+            chunks = engine.create_chunks(content, 'page_500', extracted['offset_map'])
+            exact = all(chunk['text'] == content[chunk['start_char']:chunk['end_char']] for chunk in chunks)
+            bounded = all(chunk['size'] <= 500 for chunk in chunks)
+            # Cada chunk fica dentro da página indicada pelo mapa
+            pages = {page['page_number']: page for page in extracted['offset_map']['pages']}
+            in_page = all(
+                pages[chunk['page_number']]['start'] <= chunk['start_char'] < chunk['end_char'] <= pages[chunk['page_number']]['end']
+                for chunk in chunks
+            )
+            covered = sum(chunk['size'] for chunk in chunks) >= len(paragraph * 20) - 20
+            ok = exact and bounded and in_page and covered and len(chunks) > 1
+            print(f"{'✅' if ok else '❌'} {os.path.splitext(path)[1]}: {len(pages)} página(s) no mapa, {len(chunks)} chunks "
+                  f"| offsets exatos: {exact} | até 500: {bounded} | na página: {in_page}")
+            all_ok = all_ok and ok
+        
+        # PDF: a primeira página vira um chunk próprio; no MD o marcador separa as páginas
+        pdf_chunks = engine.create_chunks(documents[pdf_path]['content'], 'page_500', documents[pdf_path]['offset_map'])
+        md_chunks = engine.create_chunks(documents[md_path]['content'], 'page_500', documents[md_path]['offset_map'])
+        pages_ok = (
+            [chunk['page_number'] for chunk in pdf_chunks][:2] == [1, 2]
+            and pdf_chunks[0]['text'].startswith("VIAGENS")
+            and md_chunks[0]['text'] == "# Viagens\n\nSolicite com antecedência."
+        )
+        print(f"{'✅' if pages_ok else '❌'} Quebras de página preservadas")
+        
+        return all_ok and pages_ok
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de mapa de offsets: {e}")
+        return False
+
+def test_structure_scan():
+    """Testa a detecção de cabeçalhos e marcadores de página contra as regras anteriores"""
+    print("\n🔎 TESTE 3e: Cabeçalhos e Marcadores de Página")
+    print("-" * 60)
+    
+    try:
+        import re
+        from chunking_engine import ChunkingEngine
+        from benchmark_chunking_suite import create_corpus
+        
+        engine = ChunkingEngine()
+        
+        # Linhas de cabeçalho pelas regras de linha a linha (Markdown, numeradas, SEÇÃO,
+        # CAPÍTULO, "TÍTULO:" e linhas curtas em maiúsculas) e linhas comuns
+        lines = [
+            "# Manual do Colaborador", "Texto de abertura do manual.", "1. Admissão",
+            "Documentos exigidos na contratação.", "SEÇÃO 2 - Jornada", "A jornada é de 44 horas.",
+            "CAPÍTULO 3", "BENEFÍCIOS GERAIS:", "Vale-refeição e plano de saúde.", "REEMBOLSO",
+            "ESTA LINHA EM MAIÚSCULAS É LONGA DEMAIS PARA SER UM CABEÇALHO DE SEÇÃO", "fim."
+        ]
+        header_lines = {0, 2, 4, 6, 7, 9}
+        text = "\n".join(lines)
+        line_starts = [sum(len(line) + 1 for line in lines[:i]) for i in range(len(lines))]
+        expected_headers = [line_starts[i] for i in sorted(header_lines)]
+        
+        boundaries = engine.scan_boundaries(text)
+        headers_ok = boundaries['headers'] == expected_headers and boundaries['page_markers'] == []
+        print(f"{'✅' if headers_ok else '❌'} Cabeçalhos: {len(boundaries['headers'])} de {len(expected_headers)} esperados")
+        
+        # Marcador de maior prioridade presente, com ou sem a busca de cabeçalhos
+        paged = "Intro\n--- Página 2 ---\nPage 7 citada\n[Página 3]\fFim"
+        markers_ok = (
+            engine.scan_boundaries(paged)['page_markers'] == engine.scan_page_markers(paged)
+            == [(paged.index("---"), paged.index("---") + len("--- Página 2 ---"))]
+            and engine.scan_page_markers("A\fB\fC") == [(1, 2), (3, 4)]
+        )
+        print(f"{'✅' if markers_ok else '❌'} Prioridade dos marcadores de página")
+        
+        # Corpus sintético: páginas iguais às do chunking anterior (re.search + re.split)
+        equivalent = True
+        for seed in range(3):
+            corpus = create_corpus(0.2, header_rate=0.15, page_rate=0.05, long_paragraph_rate=0.1, seed=seed)
+            legacy = []
+            for pattern in [r'--- Página \d+ ---', r'\[Página \d+\]', r'Page \d+', r'\f']:
+                if re.search(pattern, corpus):
+                    legacy = [page.strip() for page in re.split(pattern, corpus) if page.strip()]
+                    break
+            chunks, _ = engine._page_chunking(corpus, {'chunk_size': len(corpus)})
+            equivalent = (equivalent and bool(legacy) and chunks == legacy
+                          and engine.scan_page_markers(corpus) == engine.scan_boundaries(corpus)['page_markers'])
+        print(f"{'✅' if equivalent else '❌'} Páginas idênticas ao chunking anterior em 3 corpora")
+        
+        return headers_ok and markers_ok and equivalent
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de cabeçalhos e marcadores: {e}")
+        return False
+
 def test_embeddings():
     """Testa geração de embeddings"""
     print("\n🔗 TESTE 4: Geração de Embeddings")
     print("-" * 60)
     
     try:
+        import numpy as np
         from embedding_generator import EmbeddingGenerator
         
         # Usar fallback para demo (não requer API keys)
@@ -190,12 +942,119 @@ def test_embeddings():
         stats = generator.get_embedding_stats(embeddings)
         print(f"📈 Estatísticas: {stats.get('count', 0)} embeddings, provedor: {stats.get('provider', 'N/A')}")
         
-        return True
+        # Geração em lotes: uma requisição por lote de batch_size, sem repetir textos
+        # nem textos em cache, e cada embedding na posição do seu texto
+        requests_sent = []
+        
+        class RecordingEmbedding:
+            @staticmethod
+            def create(input, model):
+                requests_sent.append(list(input))
+                data = [{'index': i, 'embedding': generator._generate_fallback_embedding(text)}
+                        for i, text in enumerate(input)]
+                return {'data': data[::-1]}
+        
+        batched = EmbeddingGenerator(provider='fallback', batch_size=2)
+        batched.provider = 'openai'
+        batched.client = type('RecordingClient', (), {'Embedding': RecordingEmbedding})
+        batched.generate_embeddings(test_texts[:1])
+        requests_sent.clear()
+        
+        texts = test_texts + [test_texts[1], "Reembolso de despesas de viagem"]
+        batched_embeddings = batched.generate_embeddings(texts)
+        batches_ok = (
+            requests_sent == [test_texts[1:], ["Reembolso de despesas de viagem"]]
+            and np.array_equal(batched_embeddings, np.asarray(
+                [generator._generate_fallback_embedding(text) for text in texts], dtype=np.float32
+            ))
+        )
+        print(f"{'✅' if batches_ok else '❌'} Embeddings em lotes: {len(requests_sent)} requisições "
+              f"para {len(texts)} textos (batch_size=2)")
+        
+        return batches_ok
         
     except Exception as e:
         print(f"❌ Erro no teste de embeddings: {e}")
         return False
 
+def test_embedding_cache():
+    """Testa cache persistente de embeddings"""
+    print("\n🗄️ TESTE 4b: Cache de Embeddings")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        import numpy as np
+        from embedding_cache import EmbeddingCache
+        from embedding_generator import EmbeddingGenerator
+        
+        texts = [
+            "Como solicitar férias na empresa?",
+            "Política de férias estabelece 30 dias anuais",
+            "Procedimento para aprovação de férias"
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_directory = os.path.join(temp_dir, 'cache')
+            
+            first_cache = EmbeddingCache(cache_directory, max_size_mb=1)
+            first = EmbeddingGenerator(provider='fallback', cache=first_cache).generate_embeddings(texts)
+            first_stats = first_cache.get_stats()
+            first_cache.close()
+            
+            # Reinício: textos inalterados vêm do disco, sem gerar embeddings novamente
+            second_cache = EmbeddingCache(cache_directory, max_size_mb=1)
+            second = EmbeddingGenerator(provider='fallback', cache=second_cache).generate_embeddings(texts)
+            second_stats = second_cache.get_stats()
+            second_cache.close()
+            
+            # Limite de dois vetores: a entrada menos usada é removida
+            vector_bytes = 384 * 4
+            bounded = EmbeddingCache(os.path.join(temp_dir, 'bounded'), max_size_mb=2 * vector_bytes / (1024 * 1024))
+            keys = [EmbeddingCache.make_key('fallback', 'modelo', text) for text in texts]
+            bounded.put_many([(keys[0], np.ones(384)), (keys[1], np.ones(384))])
+            bounded.get(keys[0])
+            bounded.put(keys[2], np.ones(384))
+            present = [vector is not None for vector in bounded.get_many(keys)]
+            bounded_stats = bounded.get_stats()
+            bounded.close()
+            
+            # Leitura com acerto não espera a transação de escrita de outro processo
+            import sqlite3
+            import threading
+            reader = EmbeddingCache(cache_directory, max_size_mb=1)
+            writer = sqlite3.connect(str(reader.cache_path), isolation_level=None)
+            writer.execute("BEGIN IMMEDIATE")
+            cached_keys = [EmbeddingGenerator(provider='fallback')._get_cache_key(text) for text in texts]
+            read_hits = []
+            read = threading.Thread(target=lambda: read_hits.extend(
+                vector is not None for vector in reader.get_many(cached_keys)
+            ))
+            read.start()
+            read.join(timeout=5)
+            read_ok = not read.is_alive()
+            writer.execute("COMMIT")
+            writer.close()
+            read.join()
+            reader.close()
+        
+        print(f"✅ Reinício: {second_stats['hits']} hits, {second_stats['writes']} gravações "
+              f"(hit rate {second_stats['hit_rate']:.0%}) | Limite: {bounded_stats['entries']} entradas, "
+              f"{bounded_stats['evictions']} remoção")
+        print(f"{'✅' if read_ok else '❌'} Leitura durante escrita de outro processo: {sum(read_hits)} hits sem esperar o lock")
+        
+        return (
+            first == second
+            and first_stats['misses'] == 3 and first_stats['writes'] == 3
+            and second_stats['hits'] == 3 and second_stats['misses'] == 0 and second_stats['writes'] == 0
+            and present == [True, False, True] and bounded_stats['evictions'] == 1
+            and read_ok and read_hits == [True] * 3
+        )
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de cache de embeddings: {e}")
+        return False
+
 def test_evaluation():
     """Testa sistema de avaliação"""
     print("\n📊 TESTE 5: Sistema de Avaliação")
@@ -302,6 +1161,260 @@ def test_full_rag_pipeline():
         print(f"❌ Erro no pipeline completo: {e}")
         return False
 
+def test_incremental_sync():
+    """Testa re-sincronização incremental via manifesto de ingestão"""
+    print("\n🔄 TESTE 6b: Sincronização Incremental")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from rag_agent import RAGAgent
+        from document_processor import DocumentProcessor
+        from chunking_engine import ChunkingEngine
+        from embedding_generator import EmbeddingGenerator
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            docs_dir = os.path.join(temp_dir, "docs")
+            os.makedirs(docs_dir)
+            for name in ["ferias.txt", "beneficios.txt", "ponto.txt"]:
+                with open(os.path.join(docs_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(f"Política de {name[:-4]}: regras gerais da empresa.")
+            
+            # PDF corrompido: falha na extração e não entra no manifesto
+            contract_path = os.path.join(docs_dir, "contrato.pdf")
+            with open(contract_path, 'wb') as f:
+                f.write(b"nao e um PDF valido")
+            
+            # Componentes montados manualmente (sem depender de API keys)
+            agent = RAGAgent()
+            agent.config.setdefault('storage_config', {})['ingestion_manifest'] = {
+                'file_path': os.path.join(temp_dir, "manifest.json")
+            }
+            agent.doc_processor = DocumentProcessor()
+            agent.chunking_engine = ChunkingEngine(agent.config['chunking_strategies'])
+            agent.embedding_generator = EmbeddingGenerator(provider='fallback')
+            
+            first = agent.sync_directory(docs_dir)
+            second = agent.sync_directory(docs_dir)
+            
+            with open(os.path.join(docs_dir, "ferias.txt"), 'w', encoding='utf-8') as f:
+                f.write("Política de férias atualizada: 30 dias corridos.")
+            os.remove(os.path.join(docs_dir, "ponto.txt"))
+            create_sample_pdf(contract_path, ["Contrato de trabalho: jornada de 44 horas semanais."])
+            third = agent.sync_directory(docs_dir)
+            
+            sources = {os.path.basename(doc['source']) for doc in agent.documents}
+        
+        print(f"✅ 1ª sincronização: {first['added']} novos, {len(first['errors'])} erro")
+        print(f"✅ 2ª sincronização: {second['unchanged']} inalterados, {second['total_chunks']} chunks reprocessados, "
+              f"{second['added']} nova tentativa")
+        print(f"✅ 3ª sincronização: {third['modified']} modificado, {third['deleted']} removido, "
+              f"{third['added']} corrigido")
+        
+        # O PDF com falha é tentado de novo a cada sincronização até ser indexado
+        return (first['added'] == 4 and len(first['errors']) == 1
+                and second['unchanged'] == 3 and second['added'] == 1 and len(second['errors']) == 1
+                and second['total_chunks'] == 0
+                and third['modified'] == 1 and third['deleted'] == 1
+                and third['added'] == 1 and not third['errors']
+                and sources == {"ferias.txt", "beneficios.txt", "contrato.pdf"})
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de sincronização incremental: {e}")
+        return False
+
+def test_ingestion_pipeline():
+    """Testa pipeline assíncrono de ingestão (estágios sobrepostos)"""
+    print("\n🏭 TESTE 6c: Pipeline de Ingestão")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        import threading
+        from rag_agent import RAGAgent
+        from document_processor import DocumentProcessor
+        from chunking_engine import ChunkingEngine
+        from embedding_generator import EmbeddingGenerator
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_paths = []
+            for i in range(30):
+                file_path = os.path.join(temp_dir, f"politica_{i}.txt")
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(f"Política {i}: férias devem ser solicitadas com antecedência. " * 30)
+                file_paths.append(file_path)
+            file_paths.append(os.path.join(temp_dir, "inexistente.txt"))
+            
+            agent = RAGAgent()
+            agent.config['performance_config'] = {
+                'pipeline': {'queue_size': 2, 'extract_workers': 2, 'chunk_workers': 2, 'embed_workers': 2}
+            }
+            # Comparação com o chunking sequencial: sem descartar chunks repetidos
+            agent.config['deduplication_config'] = {'enabled': False}
+            agent.doc_processor = DocumentProcessor()
+            agent.chunking_engine = ChunkingEngine(agent.config['chunking_strategies'])
+            agent.embedding_generator = EmbeddingGenerator(provider='fallback')
+            
+            # Consumidor travado: embeddings só começam depois que a extração para de ler arquivos
+            read_paths = []
+            release = threading.Event()
+            generate_embeddings = agent.embedding_generator.generate_embeddings
+            
+            def stalled_embeddings(texts):
+                release.wait(30)
+                return generate_embeddings(texts)
+            
+            def read_while_stalled():
+                seen = -1
+                while seen != len(read_paths) and not release.is_set():
+                    seen = len(read_paths)
+                    time.sleep(1)
+                stalled_reads.append(seen)
+                release.set()
+            
+            def tracked_paths():
+                for path in file_paths:
+                    read_paths.append(path)
+                    yield path
+            
+            stalled_reads = []
+            agent.embedding_generator.generate_embeddings = stalled_embeddings
+            monitor = threading.Thread(target=read_while_stalled)
+            monitor.start()
+            results = agent.process_documents_pipelined(tracked_paths())
+            monitor.join()
+            
+            sequential_chunks = sum(
+                len(agent.chunking_engine.create_chunks(agent.doc_processor.extract_text(path)['content']))
+                for path in file_paths[:-1]
+            )
+        
+        stages = results['stages']
+        print(f"✅ {len(results['processed_files'])} documentos, {results['total_chunks']} chunks, "
+              f"{results['throughput']['documents_per_second']} docs/s")
+        print(f"✅ Fila máxima por estágio: " + ", ".join(f"{name}={s['queue_max']}" for name, s in stages.items()))
+        
+        # Filas (2), workers de chunking e embeddings (2 cada), pool de extração (2) e a thread de extração
+        in_flight = 2 * 2 + 2 + 2 + 2 + 1
+        backpressure_ok = 0 < stalled_reads[0] <= in_flight < len(file_paths)
+        print(f"{'✅' if backpressure_ok else '❌'} Backpressure: {stalled_reads[0]} de {len(file_paths)} "
+              f"arquivos lidos com o consumidor travado (limite {in_flight})")
+        
+        return (len(results['processed_files']) == 30 and len(results['errors']) == 1
+                and results['total_chunks'] == sequential_chunks == len(agent.documents)
+                and backpressure_ok)
+        
+    except Exception as e:
+        print(f"❌ Erro no teste do pipeline de ingestão: {e}")
+        return False
+
+def test_deduplication():
+    """Testa eliminação de documentos e chunks quase duplicados na ingestão"""
+    print("\n🧬 TESTE 6d: Deduplicação de Quase Duplicatas")
+    print("-" * 60)
+    
+    try:
+        import tempfile
+        from rag_agent import RAGAgent
+        from document_processor import DocumentProcessor
+        from chunking_engine import ChunkingEngine
+        from embedding_generator import EmbeddingGenerator
+        
+        policy = " ".join(
+            f"Item {i}: o colaborador deve registrar a solicitação {i} no sistema interno com antecedência."
+            for i in range(40)
+        )
+        documents = {
+            "politica_v1.txt": policy,
+            "politica_v2.txt": policy.replace("Item 39:", "Item final 39:"),
+            "beneficios.txt": policy[:1200] + " Vale-refeição de R$ 35,00 por dia útil e plano de saúde para dependentes."
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_paths = []
+            for name, text in documents.items():
+                file_path = os.path.join(temp_dir, name)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                file_paths.append(file_path)
+            
+            agent = RAGAgent()
+            agent.config['deduplication_config'] = {
+                'enabled': True, 'mode': 'link', 'document_threshold': 0.9, 'chunk_threshold': 0.9
+            }
+            agent.doc_processor = DocumentProcessor()
+            agent.chunking_engine = ChunkingEngine(agent.config['chunking_strategies'])
+            agent.embedding_generator = EmbeddingGenerator(provider='fallback')
+            
+            results = agent.process_documents(file_paths)
+            report = results['deduplication']
+            original_chunk = next(doc for doc in agent.documents if doc['source'] == file_paths[0])
+            citation = agent._build_citation(original_chunk)
+            
+            # Chunk comum a A e B, armazenado só no primeiro ingerido: removido este, o outro é reindexado com ele
+            shared = " ".join(f"Regra {i}: o reembolso de despesas exige nota fiscal." for i in range(8))
+            sync_dir = os.path.join(temp_dir, "sync")
+            os.makedirs(sync_dir)
+            for name, topic in [("a.txt", "férias"), ("b.txt", "ponto eletrônico")]:
+                specific = " ".join(f"Sobre {topic}, a norma {i} vale para {name}." for i in range(10))
+                with open(os.path.join(sync_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(f"{shared}\n\n{specific}")
+            
+            sync_agent = RAGAgent()
+            sync_agent.config['deduplication_config'] = {'enabled': True, 'mode': 'skip', 'chunk_threshold': 0.9}
+            sync_agent.config.setdefault('storage_config', {})['ingestion_manifest'] = {
+                'file_path': os.path.join(temp_dir, "manifest.json")
+            }
+            sync_agent.doc_processor = DocumentProcessor()
+            sync_agent.chunking_engine = ChunkingEngine(sync_agent.config['chunking_strategies'])
+            sync_agent.embedding_generator = EmbeddingGenerator(provider='fallback')
+            
+            sync_agent.sync_directory(sync_dir)
+            shared_sources = [os.path.basename(doc['source']) for doc in sync_agent.documents if shared in doc['text']]
+            os.remove(os.path.join(sync_dir, shared_sources[0]))
+            resync = sync_agent.sync_directory(sync_dir)
+            restored_sources = [os.path.basename(doc['source']) for doc in sync_agent.documents if shared in doc['text']]
+            
+            # Falha nos embeddings: as assinaturas do arquivo não entram no índice
+            failing_agent = RAGAgent()
+            failing_agent.config['deduplication_config'] = {'enabled': True, 'mode': 'skip'}
+            failing_agent.doc_processor = DocumentProcessor()
+            failing_agent.chunking_engine = ChunkingEngine(failing_agent.config['chunking_strategies'])
+            failing_agent.embedding_generator = EmbeddingGenerator(provider='fallback')
+            generate_embeddings = failing_agent.embedding_generator.generate_embeddings
+            calls = []
+            
+            def fail_first(texts):
+                calls.append(texts)
+                if len(calls) == 1:
+                    raise RuntimeError("API de embeddings indisponível")
+                return generate_embeddings(texts)
+            
+            failing_agent.embedding_generator.generate_embeddings = fail_first
+            failed = failing_agent.process_documents(file_paths[:2])
+            uncommitted_ok = (len(failed['errors']) == 1 and failed['chunks_per_file'][file_paths[1]] > 0
+                              and failed['deduplication']['duplicate_documents'] == 0)
+        
+        print(f"✅ Documentos duplicados: {report['duplicate_documents']} | Chunks duplicados: {report['duplicate_chunks']}")
+        print(f"✅ Embeddings economizados: {report['embeddings_saved']} ({report['index_bytes_saved']} bytes no índice)")
+        print(f"✅ Fontes vinculadas ao original: {[os.path.basename(s) for s in citation.get('linked_sources', [])]}")
+        restored = len(shared_sources) == 1 and restored_sources == list({"a.txt", "b.txt"} - set(shared_sources))
+        print(f"{'✅' if restored else '❌'} Chunk comum em {shared_sources}; após removê-lo: {restored_sources} "
+              f"({resync['reindexed_missing']} reindexado)")
+        
+        print(f"{'✅' if uncommitted_ok else '❌'} Arquivo com falha nos embeddings não deduplica os seguintes: "
+              f"{failed['chunks_per_file']}".replace(temp_dir + os.sep, ''))
+        
+        return (restored and uncommitted_ok and report['duplicate_documents'] == 1
+                and results['chunks_per_file'][file_paths[1]] == 0
+                and report['duplicate_chunks'] >= 1
+                and report['embeddings_saved'] == results['chunks_per_file'][file_paths[0]] + report['duplicate_chunks']
+                and file_paths[1] in citation.get('linked_sources', []))
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de deduplicação: {e}")
+        return False
+
 def test_configuration():
     """Testa carregamento de configuração"""
     print("\n⚙️ TESTE 7: Configuração do Sistema")
@@ -339,6 +1452,32 @@ def test_configuration():
         print(f"❌ Erro carregando configuração: {e}")
         return False
 
+# Nome de cada teste no relatório, pela chave em results
+TEST_NAMES = {
+    'imports': "Importação de Módulos",
+    'document_processing': "Processamento de Documentos",
+    'parallel_ingestion': "Ingestão Paralela de Diretório",
+    'extraction_cache': "Cache de Extração",
+    'archive_ingestion': "Arquivos Compactados",
+    'pdf_pages': "Extração de PDF por Página",
+    'text_decoding': "Decodificação de Texto em Blocos",
+    'supervised_pool': "Pool Supervisionado de Extração",
+    'docx_streaming': "Leitura de DOCX em Fluxo",
+    'chunking': "Estratégias de Chunking",
+    'recursive_spans': "Intervalos do Chunking Recursivo",
+    'streaming_chunks': "Chunking em Fluxo",
+    'page_offset_map': "Chunking por Páginas com Mapa de Offsets",
+    'structure_scan': "Cabeçalhos e Marcadores de Página",
+    'embeddings': "Geração de Embeddings",
+    'embedding_cache': "Cache de Embeddings",
+    'evaluation': "Sistema de Avaliação",
+    'full_pipeline': "Pipeline RAG Completo",
+    'incremental_sync': "Sincronização Incremental",
+    'ingestion_pipeline': "Pipeline de Ingestão",
+    'deduplication': "Deduplicação",
+    'configuration': "Configuração do Sistema"
+}
+
 def generate_test_report(results):
     """Gera relatório dos testes"""
     print("\n" + "="*80)
@@ -352,19 +1491,9 @@ def generate_test_report(results):
     print(f"📊 Taxa de Sucesso: {(passed_tests/total_tests)*100:.1f}%")
     
     print("\n📝 Detalhes por Teste:")
-    test_names = [
-        "Importação de Módulos",
-        "Processamento de Documentos", 
-        "Estratégias de Chunking",
-        "Geração de Embeddings",
-        "Sistema de Avaliação",
-        "Pipeline RAG Completo",
-        "Configuração do Sistema"
-    ]
-    
-    for i, (test_name, status) in enumerate(zip(test_names, results.values())):
+    for key, status in results.items():
         status_icon = "✅" if status else "❌"
-        print(f"{status_icon} {test_name}")
+        print(f"{status_icon} {TEST_NAMES.get(key, key)}")
     
     if passed_tests == total_tests:
         print(f"\n🎉 TODOS OS TESTES PASSARAM! Sistema RAG totalmente funcional.")
@@ -397,18 +1526,63 @@ def main():
     # Teste 2: Processamento de documentos
     results['document_processing'] = test_document_processing()
     
+    # Teste 2b: Ingestão paralela
+    results['parallel_ingestion'] = test_parallel_directory_processing()
+    
+    # Teste 2c: Cache de extração
+    results['extraction_cache'] = test_extraction_cache()
+    
+    # Teste 2d: Arquivos compactados
+    results['archive_ingestion'] = test_archive_ingestion()
+    
+    # Teste 2e: Páginas do PDF
+    results['pdf_pages'] = test_pdf_pages()
+    
+    # Teste 2f: Decodificação de texto
+    results['text_decoding'] = test_text_decoding()
+    
+    # Teste 2g: Pool supervisionado
+    results['supervised_pool'] = test_supervised_pool()
+    
+    # Teste 2h: DOCX em fluxo
+    results['docx_streaming'] = test_docx_streaming()
+    
     # Teste 3: Chunking
     results['chunking'] = test_chunking_strategies()
     
+    # Teste 3b: Intervalos do chunking recursivo
+    results['recursive_spans'] = test_recursive_chunk_spans()
+    
+    # Teste 3c: Chunking em fluxo
+    results['streaming_chunks'] = test_streaming_chunks()
+    
+    # Teste 3d: Chunking por páginas com mapa de offsets
+    results['page_offset_map'] = test_page_offset_map()
+    
+    # Teste 3e: Cabeçalhos e marcadores de página
+    results['structure_scan'] = test_structure_scan()
+    
     # Teste 4: Embeddings
     results['embeddings'] = test_embeddings()
     
+    # Teste 4b: Cache de embeddings
+    results['embedding_cache'] = test_embedding_cache()
+    
     # Teste 5: Avaliação
     results['evaluation'] = test_evaluation()
     
     # Teste 6: Pipeline completo
     results['full_pipeline'] = test_full_rag_pipeline()
     
+    # Teste 6b: Sincronização incremental
+    results['incremental_sync'] = test_incremental_sync()
+    
+    # Teste 6c: Pipeline de ingestão
+    results['ingestion_pipeline'] = test_ingestion_pipeline()
+    
+    # Teste 6d: Deduplicação
+    results['deduplication'] = test_deduplication()
+    
     # Teste 7: Configuração
     results['configuration'] = test_configuration()
     
@@ -0,0 +1,159 @@
+"""
+Token Counter - Contagem de Tokens
+Registro de tokenizers compartilhado pelo processo (carregados sob demanda) e contador
+aproximado de tokens, calibrado em caracteres por token, com erro limitado
+"""
+
+import math
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Caracteres por token do cl100k_base em texto pt-BR, usado até haver calibração
+# (ou quando o tiktoken não está disponível)
+DEFAULT_CHARS_PER_TOKEN = 3.7
+
+# Amostra tokenizada na calibração automática e tamanho dos trechos em que o erro é medido
+CALIBRATION_SAMPLE_CHARS = 64 * 1024
+CALIBRATION_SEGMENT_CHARS = 400
+
+# Tokenizers e contadores aproximados carregados no processo, por encoding (None: indisponível)
+_tokenizers = {}
+_approximate_counters = {}
+_registry_lock = threading.Lock()
+
+def get_tokenizer(encoding_name: str = DEFAULT_ENCODING):
+    """
+    Retorna o tokenizer tiktoken compartilhado pelo processo (carregado no primeiro uso)
+
+    Args:
+        encoding_name: Nome do encoding tiktoken
+
+    Returns:
+        tiktoken.Encoding ou None se o tiktoken/encoding não estiver disponível
+    """
+    with _registry_lock:
+        if encoding_name not in _tokenizers:
+            try:
+                import tiktoken
+                _tokenizers[encoding_name] = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro inicializando tokenizer: {e}")
+                _tokenizers[encoding_name] = None
+        return _tokenizers[encoding_name]
+
+class ApproximateTokenCounter:
+    """
+    Estimativa de tokens pelo número de caracteres (sem tokenizar)
+
+    Para métricas, orçamento de contexto e painéis em que a contagem exata não é
+    necessária. calibrate mede caracteres por token e o maior erro relativo em trechos
+    de CALIBRATION_SEGMENT_CHARS de uma amostra tokenizada; upper_bound usa esse erro
+    para uma estimativa que não fica abaixo da contagem exata (orçamento de contexto).
+    """
+
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+                 relative_error: Optional[float] = None):
+        """
+        Args:
+            chars_per_token: Caracteres por token
+            relative_error: Maior erro relativo medido na calibração (None: não calibrado)
+        """
+        self.chars_per_token = chars_per_token
+        self.relative_error = relative_error
+
+    @property
+    def calibrated(self) -> bool:
+        """Indica se chars_per_token e relative_error vieram de uma calibração"""
+        return self.relative_error is not None
+
+    def count(self, text: str) -> int:
+        """Tokens estimados de text"""
+        if not text:
+            return 0
+        return max(1, round(len(text) / self.chars_per_token))
+
+    def upper_bound(self, text: str) -> int:
+        """Estimativa acrescida do erro da calibração (limite superior para orçamento de contexto)"""
+        if not text:
+            return 0
+        return math.ceil(len(text) / self.chars_per_token * (1 + (self.relative_error or 0.0)))
+
+    def calibrate(self, samples: Iterable[str], tokenizer) -> 'ApproximateTokenCounter':
+        """
+        Calibra caracteres por token e o erro contra o tokenizer exato
+
+        Args:
+            samples: Textos representativos do corpus
+            tokenizer: Tokenizer tiktoken usado como referência
+
+        Returns:
+            ApproximateTokenCounter: O próprio contador, calibrado
+        """
+        segments = [
+            sample[position:position + CALIBRATION_SEGMENT_CHARS]
+            for sample in samples
+            for position in range(0, len(sample), CALIBRATION_SEGMENT_CHARS)
+        ]
+        segments = [segment for segment in segments if segment.strip()]
+        if not segments:
+            return self
+
+        token_counts = [len(tokens) for tokens in tokenizer.encode_ordinary_batch(segments)]
+        total_tokens = sum(token_counts)
+        if not total_tokens:
+            return self
+
+        self.chars_per_token = sum(len(segment) for segment in segments) / total_tokens
+        # Erro medido só em trechos completos: trechos curtos têm erro relativo maior
+        full = [(segment, count) for segment, count in zip(segments, token_counts)
+                if len(segment) == CALIBRATION_SEGMENT_CHARS and count] or list(zip(segments, token_counts))
+        self.relative_error = max(abs(len(segment) / self.chars_per_token - count) / count
+                                  for segment, count in full if count)
+        return self
+
+    def stats(self) -> Dict:
+        """Parâmetros do contador"""
+        return {
+            'chars_per_token': round(self.chars_per_token, 4),
+            'relative_error': None if self.relative_error is None else round(self.relative_error, 4),
+            'calibrated': self.calibrated
+        }
+
+def get_approximate_counter(encoding_name: str = DEFAULT_ENCODING,
+                            sample: str = None) -> ApproximateTokenCounter:
+    """
+    Retorna o contador aproximado compartilhado pelo processo para o encoding
+
+    Na primeira chamada com sample, o contador é calibrado com os primeiros
+    CALIBRATION_SAMPLE_CHARS caracteres da amostra (se o tokenizer estiver disponível);
+    sem calibração, usa DEFAULT_CHARS_PER_TOKEN.
+
+    Args:
+        encoding_name: Nome do encoding tiktoken de referência
+        sample: Texto para a calibração automática (ex.: o primeiro documento)
+
+    Returns:
+        ApproximateTokenCounter: Contador do encoding
+    """
+    with _registry_lock:
+        counter = _approximate_counters.get(encoding_name)
+        if counter is None:
+            counter = _approximate_counters[encoding_name] = ApproximateTokenCounter()
+
+    if sample and not counter.calibrated:
+        tokenizer = get_tokenizer(encoding_name)
+        if tokenizer:
+            with _registry_lock:
+                if not counter.calibrated:
+                    counter.calibrate([sample[:CALIBRATION_SAMPLE_CHARS]], tokenizer)
+                    logger.info(f"📏 Contador aproximado calibrado: {counter.chars_per_token:.2f} caracteres/token, "
+                                f"erro máximo {counter.relative_error:.1%}")
+
+    return counter